@@ -1,178 +1,162 @@
-from flask import Flask, request, jsonify
+from flask import Flask, g, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
+import hashlib
 import json
+import math
 import os
 import random
-import re
+import time
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
-import urllib.parse
+from concurrent.futures import as_completed, TimeoutError as FutureTimeoutError
+from cache import ResponseCache
+from secondhand_fetcher import SecondhandFetcher
+from http_pool import PooledHTTPClient, CircuitOpenError, HostBusyError
+from marketplaces import MarketplaceFanout, build_adapters
+from scoring import ProductScorer
+from precomputed import PrecomputedScores, lookup_product
+from precomputed_index import MappedIndex
+from reference_data import ReferenceDataWatcher
+from price_history import PriceHistoryStore, window_days
+from price_alerts import PriceAlertEngine
+from refresh_scheduler import RefreshScheduler
+from listing_index import ListingIndex, key_for, read_listings
+from fast_json import FastJSONProvider, static
+import compression
+import wire_format
+import metrics
+from metrics import latency
+
+# orjson with pre-encoded static fragments; 0 falls back to Flask's stdlib encoder
+FAST_JSON = os.environ.get('CARTHERO_FAST_JSON', '1') != '0'
 
 app = Flask(__name__)
+if FAST_JSON:
+    app.json = FastJSONProvider(app)
 CORS(app, origins=["chrome-extension://*", "http://localhost:*", "http://127.0.0.1:*", "file://*"])
 
-class CartHeroAPI:
+# Content-Encodings offered to clients, in order of preference; empty disables compression
+COMPRESSION = compression.available(os.environ.get('CARTHERO_COMPRESSION', 'br,gzip'))
+COMPRESS_MIN_BYTES = int(os.environ.get('CARTHERO_COMPRESS_MIN_BYTES', 512))
+# Echo per-section timings in a Server-Timing header (exposes internals; off by default)
+SERVER_TIMING = os.environ.get('CARTHERO_SERVER_TIMING', '0') == '1'
+
+# Constant parts of the sections; dicts and lists are encoded once and spliced into each response
+SHARE_HASHTAGS = static(["#SustainableShopping", "#CartHero", "#EcoFriendly", "#ClimateAction"])
+COMMUNITY_CHALLENGES = static({
+    'weekly': "Save 10kg CO₂ this week",
+    'monthly': "Choose 5 secondhand items this month",
+    'community': "Help CartHero community save 1000kg CO₂"
+})
+ALERT_SETTINGS = static({
+    'price_drop_threshold': 15,  # percentage
+    'sustainability_improvement_threshold': 10,  # score points
+    'new_alternatives_notification': True,
+    'weekly_impact_summary': True
+})
+ALERT_TIPS = ('Users like you save an average of $200/month with price tracking',
+              'Sustainability scores for this category typically improve by 20% during sales')
+
+class CartHeroAPI(ProductScorer):
     def __init__(self):
-        self.mock_data_dir = os.path.join(os.path.dirname(__file__), 'mock_data')
-        self.load_mock_data()
-
-    def load_mock_data(self):
-        try:
-            with open(os.path.join(self.mock_data_dir, 'secondhand.json'), 'r') as f:
-                self.secondhand_data = json.load(f)
-        except FileNotFoundError:
-            self.secondhand_data = []
-
+        super().__init__()
+        print(f"Loaded reference data: {self.reference_data.stats()}")
+        self.listing_index = ListingIndex()
+        self.load_listings(os.environ.get('CARTHERO_LISTINGS'))
+        self.index_reference_listings(self.reference_data)
+        self.http_client = PooledHTTPClient(
+            max_per_host=int(os.environ.get('CARTHERO_MAX_PER_HOST', 8)))
+        # Point each site at a local fixture server (see marketplace_fixtures.py) when testing
+        self.marketplaces = MarketplaceFanout(
+            build_adapters(self.http_client, os.environ.get('CARTHERO_MARKETPLACES', 'ebay,backmarket,swappa'),
+                           os.environ.get('CARTHERO_EBAY_PARSER', 'lxml'), deterministic=self.deterministic),
+            deadline=float(os.environ.get('CARTHERO_MARKETPLACE_DEADLINE', 8)))
+        self.secondhand_fetcher = SecondhandFetcher(self.search_marketplaces)
+        price_db = os.environ.get('CARTHERO_PRICE_DB', os.path.join(os.path.dirname(__file__), 'price_history.db'))
+        # Connections and background threads are per process: see start_services()
+        self.price_history = PriceHistoryStore(price_db)
+        self.price_alerts = PriceAlertEngine(price_db)
+
+    def load_listings(self, path):
+        """Bulk-index a JSON Lines file of listings (CARTHERO_LISTINGS) into the search index"""
+        if not path:
+            return
         try:
-            with open(os.path.join(self.mock_data_dir, 'durability.json'), 'r') as f:
-                self.durability_data = json.load(f)
-        except FileNotFoundError:
-            self.durability_data = {}
-
-        try:
-            with open(os.path.join(self.mock_data_dir, 'emissions.json'), 'r') as f:
-                self.emissions_data = json.load(f)
-        except FileNotFoundError:
-            self.emissions_data = {}
+            count = self.listing_index.bulk_load(read_listings(path))
+            print(f"Indexed {count} listings from {path}")
+        except OSError as e:
+            print(f"Could not load listings from {path}: {e}")
+
+    def index_reference_listings(self, reference_data, previous=None):
+        """Index the listings of `reference_data`, removing those of `previous` it no longer has"""
+        listings = [listing for bucket in reference_data.listings_by_category.values() for listing in bucket]
+        if previous is not None:
+            current = {key_for(listing) for listing in listings}
+            self.listing_index.remove_many(
+                listing for bucket in previous.listings_by_category.values() for listing in bucket
+                if key_for(listing) not in current)
+        self.listing_index.add_many(listings)
 
     def search_real_ebay(self, query, max_results=3):
         """Search real eBay listings for secondhand alternatives"""
         try:
-            # Create eBay search URL
-            encoded_query = urllib.parse.quote_plus(f"{query} refurbished OR used")
-            url = f"https://www.ebay.com/sch/i.html?_nkw={encoded_query}&_sacat=0&LH_ItemCondition=2500%2C3000%2C4000&rt=nc&_udlo=50"
-
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code != 200:
-                return []
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-            items = []
-
-            # Find eBay listing containers
-            listings = soup.find_all('div', {'class': re.compile(r's-item.*')})[:max_results]
-
-            for listing in listings:
-                try:
-                    # Extract title
-                    title_elem = listing.find('h3', {'class': re.compile(r's-item__title.*')}) or listing.find('a', {'class': re.compile(r's-item__link.*')})
-                    title = title_elem.get_text(strip=True) if title_elem else "Item"
-
-                    # Extract price
-                    price_elem = listing.find('span', {'class': re.compile(r's-item__price.*')}) or listing.find('span', {'class': re.compile(r'notranslate.*')})
-                    price = price_elem.get_text(strip=True) if price_elem else "Price unavailable"
-
-                    # Extract link
-                    link_elem = listing.find('a', {'class': re.compile(r's-item__link.*')})
-                    link = link_elem.get('href') if link_elem else f"https://www.ebay.com/sch/i.html?_nkw={encoded_query}"
-
-                    # Extract condition
-                    condition_elem = listing.find('span', {'class': re.compile(r's-item__subtitle.*')})
-                    condition = "Good"
-                    if condition_elem:
-                        condition_text = condition_elem.get_text(strip=True).lower()
-                        if 'excellent' in condition_text or 'mint' in condition_text:
-                            condition = "Excellent"
-                        elif 'very good' in condition_text:
-                            condition = "Very Good"
-                        elif 'fair' in condition_text or 'acceptable' in condition_text:
-                            condition = "Fair"
-
-                    # Extract shipping info
-                    shipping_elem = listing.find('span', {'class': re.compile(r's-item__shipping.*')})
-                    shipping = shipping_elem.get_text(strip=True) if shipping_elem else "Shipping varies"
-
-                    # Calculate savings and CO2 reduction
-                    price_num = self.extract_price_number(price)
-                    savings_pct = random.randint(25, 60)
-                    co2_saved = round(random.uniform(2.0, 6.0), 1)
-
-                    items.append({
-                        'title': title[:60] + "..." if len(title) > 60 else title,
-                        'price': price,
-                        'originalPrice': f"${price_num * 1.4:.2f}" if price_num else "N/A",
-                        'condition': condition,
-                        'warranty': random.choice(['30 days', '90 days', '6 months', 'No warranty']),
-                        'seller': 'eBay Seller',
-                        'rating': round(random.uniform(4.0, 4.9), 1),
-                        'reviewCount': random.randint(10, 500),
-                        'url': link,
-                        'savings': f"Save {savings_pct}%",
-                        'co2Reduction': f"{co2_saved} kg CO₂ saved",
-                        'marketplace': 'eBay',
-                        'shippingInfo': shipping,
-                        'sustainabilityScore': random.randint(70, 95),
-                        'verifiedSeller': True,
-                        'realData': True
-                    })
-                except Exception as e:
-                    print(f"Error parsing eBay listing: {e}")
-                    continue
-
-            return items
-
+            return self.marketplaces.adapter('ebay').search(query, max_results=max_results)
+        except (CircuitOpenError, HostBusyError) as e:
+            print(f"eBay search skipped: {e}")
+            return []
         except Exception as e:
             print(f"eBay search error: {e}")
             return []
 
-    def extract_product_category(self, title, brand):
-        title_lower = title.lower()
-        brand_lower = brand.lower() if brand else ""
-
-        categories = {
-            'smartphone': ['phone', 'iphone', 'samsung galaxy', 'pixel', 'smartphone'],
-            'laptop': ['laptop', 'macbook', 'notebook', 'chromebook', 'thinkpad'],
-            'tablet': ['tablet', 'ipad', 'surface'],
-            'headphones': ['headphones', 'earbuds', 'airpods', 'beats'],
-            'smartwatch': ['watch', 'smartwatch', 'apple watch', 'fitbit'],
-            'gaming': ['ps5', 'xbox', 'nintendo', 'gaming', 'playstation'],
-            'camera': ['camera', 'canon', 'nikon', 'sony camera'],
-            'appliance': ['refrigerator', 'washer', 'dryer', 'microwave', 'dishwasher']
-        }
-
-        for category, keywords in categories.items():
-            for keyword in keywords:
-                if keyword in title_lower or keyword in brand_lower:
-                    return category
+    def search_marketplaces(self, query):
+        """Live listings from every configured marketplace, ranked across sites"""
+        items = self.marketplaces.search(query)
+        # Everything fetched live also becomes searchable through /api/search-secondhand
+        self.listing_index.add_many(items, category=self.extract_product_category(query, ''))
+        return items
 
-        return 'electronics'
+    def secondhand_search_query(self, product_data):
+        product = self.product_context(product_data)
+        return f"{product.brand} {product.title or 'Product'}".strip()
 
-    def generate_secondhand_options(self, product_data):
-        category = self.extract_product_category(product_data.get('title', ''),
-                                                product_data.get('brand', ''))
+    def generate_secondhand_options(self, product_data, wait_for_live=False, live_timeout=10):
+        product = self.product_context(product_data)
+        rng = self.rng(product, 'secondhandOptions')
+        category = product.category
 
-        base_price = self.extract_price_number(product_data.get('price', ''))
+        base_price = product.price
         if not base_price:
-            base_price = random.uniform(50, 500)
+            base_price = rng.uniform(50, 500)
 
         options = []
 
         # Generate real search URLs based on product title
-        title = product_data.get('title', 'Product')
-        brand = product_data.get('brand', '')
-        search_query = f"{brand} {title}".strip()
+        title = product.title or 'Product'
+        search_query = self.secondhand_search_query(product)
 
-        # Try to get real eBay data first
-        try:
-            real_ebay_items = self.search_real_ebay(search_query, max_results=2)
-            if real_ebay_items:
-                print(f"Found {len(real_ebay_items)} real eBay items")
-                options.extend(real_ebay_items)
-            else:
-                print("No real eBay items found, using fallback")
-        except Exception as e:
-            print(f"Real eBay search failed: {e}")
+        # Use live marketplace listings if the background fetch has them; never
+        # block the request on the scrape unless the caller explicitly waits for it
+        if wait_for_live:
+            live_items = self.secondhand_fetcher.fetch(search_query, timeout=live_timeout)
+        else:
+            live_items = self.secondhand_fetcher.peek(search_query)
+
+        if live_items:
+            print(f"Found {len(live_items)} live marketplace items")
+            options.extend(live_items)
+        elif live_items is None:
+            print("Live marketplace search pending, using fallback")
+        else:
+            print("No live marketplace items found, using fallback")
 
-        # Add fallback/additional options if needed
+        # Curated reference listings for the same product come next
+        if len(options) < 2:
+            options.extend(self.reference_data.listings_for(category, search_query, limit=2 - len(options)))
+
+        # Synthesize fallback options only when nothing real was found
         if len(options) < 2:
             encoded_query = search_query.replace(' ', '+')[:50]
-            refurb_price = base_price * random.uniform(0.6, 0.8)
-            used_price = base_price * random.uniform(0.4, 0.7)
+            refurb_price = base_price * rng.uniform(0.6, 0.8)
+            used_price = base_price * rng.uniform(0.4, 0.7)
             conditions = ['Excellent', 'Very Good', 'Good']
             sellers = ['EcoRefurb Pro', 'GreenTech Store', 'Sustainable Electronics', 'ReNew Marketplace']
 
@@ -181,496 +165,172 @@ class CartHeroAPI:
             'title': f"Refurbished {title[:50]}...",
             'price': f"${refurb_price:.2f}",
             'originalPrice': f"${base_price:.2f}",
-            'condition': random.choice(conditions),
-            'warranty': random.choice(['6 months', '12 months', '18 months']),
-            'seller': random.choice(sellers),
-            'rating': round(random.uniform(4.2, 4.9), 1),
-            'reviewCount': random.randint(50, 500),
+            'condition': rng.choice(conditions),
+            'warranty': rng.choice(['6 months', '12 months', '18 months']),
+            'seller': rng.choice(sellers),
+            'rating': round(rng.uniform(4.2, 4.9), 1),
+            'reviewCount': rng.randint(50, 500),
             'url': f"https://www.ebay.com/sch/i.html?_nkw={encoded_query}+refurbished&_sacat=0&LH_ItemCondition=2500&rt=nc",
             'savings': f"Save {((base_price - refurb_price) / base_price * 100):.0f}%",
-            'co2Reduction': f"{random.uniform(2.0, 4.5):.1f} kg CO₂ saved",
+            'co2Reduction': f"{rng.uniform(2.0, 4.5):.1f} kg CO₂ saved",
             'marketplace': 'eBay',
             'imageUrl': '/assets/placeholder-product.jpg',
             'shippingInfo': 'Free shipping',
             'returnPolicy': '30-day returns',
-            'sustainabilityScore': random.randint(75, 95),
+            'sustainabilityScore': rng.randint(75, 95),
             'verifiedSeller': True
         })
 
-        # BackMarket option with real search URL
-        if random.random() > 0.3:  # 70% chance of having a second option
-            options.append({
-                'title': f"Certified Used {title[:50]}...",
-                'price': f"${used_price:.2f}",
-                'originalPrice': f"${base_price:.2f}",
-                'condition': random.choice(['Good', 'Fair']),
-                'warranty': random.choice(['3 months', '6 months', 'No warranty']),
-                'seller': random.choice(sellers),
-                'rating': round(random.uniform(3.8, 4.6), 1),
-                'reviewCount': random.randint(20, 200),
-                'url': f"https://www.backmarket.com/en-us/search?q={encoded_query}",
-                'savings': f"Save {((base_price - used_price) / base_price * 100):.0f}%",
-                'co2Reduction': f"{random.uniform(3.0, 6.0):.1f} kg CO₂ saved",
-                'marketplace': 'BackMarket',
-                'imageUrl': '/assets/placeholder-product.jpg',
-                'shippingInfo': '2-3 day shipping',
-                'returnPolicy': '21-day returns',
-                'sustainabilityScore': random.randint(65, 85),
-                'verifiedSeller': True
-            })
-
-        # Add Facebook Marketplace option for local deals
-        if category in ['smartphone', 'laptop', 'tablet', 'gaming']:
-            options.append({
-                'title': f"Local Used {title[:40]}...",
-                'price': f"${used_price * 0.8:.2f}",
-                'originalPrice': f"${base_price:.2f}",
-                'condition': 'Good',
-                'warranty': 'No warranty',
-                'seller': 'Local Seller',
-                'rating': round(random.uniform(4.0, 4.8), 1),
-                'reviewCount': random.randint(5, 50),
-                'url': f"https://www.facebook.com/marketplace/search/?query={encoded_query}",
-                'savings': f"Save {((base_price - used_price * 0.8) / base_price * 100):.0f}%",
-                'co2Reduction': f"{random.uniform(4.0, 7.0):.1f} kg CO₂ saved",
-                'marketplace': 'Facebook Marketplace',
-                'imageUrl': '/assets/placeholder-product.jpg',
-                'shippingInfo': 'Local pickup',
-                'returnPolicy': 'As-is',
-                'sustainabilityScore': random.randint(80, 95),
-                'verifiedSeller': False,
-                'localDeal': True
-            })
+            # BackMarket option with real search URL
+            if rng.random() > 0.3:  # 70% chance of having a second option
+                options.append({
+                    'title': f"Certified Used {title[:50]}...",
+                    'price': f"${used_price:.2f}",
+                    'originalPrice': f"${base_price:.2f}",
+                    'condition': rng.choice(['Good', 'Fair']),
+                    'warranty': rng.choice(['3 months', '6 months', 'No warranty']),
+                    'seller': rng.choice(sellers),
+                    'rating': round(rng.uniform(3.8, 4.6), 1),
+                    'reviewCount': rng.randint(20, 200),
+                    'url': f"https://www.backmarket.com/en-us/search?q={encoded_query}",
+                    'savings': f"Save {((base_price - used_price) / base_price * 100):.0f}%",
+                    'co2Reduction': f"{rng.uniform(3.0, 6.0):.1f} kg CO₂ saved",
+                    'marketplace': 'BackMarket',
+                    'imageUrl': '/assets/placeholder-product.jpg',
+                    'shippingInfo': '2-3 day shipping',
+                    'returnPolicy': '21-day returns',
+                    'sustainabilityScore': rng.randint(65, 85),
+                    'verifiedSeller': True
+                })
+
+            # Add Facebook Marketplace option for local deals
+            if category in ['smartphone', 'laptop', 'tablet', 'gaming']:
+                options.append({
+                    'title': f"Local Used {title[:40]}...",
+                    'price': f"${used_price * 0.8:.2f}",
+                    'originalPrice': f"${base_price:.2f}",
+                    'condition': 'Good',
+                    'warranty': 'No warranty',
+                    'seller': 'Local Seller',
+                    'rating': round(rng.uniform(4.0, 4.8), 1),
+                    'reviewCount': rng.randint(5, 50),
+                    'url': f"https://www.facebook.com/marketplace/search/?query={encoded_query}",
+                    'savings': f"Save {((base_price - used_price * 0.8) / base_price * 100):.0f}%",
+                    'co2Reduction': f"{rng.uniform(4.0, 7.0):.1f} kg CO₂ saved",
+                    'marketplace': 'Facebook Marketplace',
+                    'imageUrl': '/assets/placeholder-product.jpg',
+                    'shippingInfo': 'Local pickup',
+                    'returnPolicy': 'As-is',
+                    'sustainabilityScore': rng.randint(80, 95),
+                    'verifiedSeller': False,
+                    'localDeal': True
+                })
 
         return options
 
-    def generate_durability_info(self, product_data):
-        category = self.extract_product_category(product_data.get('title', ''),
-                                                product_data.get('brand', ''))
-
-        category_scores = {
-            'smartphone': {'repair': (6, 8), 'lifespan': '2-4 years'},
-            'laptop': {'repair': (5, 7), 'lifespan': '4-6 years'},
-            'tablet': {'repair': (4, 6), 'lifespan': '3-5 years'},
-            'headphones': {'repair': (7, 9), 'lifespan': '3-7 years'},
-            'smartwatch': {'repair': (3, 5), 'lifespan': '2-4 years'},
-            'gaming': {'repair': (6, 8), 'lifespan': '5-8 years'},
-            'camera': {'repair': (5, 7), 'lifespan': '5-10 years'},
-            'appliance': {'repair': (4, 6), 'lifespan': '10-15 years'},
-            'electronics': {'repair': (5, 7), 'lifespan': '3-5 years'}
-        }
-
-        score_range = category_scores.get(category, category_scores['electronics'])
-        repair_score = random.randint(score_range['repair'][0], score_range['repair'][1])
-
-        return {
-            'repairabilityScore': repair_score,
-            'maxScore': 10,
-            'warrantyLength': random.choice(['6 months', '12 months', '24 months', '36 months']),
-            'expectedLifespan': score_range['lifespan'],
-            'repairGuides': random.randint(3, 25),
-            'partAvailability': random.choice(['Excellent', 'Good', 'Fair', 'Limited']),
-            'repairCostEstimate': f"${random.randint(50, 200)}",
-            'sustainabilityTips': [
-                'Use protective case to extend lifespan',
-                'Regular maintenance increases durability',
-                'Consider repair before replacement'
-            ]
-        }
-
-    def generate_shipping_options(self, product_data):
-        base_co2 = random.uniform(1.0, 2.0)
-
-        return {
-            'express': {
-                'days': '1-2',
-                'co2': f"{base_co2 * 3.5:.1f} kg CO₂",
-                'cost': f"${random.uniform(12, 20):.2f}",
-                'description': 'Fastest delivery with highest emissions'
-            },
-            'standard': {
-                'days': '3-5',
-                'co2': f"{base_co2 * 2.0:.1f} kg CO₂",
-                'cost': f"${random.uniform(5, 10):.2f}",
-                'description': 'Balanced speed and environmental impact'
-            },
-            'noRush': {
-                'days': '7-10',
-                'co2': f"{base_co2:.1f} kg CO₂",
-                'cost': 'Free',
-                'description': 'Eco-friendly shipping with consolidated deliveries',
-                'co2Saved': f"{base_co2 * 2.5:.1f} kg CO₂ saved vs express"
-            },
-            'pickup': {
-                'days': 'Same day',
-                'co2': '0.0 kg CO₂',
-                'cost': 'Free',
-                'description': 'Zero emissions - pick up at store'
-            }
-        }
-
-    def extract_price_number(self, price_string):
-        if not price_string:
-            return None
-        price_match = re.search(r'[\d,]+\.?\d*', str(price_string))
-        if price_match:
-            return float(price_match.group().replace(',', ''))
-        return None
-
-    def generate_recommendations(self, product_data):
-        title = product_data.get('title', '').lower()
-
-        buy_secondhand = any(keyword in title for keyword in
-                           ['phone', 'laptop', 'tablet', 'camera', 'headphones'])
-
-        return {
-            'buySecondhand': buy_secondhand,
-            'repairInstead': 'repair' in title or 'broken' in title,
-            'waitForSale': random.random() > 0.7,
-            'alternativeBrands': self.suggest_alternative_brands(product_data.get('brand', '')),
-            'sustainabilityScore': random.randint(3, 8),
-            'reasons': [
-                'High refurbished availability',
-                'Good repair options',
-                'Long expected lifespan'
-            ]
-        }
-
-    def suggest_alternative_brands(self, current_brand):
-        sustainable_brands = {
-            'apple': ['Fairphone', 'Framework'],
-            'samsung': ['Fairphone', 'OnePlus'],
-            'dell': ['Framework', 'System76'],
-            'hp': ['Framework', 'System76'],
-            'sony': ['Audio-Technica', 'Sennheiser']
-        }
-
-        return sustainable_brands.get(current_brand.lower(), ['Patagonia', 'Fairphone'])
-
-    def calculate_ai_sustainability_score(self, product_data):
-        """AI-powered sustainability scoring algorithm"""
-        title = product_data.get('title', '').lower()
-        brand = product_data.get('brand', '').lower()
-        price = self.extract_price_number(product_data.get('price', ''))
-
-        # Base score
-        score = 50
-
-        # Material sustainability factors
-        sustainable_materials = ['bamboo', 'recycled', 'organic', 'eco', 'sustainable', 'renewable']
-        unsustainable_materials = ['plastic', 'synthetic', 'disposable', 'fast fashion']
-
-        for material in sustainable_materials:
-            if material in title:
-                score += 15
-
-        for material in unsustainable_materials:
-            if material in title:
-                score -= 10
-
-        # Brand sustainability factors
-        sustainable_brands = ['patagonia', 'fairphone', 'framework', 'seventh generation', 'tesla']
-        if brand in sustainable_brands:
-            score += 20
-
-        # Product category factors
-        category = self.extract_product_category(title, brand)
-        category_scores = {
-            'smartphone': -5,  # Generally less sustainable due to planned obsolescence
-            'laptop': 0,       # Neutral
-            'appliance': 10,   # Long-lasting
-            'gaming': -10,     # High energy consumption
-            'camera': 5        # Long-lasting
-        }
-        score += category_scores.get(category, 0)
-
-        # Price factor (higher price often means better quality/durability)
-        if price:
-            if price > 500:
-                score += 10
-            elif price < 50:
-                score -= 5
-
-        # Ensure score is between 0 and 100
-        score = max(0, min(100, score))
-
-        # Generate AI insights
-        insights = []
-        if score >= 80:
-            insights.append("Excellent sustainability profile with eco-friendly materials")
-        elif score >= 60:
-            insights.append("Good sustainability potential with some eco-friendly features")
-        else:
-            insights.append("Consider secondhand alternatives for better environmental impact")
-
-        if 'recycled' in title:
-            insights.append("Contains recycled materials - great choice!")
-
-        return {
-            'overallScore': score,
-            'breakdown': {
-                'materials': min(100, score - 20),
-                'durability': random.randint(60, 90),
-                'packaging': random.randint(40, 80),
-                'shipping': random.randint(50, 85),
-                'brandEthics': random.randint(45, 95)
-            },
-            'insights': insights,
-            'confidence': round(random.uniform(0.75, 0.95), 2),
-            'recommendation': 'buy_secondhand' if score < 60 else 'buy_new'
-        }
-
-    def calculate_carbon_footprint(self, product_data):
-        """Calculate detailed carbon footprint analysis with real-world data"""
-        category = self.extract_product_category(product_data.get('title', ''),
-                                                product_data.get('brand', ''))
-        price = self.extract_price_number(product_data.get('price', ''))
-        title = product_data.get('title', '').lower()
-        brand = product_data.get('brand', '').lower()
-
-        # Enhanced base emissions by category (kg CO2) - based on real LCA studies
-        base_emissions = {
-            'smartphone': 85,      # iPhone 14: ~70kg, Samsung Galaxy: ~95kg
-            'laptop': 350,         # MacBook: ~320kg, Dell laptop: ~380kg
-            'tablet': 125,         # iPad: ~120kg, Android tablet: ~130kg
-            'headphones': 15,      # AirPods: ~10kg, Over-ear: ~20kg
-            'smartwatch': 25,      # Apple Watch: ~22kg, Samsung: ~28kg
-            'gaming': 450,         # PS5: ~430kg, Xbox: ~470kg
-            'camera': 180,         # DSLR: ~170kg, Mirrorless: ~190kg
-            'appliance': 600,      # Varies widely: 400-800kg
-            'electronics': 100,    # Generic electronics
-            'clothing': 20,        # Average garment: 15-25kg
-            'book': 2.5,          # Physical book: ~2.5kg
-            'toy': 8,             # Plastic toy: ~5-12kg
-            'furniture': 150,      # Small furniture: 100-200kg
-            'jewelry': 50,        # Gold ring: ~40-60kg
-            'beauty': 5,          # Cosmetics: 3-8kg
-            'home': 25,           # Home goods: 20-30kg
-            'sports': 40,         # Sports equipment: 30-50kg
-            'automotive': 2000,   # Car parts: varies widely
-            'tools': 60          # Hand tools: 50-70kg
-        }
-
-        # Adjust for product specifics
-        manufacturing = base_emissions.get(category, 100)
-
-        # Price-based adjustment (higher quality = more durable materials)
-        if price:
-            if price > 1000:
-                manufacturing *= 1.3  # Premium materials, more complex manufacturing
-            elif price > 500:
-                manufacturing *= 1.1  # Mid-range
-            elif price < 50:
-                manufacturing *= 0.7  # Lower quality, less material
-
-        # Brand-specific adjustments
-        premium_brands = ['apple', 'samsung', 'sony', 'bose', 'dyson', 'tesla']
-        eco_brands = ['fairphone', 'framework', 'patagonia', 'seventh generation']
-
-        if brand in premium_brands:
-            manufacturing *= 1.15  # Premium brands often use more materials
-        elif brand in eco_brands:
-            manufacturing *= 0.85  # Eco brands optimize for lower footprint
-
-        # Material-specific adjustments
-        if 'aluminum' in title or 'metal' in title:
-            manufacturing *= 1.2  # Metal production is energy-intensive
-        elif 'recycled' in title:
-            manufacturing *= 0.7  # Recycled materials reduce footprint
-        elif 'organic' in title:
-            manufacturing *= 0.9  # Organic materials typically lower impact
-
-        # Calculate other components
-        packaging = manufacturing * 0.05  # 5% of manufacturing emissions
-
-        # Enhanced shipping calculation based on product weight/size and distance
-        shipping_base = 5  # Base shipping emissions
-        if category in ['appliance', 'furniture', 'automotive']:
-            shipping_base = 25  # Heavy items
-        elif category in ['laptop', 'gaming', 'camera']:
-            shipping_base = 15  # Medium items
-        elif category in ['smartphone', 'book', 'beauty']:
-            shipping_base = 8   # Light items
-
-        # Add regional shipping factor
-        site = product_data.get('site', 'US')
-        shipping_multipliers = {
-            'US': 1.0, 'CA': 1.1, 'UK': 1.2, 'DE': 1.15, 'FR': 1.15,
-            'IT': 1.2, 'ES': 1.2, 'AU': 1.4, 'JP': 1.3, 'IN': 0.8, 'BR': 1.3, 'MX': 1.1
-        }
-        shipping = shipping_base * shipping_multipliers.get(site, 1.0)
-
-        # Usage emissions (annual) - based on energy consumption
-        usage_factors = {
-            'smartphone': 8,      # ~8kg CO2/year
-            'laptop': 125,        # ~125kg CO2/year
-            'tablet': 15,         # ~15kg CO2/year
-            'gaming': 200,        # ~200kg CO2/year (high energy use)
-            'appliance': 300,     # Varies widely by appliance
-            'smartwatch': 2,      # Minimal energy use
-            'headphones': 1,      # Minimal energy use
-            'camera': 5,          # Occasional charging
-            'electronics': 20     # Generic electronics
-        }
-        usage = usage_factors.get(category, 0)  # Annual usage emissions
-
-        # End-of-life emissions (recycling/disposal)
-        end_of_life = manufacturing * 0.02  # 2% for proper recycling
-
-        total = manufacturing + packaging + shipping + usage + end_of_life
-
-        # Enhanced secondhand savings calculation
-        # Manufacturing avoided: 85-95% (product already exists)
-        # Packaging: 50% (usually repackaged)
-        # Shipping: same or slightly higher (might need multiple shipments)
-        # Usage: same (user behavior doesn't change)
-        # End of life: same (still needs disposal eventually)
-
-        manufacturing_savings = manufacturing * 0.90  # 90% of manufacturing avoided
-        packaging_savings = packaging * 0.50          # 50% of packaging avoided
-        shipping_savings = 0                          # No shipping savings (might be higher)
-
-        total_secondhand_savings = manufacturing_savings + packaging_savings
-        secondhand_total = total - total_secondhand_savings
-        savings_percentage = round((total_secondhand_savings / total) * 100)
-
-        # Enhanced comparisons with more relatable metrics
-        return {
-            'newProduct': {
-                'total': round(total, 1),
-                'breakdown': {
-                    'manufacturing': round(manufacturing, 1),
-                    'packaging': round(packaging, 1),
-                    'shipping': round(shipping, 1),
-                    'annualUsage': round(usage, 1),
-                    'endOfLife': round(end_of_life, 1)
-                },
-                'methodology': 'Based on lifecycle assessment studies and industry data'
-            },
-            'secondhandAlternative': {
-                'total': round(secondhand_total, 1),
-                'savings': round(total_secondhand_savings, 1),
-                'savingsPercentage': savings_percentage
-            },
-            'comparisons': {
-                'treesEquivalent': round(total_secondhand_savings / 22, 1),  # 1 tree absorbs 22kg CO2/year
-                'carMilesEquivalent': round(total_secondhand_savings * 2.31, 0),  # EPA: 1kg CO2 = 2.31 miles
-                'homeEnergyDays': round(total_secondhand_savings / 11.9, 1),  # US avg home: 11.9kg CO2/day
-                'flights': round(total_secondhand_savings / 90, 2),  # Short flight: ~90kg CO2
-                'streamingHours': round(total_secondhand_savings / 0.0036, 0)  # 1 hour Netflix: ~3.6g CO2
-            },
-            'tips': [
-                f'Choosing secondhand avoids {round(manufacturing_savings, 1)}kg of manufacturing emissions',
-                'Extend product lifespan through proper care and maintenance',
-                'Recycle responsibly at end of life to minimize disposal impact',
-                f'This choice is equivalent to planting {round(total_secondhand_savings / 22, 1)} trees'
-            ],
-            'methodology': {
-                'source': 'Lifecycle Assessment (LCA) studies',
-                'factors': 'Manufacturing, packaging, shipping, usage, end-of-life',
-                'adjustments': 'Price, brand, materials, regional factors'
-            }
-        }
-
     def generate_social_impact_data(self, product_data):
         """Generate social impact and community data"""
+        rng = self.rng(self.product_context(product_data), 'socialImpact')
         return {
             'communityStats': {
-                'usersThisMonth': random.randint(1200, 5000),
-                'co2SavedCommunity': round(random.uniform(500, 2000), 1),
-                'itemsReusedCommunity': random.randint(150, 800),
-                'moneySavedCommunity': random.randint(15000, 75000)
+                'usersThisMonth': rng.randint(1200, 5000),
+                'co2SavedCommunity': round(rng.uniform(500, 2000), 1),
+                'itemsReusedCommunity': rng.randint(150, 800),
+                'moneySavedCommunity': rng.randint(15000, 75000)
             },
             'yourRanking': {
-                'percentile': random.randint(15, 85),
-                'rank': random.randint(50, 500),
-                'totalUsers': random.randint(1000, 5000)
+                'percentile': rng.randint(15, 85),
+                'rank': rng.randint(50, 500),
+                'totalUsers': rng.randint(1000, 5000)
             },
             'shareableStats': {
                 'achievement': "🌱 Chose sustainable alternative",
-                'impact': f"Saved {random.uniform(2, 8):.1f}kg CO₂",
-                'hashtags': ["#SustainableShopping", "#CartHero", "#EcoFriendly", "#ClimateAction"]
+                'impact': f"Saved {rng.uniform(2, 8):.1f}kg CO₂",
+                'hashtags': SHARE_HASHTAGS
             },
-            'challenges': {
-                'weekly': "Save 10kg CO₂ this week",
-                'monthly': "Choose 5 secondhand items this month",
-                'community': "Help CartHero community save 1000kg CO₂"
-            }
+            'challenges': COMMUNITY_CHALLENGES
         }
 
     def create_price_alert(self, product_data, alert_data):
-        """Create price tracking alert for a product"""
-        price = self.extract_price_number(product_data.get('price', ''))
-        target_price = alert_data.get('targetPrice', price * 0.8 if price else 50)
+        """Create a persistent price tracking alert for a product"""
+        product = self.product_context(product_data)
+        alert = self.price_alerts.create(product.catalog_key, product.site, product.title,
+                                         product.price, alert_data)
+        return alert.to_dict()
+
+    def observe_price(self, product):
+        """Record the product's current price and fire the alerts it crosses"""
+        # A throttled repeat of an unchanged price has already been evaluated
+        if not self.price_history.record(product.catalog_key, product.site, product.price):
+            return []
+        return self.price_alerts.evaluate(product.catalog_key, product.site, price=product.price)
 
-        return {
-            'alertId': f"alert_{random.randint(1000, 9999)}",
-            'productTitle': product_data.get('title', 'Unknown Product'),
-            'currentPrice': price,
-            'targetPrice': target_price,
-            'discount': f"{((price - target_price) / price * 100):.0f}%" if price else "20%",
-            'frequency': alert_data.get('frequency', 'daily'),
-            'alertTypes': alert_data.get('alertTypes', ['price_drop', 'sustainability_improvement']),
-            'created': datetime.now().isoformat(),
-            'status': 'active',
-            'sustainabilityThreshold': alert_data.get('sustainabilityThreshold', 70)
-        }
+    def get_price_history(self, product_data, days=30):
+        """Observed price history and analytics from the persistent price store"""
+        product = self.product_context(product_data)
+        current_price = product.price
 
-    def get_price_history(self, product_data):
-        """Generate mock price history for tracking"""
-        current_price = self.extract_price_number(product_data.get('price', ''))
-        if not current_price:
-            current_price = random.uniform(50, 500)
-
-        # Generate 30 days of price history
-        history = []
-        base_price = current_price
-
-        for i in range(30, 0, -1):
-            # Add some realistic price fluctuation
-            variation = random.uniform(0.85, 1.15)
-            price = base_price * variation
-
-            date = datetime.now().replace(day=max(1, datetime.now().day - i))
-            history.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'price': round(price, 2),
-                'sustainability_score': random.randint(45, 85)
-            })
+        rollups = self.price_history.daily(product.catalog_key, product.site, days)
+        if not rollups:
+            return None
 
-        # Analyze trends
-        prices = [h['price'] for h in history]
-        current_trend = 'stable'
+        history = [{
+            'date': row['day'],
+            'price': round(row['total'] / row['samples'], 2),
+            'low': row['low'],
+            'high': row['high'],
+            'samples': row['samples']
+        } for row in rollups]
+
+        if current_price is None:
+            current_price = rollups[-1]['close']
+
+        # Trend compares the last 7 calendar days with the 7 before them
+        window = window_days(14)
+        recent_days, older_days = set(window[7:]), set(window[:7])
+        recent = [row for row in rollups if row['day'] in recent_days]
+        older = [row for row in rollups if row['day'] in older_days]
 
-        if len(prices) >= 7:
-            recent_avg = sum(prices[-7:]) / 7
-            older_avg = sum(prices[-14:-7]) / 7
+        def average(rows):
+            return sum(row['total'] for row in rows) / sum(row['samples'] for row in rows)
 
+        current_trend = 'stable'
+        predicted = current_price
+        if recent and older:
+            recent_avg, older_avg = average(recent), average(older)
             if recent_avg < older_avg * 0.95:
                 current_trend = 'decreasing'
             elif recent_avg > older_avg * 1.05:
                 current_trend = 'increasing'
+            predicted = recent_avg + (recent_avg - older_avg)
+
+        # Share of day-to-day moves that were drops
+        closes = [row['close'] for row in rollups]
+        moves = [later - earlier for earlier, later in zip(closes, closes[1:]) if later != earlier]
+        drop_probability = round(100 * sum(1 for move in moves if move < 0) / len(moves)) if moves else 50
 
+        lowest = min(row['low'] for row in rollups)
         return {
             'history': history,
             'analytics': {
-                'lowestPrice': min(prices),
-                'highestPrice': max(prices),
-                'averagePrice': round(sum(prices) / len(prices), 2),
+                'lowestPrice': lowest,
+                'highestPrice': max(row['high'] for row in rollups),
+                'averagePrice': round(average(rollups), 2),
                 'currentTrend': current_trend,
-                'predictedNextWeek': round(current_price * random.uniform(0.9, 1.1), 2),
-                'priceDropProbability': random.randint(20, 80)
+                'predictedNextWeek': round(predicted, 2),
+                'priceDropProbability': drop_probability,
+                'observations': sum(row['samples'] for row in rollups)
             },
             'alerts': {
-                'recommended_target': round(min(prices) * 1.05, 2),
+                'recommended_target': round(lowest * 1.05, 2),
                 'deal_threshold': round(current_price * 0.85, 2)
             }
         }
 
     def generate_sustainability_alerts(self, product_data):
         """Generate sustainability-based alerts and recommendations"""
-        category = self.extract_product_category(product_data.get('title', ''),
-                                                product_data.get('brand', ''))
+        product = self.product_context(product_data)
+        category = product.category
 
         alerts = []
 
@@ -687,7 +347,7 @@ class CartHeroAPI:
             })
 
         # Product-specific alerts
-        title = product_data.get('title', '').lower()
+        title = product.title_lower
 
         if 'phone' in title or 'smartphone' in title:
             alerts.append({
@@ -710,7 +370,7 @@ class CartHeroAPI:
             })
 
         # Price-sustainability combo alerts
-        price = self.extract_price_number(product_data.get('price', ''))
+        price = product.price
         if price and price > 300:
             alerts.append({
                 'type': 'combo',
@@ -723,80 +383,622 @@ class CartHeroAPI:
 
         return {
             'active_alerts': alerts,
-            'alert_settings': {
-                'price_drop_threshold': 15,  # percentage
-                'sustainability_improvement_threshold': 10,  # score points
-                'new_alternatives_notification': True,
-                'weekly_impact_summary': True
-            },
+            'alert_settings': ALERT_SETTINGS,
             'personalized_tips': [
                 f'Based on your {category} browsing, consider setting alerts for similar items',
-                'Users like you save an average of $200/month with price tracking',
-                'Sustainability scores for this category typically improve by 20% during sales'
+                *ALERT_TIPS
             ]
         }
 
 api = CartHeroAPI()
+response_cache = ResponseCache(max_products=int(os.environ.get('CARTHERO_CACHE_SIZE', 1024)))
 
-@app.route('/api/sustainability', methods=['POST'])
+def cache_section(fingerprint, section, value, generation=None):
+    """Cache a generated section, pre-encoded so cache hits splice its bytes; returns what was cached.
+
+    Pass the response_cache.generation read before generating the value: if
+    reference data was swapped in since, the value is returned but not cached.
+    """
+    if FAST_JSON:
+        value = static(value)
+    response_cache.set(fingerprint, section, value, generation=generation)
+    return value
+
+def load_precomputed_scores(path):
+    if not path:
+        return None
+    try:
+        # .idx files are memory-mapped and shared by every worker process;
+        # .npz files are loaded into each process's memory
+        scores = PrecomputedScores(path) if path.endswith('.npz') else MappedIndex(path)
+        print(f"Loaded {len(scores)} precomputed products from {path}")
+        return scores
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not load precomputed scores from {path}: {e}")
+        return None
+
+precomputed_scores = load_precomputed_scores(os.environ.get('CARTHERO_PRECOMPUTED'))
+
+def swap_reference_data(reference_data):
+    """Install freshly built reference data; called from the watcher thread"""
+    previous = api.reference_data
+    api.reference_data = reference_data
+    api.index_reference_listings(reference_data, previous)
+    # Cached durability/shipping/secondhand sections were built from the old data
+    response_cache.invalidate()
+
+reference_watcher = ReferenceDataWatcher(
+    api.mock_data_dir, swap_reference_data,
+    interval=float(os.environ.get('CARTHERO_RELOAD_INTERVAL', 5)))
+
+BATCH_MAX_PRODUCTS = 100
+BATCH_DEADLINE_SECONDS = 10
+REFRESH_FETCH_TIMEOUT = 30
+
+SECTION_GENERATORS = [
+    ('secondhandOptions', api.generate_secondhand_options),
+    ('durability', api.generate_durability_info),
+    ('shipping', api.generate_shipping_options),
+    ('recommendations', api.generate_recommendations),
+    ('sustainabilityScore', api.calculate_ai_sustainability_score),
+    ('carbonFootprint', api.calculate_carbon_footprint),
+    ('socialImpact', api.generate_social_impact_data),
+    ('priceTracking', api.get_price_history),
+    ('sustainabilityAlerts', api.generate_sustainability_alerts)
+]
+
+SECTION_NAMES = [section for section, _ in SECTION_GENERATORS]
+
+def parse_fields(fields):
+    """Section names selected by a comma-separated `fields` value, in response order.
+
+    None (no selector) means every section. Raises ValueError for unknown names.
+    """
+    if fields is None:
+        return SECTION_NAMES
+    requested = {name.strip() for name in fields.split(',') if name.strip()}
+    if not requested:
+        raise ValueError("fields must name at least one section")
+    unknown = requested.difference(SECTION_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [section for section in SECTION_NAMES if section in requested]
+
+# Sections that depend on live marketplace data or the price store
+REFRESHED_SECTIONS = ('secondhandOptions', 'priceTracking')
+
+def refresh_product(product):
+    """Re-scrape listings and rebuild the live sections of one product into the cache"""
+    query = api.secondhand_search_query(product)
+    api.secondhand_fetcher.schedule(query).result(timeout=REFRESH_FETCH_TIMEOUT)
+    generation = response_cache.generation
+    for section, generator in SECTION_GENERATORS:
+        if section in REFRESHED_SECTIONS:
+            value = generator(product)
+            if value is not None:
+                cache_section(product.fingerprint, section, value, generation)
+
+refresh_scheduler = RefreshScheduler(
+    refresh_product,
+    top_n=int(os.environ.get('CARTHERO_REFRESH_TOP_N', 100)),
+    # Just under the secondhandOptions TTL, so hot products never expire
+    interval=float(os.environ.get('CARTHERO_REFRESH_INTERVAL', 240)),
+    rate=float(os.environ.get('CARTHERO_REFRESH_RATE', 2)))
+
+_services_pid = None
+
+def start_services():
+    """Open this process's database connections and start its background threads.
+
+    Everything built at import (reference data, the listing index,
+    precomputed scores) can be shared by forked workers, but threads do not
+    survive fork and SQLite connections must not cross it. A pre-forking
+    server therefore imports the app once and calls this in every worker
+    after fork (see gunicorn.conf.py). Safe to call repeatedly.
+    """
+    global _services_pid
+    if _services_pid == os.getpid():
+        return
+    api.price_history.reopen().start()
+    api.price_alerts.reopen().start(sync_interval=float(os.environ.get('CARTHERO_ALERT_SYNC_INTERVAL', 30)))
+    reference_watcher.start()
+    refresh_scheduler.start()
+    _services_pid = os.getpid()
+
+def stop_services():
+    """Stop background work and flush buffered price observations before the process exits"""
+    refresh_scheduler.stop()
+    reference_watcher.stop()
+    api.price_alerts.stop()
+    api.price_history.close()
+    api.marketplaces.shutdown()
+
+def create_app():
+    """The Flask app with this process's services running, for servers that do not fork after import"""
+    start_services()
+    return app
+
+def iter_sustainability_sections(product, sections=SECTION_NAMES, live_timeout=None, tolerate_errors=False,
+                                 generated=None):
+    """Yield (section, value, error) for the requested sections of one ProductContext,
+    then ('metadata', {...}, None).
+
+    Cached and precomputed sections are reused. `generated` holds sections
+    already computed for this product (the batch endpoint's vectorized
+    carbon footprints); they are used and cached in place of running the
+    generator. With `live_timeout` set,
+    secondhandOptions comes last and waits up to that long for live
+    listings; otherwise it never blocks on the scrape. With
+    `tolerate_errors`, a failing generator yields its error and the
+    remaining sections still run.
+    """
+    started = time.perf_counter()
+    fingerprint = product.fingerprint
+    generation = response_cache.generation
+    cached_sections = 0
+    produced = {}
+
+    # Every priced lookup is a price observation, even when priceTracking is cached
+    api.observe_price(product)
+    refresh_scheduler.touch(product)
+
+    secondhand_query = api.secondhand_search_query(product)
+    secondhand_pending = False
+
+    # Known catalog products come with their scoring sections precomputed
+    # (only for the price and site they were scored at)
+    precomputed = lookup_product(precomputed_scores, product) if precomputed_scores else None
+
+    # Only the selected generators run; the secondhand scrape is not even
+    # scheduled unless secondhandOptions was asked for
+    selected = [(section, generator) for section, generator in SECTION_GENERATORS if section in sections]
+    if live_timeout is not None:
+        selected.sort(key=lambda item: item[0] == 'secondhandOptions')
+
+    for section, generator in selected:
+        if precomputed and section in precomputed:
+            cached_sections += 1
+            produced[section] = precomputed[section]
+            yield section, precomputed[section], None
+            continue
+
+        value = response_cache.get(fingerprint, section)
+        if value is not None:
+            cached_sections += 1
+            produced[section] = value
+            yield section, value, None
+            continue
+
+        try:
+            if generated and section in generated:
+                value = generated[section]
+            else:
+                with latency.timer('carthero_section_duration_seconds', timing=section, section=section):
+                    if section == 'secondhandOptions' and live_timeout is not None:
+                        value = generator(product, wait_for_live=True, live_timeout=live_timeout)
+                    else:
+                        value = generator(product)
+        except Exception as e:
+            if not tolerate_errors:
+                raise
+            yield section, None, str(e)
+            continue
+
+        if section == 'secondhandOptions' and api.secondhand_fetcher.is_pending(secondhand_query):
+            # Fallback listings only; the live ones arrive via /api/secondhand-options
+            secondhand_pending = True
+        else:
+            value = cache_section(fingerprint, section, value, generation)
+        produced[section] = value
+        yield section, value, None
+
+    score = produced.get('sustainabilityScore')
+    if isinstance(score, dict) and score.get('overallScore') is not None:
+        api.price_alerts.evaluate(product.catalog_key, product.site,
+                                  sustainability_score=score['overallScore'])
+
+    if cached_sections == len(selected):
+        cache_status = 'hit'
+    elif cached_sections:
+        cache_status = 'partial'
+    else:
+        cache_status = 'miss'
+
+    metadata = {
+        'timestamp': datetime.now().isoformat(),
+        'apiVersion': '1.0.0',
+        'dataSource': 'mock',
+        'processingTime': round(time.perf_counter() - started, 4),
+        'cache': cache_status,
+        'precomputed': precomputed is not None,
+        'secondhandPending': secondhand_pending
+    }
+    if len(selected) < len(SECTION_GENERATORS):
+        metadata['fields'] = [section for section, _ in selected]
+
+    yield 'metadata', metadata, None
+
+def build_sustainability_response(product, sections=SECTION_NAMES, generated=None):
+    """Assemble the requested sections for one ProductContext, reusing cached sections"""
+    return {section: value for section, value, _ in
+            iter_sustainability_sections(product, sections, generated=generated)}
+
+def compact_section(fingerprint, section, value):
+    """Compact wire form of one section value.
+
+    Kept in the response cache next to the cached value it was made from, so
+    a cache hit also skips the conversion.
+    """
+    if section not in SECTION_NAMES:
+        return wire_format.compact(value)
+    key = f"{section}:compact"
+    cached = response_cache.get(fingerprint, key)
+    if cached is not None and cached[0] is value:
+        return cached[1]
+    compacted = wire_format.compact(value)
+    if FAST_JSON:
+        compacted = static(compacted)
+    response_cache.set(fingerprint, key, (value, compacted))
+    return compacted
+
+def compact_response(product, response_data):
+    """A sustainability (or secondhand-options) response in the compact wire format"""
+    result = {wire_format.CODES[key]: compact_section(product.fingerprint, key, value)
+              for key, value in response_data.items()}
+    result['_'] = wire_format.VERSION
+    return result
+
+class ApiError(Exception):
+    """A request error answered with `status` and a JSON body (`error` plus any extra fields)"""
+
+    def __init__(self, message, status=400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.payload = dict({'error': message}, **extra)
+
+WIRE_FORMATS = ('full', 'compact')
+
+def parse_wire_format(args):
+    """'full' or 'compact' from the `format` query parameter; raises ApiError"""
+    wire = args.get('format', 'full')
+    if wire not in WIRE_FORMATS:
+        raise ApiError(f"format must be one of: {', '.join(WIRE_FORMATS)}")
+    return wire
+
+def parse_number_arg(args, name, default):
+    """Finite, non-negative float query parameter `name` (`default` if absent); raises ApiError"""
+    value = args.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        number = float(value)
+    except ValueError:
+        raise ApiError(f'{name} must be a number')
+    if not math.isfinite(number) or number < 0:
+        raise ApiError(f'{name} must be a finite, non-negative number')
+    return number
+
+def sustainability_input(method, args, body):
+    """(ProductContext, sections) for a sustainability request; raises ApiError"""
+    if method == 'GET':
+        product_data = {key: value for key, value in args.items() if key not in ('fields', 'format')}
+        if not product_data.get('title'):
+            product_data = None
+    else:
+        product_data = body
+
+    if not product_data:
+        raise ApiError('No product data provided')
+
+    try:
+        sections = parse_fields(args.get('fields'))
+    except ValueError as e:
+        raise ApiError(str(e), fields=SECTION_NAMES)
+    return api.product_context(product_data), sections
+
+# Metadata that differs between otherwise identical responses; left out of the ETag
+VOLATILE_METADATA = ('timestamp', 'processingTime', 'cache')
+CACHE_MAX_AGE = int(os.environ.get('CARTHERO_CACHE_MAX_AGE', 300))
+
+def response_etag(response_data, wire='full'):
+    """Content hash of a sustainability response, ignoring per-request metadata"""
+    stable = dict(response_data)
+    metadata = stable.get('metadata')
+    if isinstance(metadata, dict):
+        stable['metadata'] = {key: value for key, value in metadata.items() if key not in VOLATILE_METADATA}
+    encoded = json.dumps(stable, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+    digest = hashlib.blake2b(encoded, digest_size=16).hexdigest()
+    return digest if wire == 'full' else f"{digest}-{wire}{wire_format.VERSION}"
+
+def cache_control(response_data):
+    metadata = response_data.get('metadata') or {}
+    # Fallback listings are about to be replaced by live ones: revalidate every time
+    return 'no-cache' if metadata.get('secondhandPending') else f'public, max-age={CACHE_MAX_AGE}'
+
+def cacheable_response(response_data, product=None, wire='full'):
+    """JSON response with a weak ETag; GET requests get Cache-Control and 304 replies.
+
+    Only meaningful in deterministic mode, where the same product always
+    produces the same content.
+    """
+    response = jsonify(response_data if wire == 'full' else compact_response(product, response_data))
+    if not api.deterministic:
+        return response
+
+    response.set_etag(response_etag(response_data, wire), weak=True)
+    if request.method == 'GET':
+        response.headers['Cache-Control'] = cache_control(response_data)
+    return response.make_conditional(request)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.timings = metrics.start_request()
+
+@app.after_request
+def record_request_latency(response):
+    """Request latency per route, recorded once the body is sent; optional Server-Timing header"""
+    started = g.get('request_started')
+    if started is None:
+        return response
+    if SERVER_TIMING and not response.is_streamed:
+        response.headers['Server-Timing'] = metrics.server_timing(g.timings, time.perf_counter() - started)
+
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    method = request.method
+    response.call_on_close(lambda: latency.observe(
+        'carthero_request_duration_seconds', time.perf_counter() - started, endpoint=endpoint, method=method))
+    return response
+
+@app.after_request
+def compress_response(response):
+    """gzip/brotli for JSON and NDJSON responses, as negotiated by Accept-Encoding"""
+    if not COMPRESSION or not compression.compressible(
+            response.status_code, response.mimetype, response.headers.get('Content-Encoding')):
+        return response
+
+    if not response.is_streamed and response.content_length is not None \
+            and response.content_length < COMPRESS_MIN_BYTES:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = compression.negotiate(request.headers.get('Accept-Encoding'), COMPRESSION)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compression.compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        response.set_data(compression.compress(response.get_data(), encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+@app.route('/api/sustainability', methods=['GET', 'POST'])
 def get_sustainability_data():
+    """Sustainability data for one product.
+
+    POST takes the product as a JSON body. GET takes title, brand, price and
+    site as query parameters so browsers and CDNs can cache the response and
+    revalidate it with If-None-Match.
+    """
+    try:
+        product, sections = sustainability_input(
+            request.method, request.args, request.json if request.method == 'POST' else None)
+        wire = parse_wire_format(request.args)
+        return cacheable_response(build_sustainability_response(product, sections), product, wire)
+
+    except ApiError as e:
+        return jsonify(e.payload), e.status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/sustainability/stream', methods=['POST'])
+def stream_sustainability_data():
+    """Sustainability data for one product, streamed as NDJSON one section per line.
+
+    Lines are {"section": name, "data": value} (or "error" instead of
+    "data"). Sections are written as soon as they are computed, with the
+    live secondhand listings last and the metadata line at the end.
+    """
     try:
         product_data = request.json
 
         if not product_data:
             return jsonify({'error': 'No product data provided'}), 400
 
-        response_data = {
-            'secondhandOptions': api.generate_secondhand_options(product_data),
-            'durability': api.generate_durability_info(product_data),
-            'shipping': api.generate_shipping_options(product_data),
-            'recommendations': api.generate_recommendations(product_data),
-            'sustainabilityScore': api.calculate_ai_sustainability_score(product_data),
-            'carbonFootprint': api.calculate_carbon_footprint(product_data),
-            'socialImpact': api.generate_social_impact_data(product_data),
-            'priceTracking': api.get_price_history(product_data),
-            'sustainabilityAlerts': api.generate_sustainability_alerts(product_data),
-            'metadata': {
-                'timestamp': datetime.now().isoformat(),
-                'apiVersion': '1.0.0',
-                'dataSource': 'mock',
-                'processingTime': random.uniform(0.1, 0.5)
-            }
-        }
+        try:
+            sections = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e), 'fields': SECTION_NAMES}), 400
 
-        return jsonify(response_data)
+        wire = parse_wire_format(request.args)
+        live_timeout = min(parse_number_arg(request.args, 'timeout', 10), 15)
+        product = api.product_context(product_data)
 
+    except ApiError as e:
+        return jsonify(e.payload), e.status
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/search-secondhand', methods=['GET'])
-def search_secondhand():
+    def generate():
+        for section, value, error in iter_sustainability_sections(
+                product, sections, live_timeout=live_timeout, tolerate_errors=True):
+            if error:
+                line = {'section': section, 'error': error}
+            elif wire == 'compact':
+                line = {'section': section, 'data': compact_section(product.fingerprint, section, value),
+                        '_': wire_format.VERSION}
+            else:
+                line = {'section': section, 'data': value}
+            yield app.json.dumps(line) + '\n'
+
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    # Keep reverse proxies from buffering the stream into one response
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/sustainability/batch', methods=['POST'])
+def get_sustainability_batch():
+    """Sustainability data for a whole cart or results page, streamed as NDJSON.
+
+    Duplicate products are computed once, and the carbon footprints of all
+    of them that are not cached come from one vectorized pass. Secondhand
+    scrapes for all distinct products run concurrently on the shared fetcher
+    pool (the global scrape budget), and each product's line is written as
+    soon as its listings are ready. Products still waiting at the deadline
+    are sent with fallback listings and `metadata.secondhandPending` set.
+    """
     try:
-        query = request.args.get('q', '')
-        limit = min(int(request.args.get('limit', 10)), 50)
-        marketplace = request.args.get('marketplace', 'all')
-
-        if not query:
-            return jsonify({'error': 'Query parameter required'}), 400
-
-        results = []
-        for i in range(limit):
-            results.append({
-                'title': f"Refurbished {query} - Option {i+1}",
-                'price': f"${random.uniform(50, 500):.2f}",
-                'condition': random.choice(['Excellent', 'Very Good', 'Good']),
-                'seller': f"Seller{i+1}",
-                'url': f"https://example.com/product/{i+1}",
-                'marketplace': random.choice(['eBay', 'BackMarket', 'Swappa'])
-            })
+        data = request.json
+        products = data.get('products') if isinstance(data, dict) else data
 
-        return jsonify({
-            'results': results,
-            'totalFound': random.randint(50, 200),
-            'query': query,
-            'marketplace': marketplace
-        })
+        if not products or not isinstance(products, list):
+            return jsonify({'error': 'A list of products is required'}), 400
+        if len(products) > BATCH_MAX_PRODUCTS:
+            return jsonify({'error': f'At most {BATCH_MAX_PRODUCTS} products per batch'}), 400
+
+        try:
+            sections = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e), 'fields': SECTION_NAMES}), 400
+        wire = parse_wire_format(request.args)
+        wants_secondhand = 'secondhandOptions' in sections
+
+        # Dedupe on the normalized fingerprint, remembering every input position
+        unique = {}
+        for index, product_data in enumerate(products):
+            if not isinstance(product_data, dict):
+                return jsonify({'error': f'Product {index} is not an object'}), 400
+            product = api.product_context(product_data)
+            if product.fingerprint in unique:
+                unique[product.fingerprint][1].append(index)
+            else:
+                unique[product.fingerprint] = (product, [index])
+
+        ready = []
+        waiting = {}
+        for product, indexes in unique.values():
+            fingerprint = product.fingerprint
+            query = api.secondhand_search_query(product)
+            if (not wants_secondhand
+                    or response_cache.get(fingerprint, 'secondhandOptions') is not None
+                    or api.secondhand_fetcher.peek(query) is not None):
+                ready.append((product, indexes))
+            else:
+                waiting[api.secondhand_fetcher.schedule(query)] = (product, indexes)
+
+        carbon = {}
+        if 'carbonFootprint' in sections:
+            missing = [product for product, _ in unique.values()
+                       if response_cache.get(product.fingerprint, 'carbonFootprint') is None]
+            if missing:
+                with latency.timer('carthero_section_duration_seconds', section='carbonFootprintBatch'):
+                    carbon = dict(zip((product.fingerprint for product in missing), api.carbon_footprints(missing)))
+
+    except ApiError as e:
+        return jsonify(e.payload), e.status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    def result_line(product, indexes):
+        try:
+            footprint = carbon.get(product.fingerprint)
+            data = build_sustainability_response(
+                product, sections, generated={'carbonFootprint': footprint} if footprint else None)
+            if wire == 'compact':
+                data = compact_response(product, data)
+            line = {'index': indexes[0], 'indexes': indexes, 'data': data}
+        except Exception as e:
+            line = {'index': indexes[0], 'indexes': indexes, 'error': str(e)}
+        return app.json.dumps(line) + '\n'
+
+    def generate():
+        for product, indexes in ready:
+            yield result_line(product, indexes)
+
+        remaining = dict(waiting)
+        try:
+            for future in as_completed(list(waiting), timeout=BATCH_DEADLINE_SECONDS):
+                product, indexes = remaining.pop(future)
+                yield result_line(product, indexes)
+        except FutureTimeoutError:
+            pass
+
+        for product, indexes in remaining.values():
+            yield result_line(product, indexes)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/secondhand-options', methods=['POST'])
+def get_live_secondhand_options():
+    """Follow-up call returning secondhand options once the live scrape finishes"""
+    try:
+        product_data = request.json
+
+        if not product_data:
+            return jsonify({'error': 'No product data provided'}), 400
 
+        wire = parse_wire_format(request.args)
+        timeout = min(parse_number_arg(request.args, 'timeout', 10), 15)
+        product = api.product_context(product_data)
+        query = api.secondhand_search_query(product)
+        generation = response_cache.generation
+        options = api.generate_secondhand_options(product, wait_for_live=True, live_timeout=timeout)
+        pending = api.secondhand_fetcher.is_pending(query)
+
+        if not pending:
+            options = cache_section(product.fingerprint, 'secondhandOptions', options, generation)
+
+        result = {
+            'secondhandOptions': options,
+            'pending': pending
+        }
+        return jsonify(result if wire == 'full' else compact_response(product, result))
+
+    except ApiError as e:
+        return jsonify(e.payload), e.status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def search_secondhand_result(args):
+    """One page of indexed secondhand listings for the query `args`; raises ApiError"""
+    query = args.get('q', '')
+    marketplace = args.get('marketplace', 'all')
+
+    if not query:
+        raise ApiError('Query parameter required')
+
+    try:
+        limit = max(1, min(int(args.get('limit', 10)), 50))
+        min_price = parse_number_arg(args, 'minPrice', None)
+        max_price = parse_number_arg(args, 'maxPrice', None)
+        page = api.listing_index.search(
+            query,
+            marketplace=None if marketplace.lower() == 'all' else marketplace,
+            condition=args.get('condition'),
+            category=args.get('category'),
+            min_price=min_price,
+            max_price=max_price,
+            limit=limit,
+            cursor=args.get('cursor'))
+    except ValueError as e:
+        raise ApiError(str(e))
+
+    # Only a query the index has nothing for starts a live marketplace fetch,
+    # whose listings are indexed for the next search
+    if not page['results'] and not args.get('cursor'):
+        api.secondhand_fetcher.peek(query)
+
+    return dict(page, query=query, marketplace=marketplace,
+                livePending=api.secondhand_fetcher.is_pending(query))
+
+@app.route('/api/search-secondhand', methods=['GET'])
+def search_secondhand():
+    try:
+        return jsonify(search_secondhand_result(request.args))
+    except ApiError as e:
+        return jsonify(e.payload), e.status
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -807,60 +1009,130 @@ def get_durability(product_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def emissions_result(args):
+    """Shipping emissions per delivery speed for the query `args`; raises ApiError"""
+    location = args.get('location', 'US')
+    weight = parse_number_arg(args, 'weight', 1.0)
+    distance = args.get('distance', 'regional')
+    carrier_name = args.get('carrier')
+    reference = api.reference_data
+
+    band = reference.weight_band(weight)
+    if band is None:
+        raise ApiError('Emissions reference data unavailable', status=503)
+    band_label, base_emissions = band
+
+    distance_multiplier = reference.distance_multiplier(distance)
+    if distance_multiplier is None:
+        raise ApiError(f"Unknown distance '{distance}'", distances=list(reference.distances))
+
+    multipliers = reference.shipping_multipliers
+    base_emissions *= distance_multiplier
+
+    result = {
+        'express': round(base_emissions * multipliers.get('express', 3.5), 2),
+        'standard': round(base_emissions * multipliers.get('standard', 2.0), 2),
+        'noRush': round(base_emissions * multipliers.get('no_rush', 1.0), 2),
+        'pickup': round(base_emissions * multipliers.get('pickup', 0.0), 2),
+        'location': location,
+        'weightBand': band_label,
+        'distance': distance,
+        'unit': 'kg CO₂'
+    }
+
+    if carrier_name:
+        carrier = reference.carrier(carrier_name)
+        if carrier is None:
+            raise ApiError(f"Unknown carrier '{carrier_name}'", carriers=list(reference.carriers))
+        result['carrier'] = dict(carrier, name=carrier_name.lower())
+
+    return result
+
 @app.route('/api/emissions', methods=['GET'])
 def get_emissions():
     try:
-        location = request.args.get('location', 'US')
-        weight = float(request.args.get('weight', 1.0))
-
-        base_emissions = random.uniform(0.5, 2.0) * weight
-
-        return jsonify({
-            'express': base_emissions * 3.5,
-            'standard': base_emissions * 2.0,
-            'noRush': base_emissions,
-            'pickup': 0.0,
-            'location': location,
-            'unit': 'kg CO₂'
-        })
-
+        return jsonify(emissions_result(request.args))
+    except ApiError as e:
+        return jsonify(e.payload), e.status
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def price_alert_result(data):
+    """Create the alert described by a request body; raises ApiError"""
+    if not isinstance(data, dict) or 'productData' not in data:
+        raise ApiError('Product data required')
+
+    alert_data = data.get('alertSettings') or {}
+    product_data = data['productData']
+    if not isinstance(product_data, dict):
+        raise ApiError('productData must be an object')
+    if not isinstance(alert_data, dict):
+        raise ApiError('alertSettings must be an object')
+
+    try:
+        return api.create_price_alert(product_data, alert_data)
+    except (TypeError, ValueError) as e:
+        raise ApiError(str(e))
+
 @app.route('/api/price-alert', methods=['POST'])
 def create_price_alert():
     try:
-        data = request.json
-        if not data or 'productData' not in data:
-            return jsonify({'error': 'Product data required'}), 400
+        return jsonify(price_alert_result(request.json))
+    except ApiError as e:
+        return jsonify(e.payload), e.status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        alert_data = data.get('alertSettings', {})
-        product_data = data['productData']
+@app.route('/api/price-alert/<alert_id>', methods=['GET'])
+def get_price_alert(alert_id):
+    try:
+        alert = api.price_alerts.get(alert_id)
+        if alert is None:
+            return jsonify({'error': 'Alert not found'}), 404
 
-        alert = api.create_price_alert(product_data, alert_data)
-        return jsonify(alert)
+        result = alert.to_dict()
+        result['events'] = api.price_alerts.events(alert_id)
+        return jsonify(result)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/price-history', methods=['POST'])
-def get_price_history():
+@app.route('/api/price-alert/<alert_id>', methods=['DELETE'])
+def delete_price_alert(alert_id):
     try:
-        product_data = request.json
-        if not product_data:
-            return jsonify({'error': 'Product data required'}), 400
+        alert = api.price_alerts.cancel(alert_id)
+        if alert is None:
+            return jsonify({'error': 'Alert not found'}), 404
+        return jsonify(alert.to_dict())
 
-        history = api.get_price_history(product_data)
-        return jsonify(history)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def price_history_result(product_data):
+    """30-day price analytics for a request body; raises ApiError"""
+    if not product_data:
+        raise ApiError('Product data required')
 
+    api.observe_price(api.product_context(product_data))
+    history = api.get_price_history(product_data)
+    if history is None:
+        raise ApiError('No price observations for this product', status=404)
+    return history
+
+@app.route('/api/price-history', methods=['POST'])
+def get_price_history():
+    try:
+        return jsonify(price_history_result(request.json))
+    except ApiError as e:
+        return jsonify(e.payload), e.status
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    return jsonify({
+def service_health():
+    return {
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
+        'pid': os.getpid(),
         'version': '1.0.0',
         'services': {
             'secondhand_search': 'operational',
@@ -868,8 +1140,30 @@ def health_check():
             'emissions_calculator': 'operational',
             'price_tracking': 'operational',
             'sustainability_alerts': 'operational'
-        }
-    })
+        },
+        'cache': response_cache.stats(),
+        'secondhandFetcher': api.secondhand_fetcher.stats(),
+        'marketplaceHttp': api.http_client.stats(),
+        'marketplaces': api.marketplaces.stats(),
+        'listingIndex': api.listing_index.stats(),
+        'precomputedProducts': len(precomputed_scores) if precomputed_scores else 0,
+        'referenceData': api.reference_data.stats(),
+        'referenceReload': reference_watcher.stats(),
+        'priceHistory': api.price_history.stats(),
+        'priceAlerts': api.price_alerts.stats(),
+        'backgroundRefresh': refresh_scheduler.stats(),
+        'compression': COMPRESSION,
+        'latency': latency.summary()
+    }
+
+@app.route('/api/health', methods=['GET'])
+def health_check():
+    return jsonify(service_health())
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Latency histograms of this process in the Prometheus text format"""
+    return Response(latency.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/', methods=['GET'])
 def index():
@@ -879,10 +1173,14 @@ def index():
         'description': 'Sustainable shopping data API',
         'endpoints': [
             '/api/sustainability',
+            '/api/sustainability/stream',
+            '/api/sustainability/batch',
+            '/api/secondhand-options',
             '/api/search-secondhand',
             '/api/durability/<product_id>',
             '/api/emissions',
-            '/api/health'
+            '/api/health',
+            '/metrics'
         ]
     })
 
@@ -890,9 +1188,15 @@ if __name__ == '__main__':
     print("Starting CartHero API Server...")
     print("Endpoints available:")
     print("  POST /api/sustainability - Get comprehensive sustainability data")
+    print("  POST /api/sustainability/stream - Sustainability data section by section (NDJSON stream)")
+    print("  POST /api/sustainability/batch - Sustainability data for many products (NDJSON stream)")
+    print("  POST /api/secondhand-options - Live secondhand listings (follow-up call)")
     print("  GET  /api/search-secondhand - Search secondhand options")
     print("  GET  /api/durability/<id> - Get durability information")
     print("  GET  /api/emissions - Calculate shipping emissions")
     print("  GET  /api/health - Health check")
+    print("  GET  /metrics - Latency histograms (Prometheus text format)")
+
+    print("Development server; use `gunicorn -c gunicorn.conf.py` in production")
 
-    app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
+    create_app().run(debug=True, host='0.0.0.0', port=int(os.environ.get('CARTHERO_PORT', 5001)))
\ No newline at end of file
@@ -0,0 +1,310 @@
+"""
+Async (ASGI) serving path for the overlay API.
+
+    cd backend && uvicorn asgi:app --host 0.0.0.0 --port 5001
+
+Serves the overlay routes of app.py from one event loop, on the same state
+app.py builds at import (reference data, caches, listing index, marketplace
+fetcher), so both paths give the same answers. Live marketplace listings
+are awaited on the fetcher's shared future instead of blocking a thread,
+so one worker process can hold thousands of overlay requests waiting on
+the same scrapes. Anything that touches SQLite runs on the thread pool:
+the price history and alert endpoints, and building a sustainability
+response (it records the observed price, evaluates alerts and reads the
+price history), which starts once the live wait is over.
+
+Responses are compressed as the Flask app's are (CompressionMiddleware),
+?format=compact selects the same compact wire format, and request
+latencies go to the same histograms (TimingMiddleware, /metrics).
+
+Unlike the Flask route, /api/sustainability waits up to
+CARTHERO_ASYNC_LIVE_WAIT seconds (default 2) for live listings before
+falling back, sparing the extension its follow-up call; waiting costs the
+server nothing here.
+"""
+
+import contextlib
+import json
+import os
+import time
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette import responses
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.routing import Match, Route
+
+import compression
+import fast_json
+import metrics
+from metrics import latency
+from app import (
+    COMPRESS_MIN_BYTES, COMPRESSION, FAST_JSON, SERVER_TIMING, ApiError, api, build_sustainability_response,
+    cache_control,
+    cache_section, compact_response, emissions_result, parse_number_arg, parse_wire_format, price_alert_result,
+    price_history_result, response_cache, response_etag, search_secondhand_result, service_health,
+    start_services, stop_services, sustainability_input
+)
+
+LIVE_WAIT = float(os.environ.get('CARTHERO_ASYNC_LIVE_WAIT', 2))
+
+
+class FastJSONResponse(responses.JSONResponse):
+    def render(self, content):
+        return fast_json.encode(content)
+
+
+JSONResponse = FastJSONResponse if FAST_JSON else responses.JSONResponse
+
+
+async def read_json(request):
+    body = await request.body()
+    if not body:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise ApiError('Request body must be JSON')
+
+
+def error_response(e):
+    if isinstance(e, ApiError):
+        return JSONResponse(e.payload, status_code=e.status)
+    return JSONResponse({'error': str(e)}, status_code=500)
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    # If-None-Match uses weak comparison
+    return '*' in tags or etag.removeprefix('W/') in (tag.removeprefix('W/') for tag in tags)
+
+
+def cacheable_response(request, response_data, product=None, wire='full'):
+    """Same validators as app.cacheable_response: weak ETag, and for GET Cache-Control and 304"""
+    body = response_data if wire == 'full' else compact_response(product, response_data)
+    if not api.deterministic:
+        return JSONResponse(body)
+
+    etag = f'W/"{response_etag(response_data, wire)}"'
+    headers = {'ETag': etag}
+    if request.method == 'GET':
+        headers['Cache-Control'] = cache_control(response_data)
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return Response(status_code=304, headers=headers)
+    return JSONResponse(body, headers=headers)
+
+
+async def sustainability(request):
+    try:
+        body = await read_json(request) if request.method == 'POST' else None
+        product, sections = sustainability_input(request.method, request.query_params, body)
+        wire = parse_wire_format(request.query_params)
+
+        if (LIVE_WAIT > 0 and 'secondhandOptions' in sections
+                and response_cache.get(product.fingerprint, 'secondhandOptions') is None):
+            await api.secondhand_fetcher.fetch_async(api.secondhand_search_query(product), timeout=LIVE_WAIT)
+
+        response_data = await run_in_threadpool(build_sustainability_response, product, sections)
+        return cacheable_response(request, response_data, product, wire)
+    except Exception as e:
+        return error_response(e)
+
+
+async def secondhand_options(request):
+    """Follow-up call returning secondhand options once the live scrape finishes"""
+    try:
+        product_data = await read_json(request)
+        if not product_data:
+            raise ApiError('No product data provided')
+
+        wire = parse_wire_format(request.query_params)
+        timeout = min(parse_number_arg(request.query_params, 'timeout', 10), 15)
+        product = api.product_context(product_data)
+        query = api.secondhand_search_query(product)
+        await api.secondhand_fetcher.fetch_async(query, timeout=timeout)
+
+        generation = response_cache.generation
+        options = api.generate_secondhand_options(product)
+        pending = api.secondhand_fetcher.is_pending(query)
+        if not pending:
+            options = cache_section(product.fingerprint, 'secondhandOptions', options, generation)
+
+        result = {
+            'secondhandOptions': options,
+            'pending': pending
+        }
+        return JSONResponse(result if wire == 'full' else compact_response(product, result))
+    except Exception as e:
+        return error_response(e)
+
+
+async def search_secondhand(request):
+    try:
+        return JSONResponse(search_secondhand_result(request.query_params))
+    except Exception as e:
+        return error_response(e)
+
+
+async def emissions(request):
+    try:
+        return JSONResponse(emissions_result(request.query_params))
+    except Exception as e:
+        return error_response(e)
+
+
+async def price_history(request):
+    try:
+        return JSONResponse(await run_in_threadpool(price_history_result, await read_json(request)))
+    except Exception as e:
+        return error_response(e)
+
+
+async def create_price_alert(request):
+    try:
+        return JSONResponse(await run_in_threadpool(price_alert_result, await read_json(request)))
+    except Exception as e:
+        return error_response(e)
+
+
+async def price_alert(request):
+    try:
+        alert_id = request.path_params['alert_id']
+        if request.method == 'DELETE':
+            alert = await run_in_threadpool(api.price_alerts.cancel, alert_id)
+            if alert is None:
+                raise ApiError('Alert not found', status=404)
+            return JSONResponse(alert.to_dict())
+
+        alert = await run_in_threadpool(api.price_alerts.get, alert_id)
+        if alert is None:
+            raise ApiError('Alert not found', status=404)
+        result = alert.to_dict()
+        result['events'] = await run_in_threadpool(api.price_alerts.events, alert_id)
+        return JSONResponse(result)
+    except Exception as e:
+        return error_response(e)
+
+
+async def health(request):
+    return JSONResponse(dict(service_health(), server='asgi'))
+
+
+async def prometheus_metrics(request):
+    return Response(latency.prometheus(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class CompressionMiddleware:
+    """gzip/brotli for JSON responses, as negotiated by Accept-Encoding; see app.compress_response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not COMPRESSION:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = compression.negotiate(Headers(scope=scope).get('accept-encoding'), COMPRESSION)
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message['type'] == 'http.response.start':
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+
+            # First body message: every route here answers with a single one
+            headers = MutableHeaders(raw=start['headers'])
+            body = message.get('body', b'')
+            if (not message.get('more_body') and len(body) >= COMPRESS_MIN_BYTES
+                    and compression.compressible(start['status'], headers.get('content-type'),
+                                                 headers.get('content-encoding'))):
+                headers.add_vary_header('Accept-Encoding')
+                if encoding is not None:
+                    body = compression.compress(body, encoding)
+                    headers['Content-Encoding'] = encoding
+                    headers['Content-Length'] = str(len(body))
+                    message = dict(message, body=body)
+            await send(start)
+            start = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+
+class TimingMiddleware:
+    """Request latency per route and the optional Server-Timing header; see app.record_request_latency"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings = metrics.start_request()
+
+        async def send_timed(message):
+            if message['type'] == 'http.response.start' and SERVER_TIMING:
+                headers = MutableHeaders(raw=message['headers'])
+                headers['Server-Timing'] = metrics.server_timing(timings, time.perf_counter() - started)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            latency.observe('carthero_request_duration_seconds', time.perf_counter() - started,
+                            endpoint=route_path(scope), method=scope['method'])
+
+
+def route_path(scope):
+    """Path template of the route `scope` goes to, so alert ids do not become label values"""
+    for route in ROUTES:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return 'unmatched'
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # One process per uvicorn worker, so services start here rather than after a fork
+    start_services()
+    yield
+    stop_services()
+
+
+ROUTES = [
+    Route('/api/sustainability', sustainability, methods=['GET', 'POST']),
+    Route('/api/secondhand-options', secondhand_options, methods=['POST']),
+    Route('/api/search-secondhand', search_secondhand, methods=['GET']),
+    Route('/api/emissions', emissions, methods=['GET']),
+    Route('/api/price-history', price_history, methods=['POST']),
+    Route('/api/price-alert', create_price_alert, methods=['POST']),
+    Route('/api/price-alert/{alert_id}', price_alert, methods=['GET', 'DELETE']),
+    Route('/api/health', health, methods=['GET']),
+    Route('/metrics', prometheus_metrics, methods=['GET'])
+]
+
+app = Starlette(
+    routes=ROUTES,
+    middleware=[
+        # Same origins as the Flask app's CORS settings
+        Middleware(CORSMiddleware,
+                   allow_origin_regex=r'(chrome-extension://.*|http://(localhost|127\.0\.0\.1)(:\d+)?|file://.*)',
+                   allow_methods=['GET', 'POST', 'DELETE'], allow_headers=['*']),
+        Middleware(CompressionMiddleware),
+        Middleware(TimingMiddleware)
+    ],
+    lifespan=lifespan
+)
@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# Seconds each section of the sustainability response stays fresh.
+# Live marketplace listings go stale quickly, while the LCA-based carbon
+# numbers only change when the product itself changes.
+DEFAULT_SECTION_TTLS = {
+    'secondhandOptions': 300,
+    'priceTracking': 900,
+    'sustainabilityAlerts': 3600,
+    'socialImpact': 3600,
+    'shipping': 3600,
+    'recommendations': 3600,
+    'durability': 86400,
+    'sustainabilityScore': 86400,
+    'carbonFootprint': 86400
+}
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of response sections with per-section TTLs"""
+
+    def __init__(self, max_products=1024, section_ttls=None, default_ttl=600):
+        self.max_products = max_products
+        self.section_ttls = dict(DEFAULT_SECTION_TTLS)
+        if section_ttls:
+            self.section_ttls.update(section_ttls)
+        self.default_ttl = default_ttl
+
+        # fingerprint -> {section: (expires_at, value)}, least recently used first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by invalidate(); a value built before then is not stored
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.section_hits = {}
+        self.section_misses = {}
+
+    def ttl_for(self, section):
+        # Derived entries ("section:variant") live as long as their section
+        return self.section_ttls.get(section.partition(':')[0], self.default_ttl)
+
+    def get(self, fingerprint, section):
+        """Return the cached section value, or None if missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            sections = self._entries.get(fingerprint)
+            cached = sections.get(section) if sections else None
+
+            if cached is None or cached[0] <= now:
+                if cached is not None:
+                    del sections[section]
+                self.misses += 1
+                self.section_misses[section] = self.section_misses.get(section, 0) + 1
+                return None
+
+            self._entries.move_to_end(fingerprint)
+            self.hits += 1
+            self.section_hits[section] = self.section_hits.get(section, 0) + 1
+            return cached[1]
+
+    def set(self, fingerprint, section, value, ttl=None, generation=None):
+        """Store a section; `generation` is the one read before building it, if any"""
+        if ttl is None:
+            ttl = self.ttl_for(section)
+        if ttl <= 0:
+            return
+
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            sections = self._entries.get(fingerprint)
+            if sections is None:
+                sections = {}
+                self._entries[fingerprint] = sections
+            else:
+                self._entries.move_to_end(fingerprint)
+            sections[section] = (expires_at, value)
+
+            while len(self._entries) > self.max_products:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, fingerprint=None):
+        with self._lock:
+            if fingerprint is None:
+                self._entries.clear()
+                self.generation += 1
+            else:
+                self._entries.pop(fingerprint, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'products': len(self._entries),
+                'maxProducts': self.max_products,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hitRate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'sections': {
+                    section: {
+                        'hits': self.section_hits.get(section, 0),
+                        'misses': self.section_misses.get(section, 0),
+                        'ttl': self.ttl_for(section)
+                    }
+                    for section in sorted(set(self.section_hits) | set(self.section_misses))
+                }
+            }
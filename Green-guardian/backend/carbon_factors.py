@@ -0,0 +1,55 @@
+"""Emission factor tables shared by the per-request and bulk carbon calculations"""
+
+# Enhanced base emissions by category (kg CO2) - based on real LCA studies
+BASE_EMISSIONS = {
+    'smartphone': 85,      # iPhone 14: ~70kg, Samsung Galaxy: ~95kg
+    'laptop': 350,         # MacBook: ~320kg, Dell laptop: ~380kg
+    'tablet': 125,         # iPad: ~120kg, Android tablet: ~130kg
+    'headphones': 15,      # AirPods: ~10kg, Over-ear: ~20kg
+    'smartwatch': 25,      # Apple Watch: ~22kg, Samsung: ~28kg
+    'gaming': 450,         # PS5: ~430kg, Xbox: ~470kg
+    'camera': 180,         # DSLR: ~170kg, Mirrorless: ~190kg
+    'appliance': 600,      # Varies widely: 400-800kg
+    'electronics': 100,    # Generic electronics
+    'clothing': 20,        # Average garment: 15-25kg
+    'book': 2.5,          # Physical book: ~2.5kg
+    'toy': 8,             # Plastic toy: ~5-12kg
+    'furniture': 150,      # Small furniture: 100-200kg
+    'jewelry': 50,        # Gold ring: ~40-60kg
+    'beauty': 5,          # Cosmetics: 3-8kg
+    'home': 25,           # Home goods: 20-30kg
+    'sports': 40,         # Sports equipment: 30-50kg
+    'automotive': 2000,   # Car parts: varies widely
+    'tools': 60          # Hand tools: 50-70kg
+}
+DEFAULT_BASE_EMISSIONS = 100
+
+PREMIUM_BRANDS = ['apple', 'samsung', 'sony', 'bose', 'dyson', 'tesla']
+ECO_BRANDS = ['fairphone', 'framework', 'patagonia', 'seventh generation']
+
+# Shipping emissions by product weight/size class
+SHIPPING_BASE = {
+    'appliance': 25, 'furniture': 25, 'automotive': 25,  # Heavy items
+    'laptop': 15, 'gaming': 15, 'camera': 15,            # Medium items
+    'smartphone': 8, 'book': 8, 'beauty': 8              # Light items
+}
+DEFAULT_SHIPPING_BASE = 5
+
+# Regional shipping factor
+SHIPPING_MULTIPLIERS = {
+    'US': 1.0, 'CA': 1.1, 'UK': 1.2, 'DE': 1.15, 'FR': 1.15,
+    'IT': 1.2, 'ES': 1.2, 'AU': 1.4, 'JP': 1.3, 'IN': 0.8, 'BR': 1.3, 'MX': 1.1
+}
+
+# Usage emissions (annual) - based on energy consumption
+USAGE_FACTORS = {
+    'smartphone': 8,      # ~8kg CO2/year
+    'laptop': 125,        # ~125kg CO2/year
+    'tablet': 15,         # ~15kg CO2/year
+    'gaming': 200,        # ~200kg CO2/year (high energy use)
+    'appliance': 300,     # Varies widely by appliance
+    'smartwatch': 2,      # Minimal energy use
+    'headphones': 1,      # Minimal energy use
+    'camera': 5,          # Occasional charging
+    'electronics': 20     # Generic electronics
+}
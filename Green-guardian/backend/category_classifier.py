@@ -0,0 +1,119 @@
+from collections import deque
+from functools import lru_cache
+
+
+# Ordered by priority: the first category with a keyword found in the title
+# or brand wins, and keywords within a category are checked in order.
+PRODUCT_CATEGORIES = [
+    ('smartphone', ['phone', 'iphone', 'samsung galaxy', 'pixel', 'smartphone']),
+    ('laptop', ['laptop', 'macbook', 'notebook', 'chromebook', 'thinkpad']),
+    ('tablet', ['tablet', 'ipad', 'surface']),
+    ('headphones', ['headphones', 'earbuds', 'airpods', 'beats']),
+    ('smartwatch', ['watch', 'smartwatch', 'apple watch', 'fitbit']),
+    ('gaming', ['ps5', 'xbox', 'nintendo', 'gaming', 'playstation']),
+    ('camera', ['camera', 'canon', 'nikon', 'sony camera']),
+    ('appliance', ['refrigerator', 'washer', 'dryer', 'microwave', 'dishwasher'])
+]
+
+DEFAULT_CATEGORY = 'electronics'
+
+
+class CategoryClassifier:
+    """Aho-Corasick automaton over every category keyword.
+
+    Built once; classifying a title is a single pass over its characters
+    regardless of how many keywords the taxonomy holds. Each automaton state
+    stores the best (lowest) priority of any keyword ending there, so the
+    result matches checking the categories and keywords in order.
+    """
+
+    def __init__(self, categories=PRODUCT_CATEGORIES, default=DEFAULT_CATEGORY, memo_size=4096):
+        self.default = default
+        self.categories = [name for name, _ in categories]
+        self.keyword_count = 0
+
+        # Keyword priority is its category's position; ties don't matter
+        # because any keyword of the winning category yields the same answer
+        self._goto = [{}]
+        self._best = [None]
+        for priority, (_, keywords) in enumerate(categories):
+            for keyword in keywords:
+                self._add(keyword.lower(), priority)
+                self.keyword_count += 1
+        self._build_failure_links()
+
+        self.classify = lru_cache(maxsize=memo_size)(self._classify)
+
+    def _add(self, keyword, priority):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._best.append(None)
+            state = next_state
+
+        if self._best[state] is None or priority < self._best[state]:
+            self._best[state] = priority
+
+    def _build_failure_links(self):
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                fail[next_state] = target if target != next_state else 0
+
+                # Inherit keywords that end inside this one (suffix matches)
+                inherited = self._best[fail[next_state]]
+                if inherited is not None and (self._best[next_state] is None
+                                              or inherited < self._best[next_state]):
+                    self._best[next_state] = inherited
+
+        self._fail = fail
+
+    def _best_priority(self, text, best):
+        goto = self._goto
+        fail = self._fail
+        priorities = self._best
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            priority = priorities[state]
+            if priority is not None and (best is None or priority < best):
+                best = priority
+                if best == 0:
+                    break
+
+        return best
+
+    def _classify(self, title_lower, brand_lower):
+        best = self._best_priority(title_lower, None)
+        if best != 0 and brand_lower:
+            best = self._best_priority(brand_lower, best)
+        return self.categories[best] if best is not None else self.default
+
+    def category_for(self, title, brand=''):
+        return self.classify((title or '').lower(), (brand or '').lower())
+
+    def stats(self):
+        info = self.classify.cache_info()
+        return {
+            'keywords': self.keyword_count,
+            'states': len(self._goto),
+            'memoHits': info.hits,
+            'memoMisses': info.misses
+        }
@@ -0,0 +1,125 @@
+import io
+import re
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+
+# Class patterns are compiled once at import instead of once per listing
+ITEM_CLASS = re.compile(r's-item.*')
+TITLE_CLASS = re.compile(r's-item__title.*')
+LINK_CLASS = re.compile(r's-item__link.*')
+PRICE_CLASS = re.compile(r's-item__price.*')
+PRICE_FALLBACK_CLASS = re.compile(r'notranslate.*')
+SUBTITLE_CLASS = re.compile(r's-item__subtitle.*')
+SHIPPING_CLASS = re.compile(r's-item__shipping.*')
+
+ITEM_TAGS = ('div', 'li')
+
+
+def _text(element):
+    return ''.join(part.strip() for part in element.itertext())
+
+
+def _extract_fields(item):
+    """Collect every listing field in a single walk over the item subtree"""
+    title = link_title = price = price_fallback = link = condition = shipping = None
+
+    for element in item.iter():
+        tag = element.tag
+        if not isinstance(tag, str):
+            continue
+        classes = element.get('class')
+        if not classes:
+            continue
+
+        if tag == 'h3':
+            if title is None and TITLE_CLASS.search(classes):
+                title = _text(element)
+        elif tag == 'a':
+            if link is None and LINK_CLASS.search(classes):
+                link = element.get('href')
+                link_title = _text(element)
+        elif tag == 'span':
+            if price is None and PRICE_CLASS.search(classes):
+                price = _text(element)
+            elif price_fallback is None and PRICE_FALLBACK_CLASS.search(classes):
+                price_fallback = _text(element)
+            elif condition is None and SUBTITLE_CLASS.search(classes):
+                condition = _text(element)
+            elif shipping is None and SHIPPING_CLASS.search(classes):
+                shipping = _text(element)
+
+    return {
+        'title': title if title is not None else link_title,
+        'price': price if price is not None else price_fallback,
+        'link': link,
+        'condition': condition,
+        'shipping': shipping
+    }
+
+
+def parse_listings(html, max_results=3):
+    """Streaming parse that stops after the first `max_results` listings.
+
+    Only the outermost `s-item` containers are materialized; the rest of
+    the search page is never built into a tree.
+    """
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+
+    listings = []
+    if max_results <= 0 or not html:
+        return listings
+
+    current = None
+    parser = etree.iterparse(io.BytesIO(html), events=('start', 'end'), html=True,
+                             recover=True, no_network=True)
+    try:
+        for event, element in parser:
+            if event == 'start':
+                if (current is None and element.tag in ITEM_TAGS
+                        and ITEM_CLASS.search(element.get('class', ''))):
+                    current = element
+            elif element is current:
+                listings.append(_extract_fields(element))
+                current = None
+                element.clear()
+                if len(listings) >= max_results:
+                    break
+            elif current is None:
+                # Drop finished subtrees outside listings to keep memory flat
+                element.clear()
+    except etree.XMLSyntaxError:
+        pass
+
+    return listings
+
+
+def parse_listings_bs4(html, max_results=3):
+    """Original BeautifulSoup implementation, kept for comparison benchmarks"""
+    soup = BeautifulSoup(html, 'html.parser')
+    listings = []
+
+    for listing in soup.find_all('div', {'class': ITEM_CLASS})[:max_results]:
+        title_elem = listing.find('h3', {'class': TITLE_CLASS}) or listing.find('a', {'class': LINK_CLASS})
+        price_elem = listing.find('span', {'class': PRICE_CLASS}) or listing.find('span', {'class': PRICE_FALLBACK_CLASS})
+        link_elem = listing.find('a', {'class': LINK_CLASS})
+        condition_elem = listing.find('span', {'class': SUBTITLE_CLASS})
+        shipping_elem = listing.find('span', {'class': SHIPPING_CLASS})
+
+        listings.append({
+            'title': title_elem.get_text(strip=True) if title_elem else None,
+            'price': price_elem.get_text(strip=True) if price_elem else None,
+            'link': link_elem.get('href') if link_elem else None,
+            'condition': condition_elem.get_text(strip=True) if condition_elem else None,
+            'shipping': shipping_elem.get_text(strip=True) if shipping_elem else None
+        })
+
+    return listings
+
+
+PARSERS = {
+    'lxml': parse_listings,
+    'bs4': parse_listings_bs4
+}
@@ -0,0 +1,112 @@
+"""
+Fast JSON encoding for API responses.
+
+Parts of a sustainability response are the same every time: constant blocks
+such as methodology, community challenges, hashtags and alert settings,
+and every section served from the response cache. Wrapping such a value in
+static() encodes it once; the encoder splices those bytes into each
+response instead of encoding the structure again. Everything else is
+encoded with orjson when it is installed, and with the standard library
+otherwise (without splicing).
+
+Static values are dict/list subclasses, so every other consumer (stdlib
+json, ETag hashing, the response cache) sees ordinary values. They are
+shared between responses and must not be mutated.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from flask.json.provider import DefaultJSONProvider
+
+# Stands in for each static value in orjson's output. A user string can equal
+# it (titles and brands are not checked for NULs), so encode() counts the
+# placeholders before splicing and encodes in full when there are extra ones
+_PLACEHOLDER = '\x00static\x00'
+_ENCODED_PLACEHOLDER = b'"\\u0000static\\u0000"'
+
+
+class StaticDict(dict):
+    __slots__ = ('encoded',)
+
+
+class StaticList(list):
+    __slots__ = ('encoded',)
+
+
+STATIC_TYPES = {dict: StaticDict, list: StaticList}
+
+
+def static(value, sort_keys=True):
+    """`value` with its encoding computed once; other types than dict and list pass through"""
+    static_type = STATIC_TYPES.get(type(value))
+    if static_type is None:
+        return value
+    frozen = static_type(value)
+    frozen.encoded = encode(value, sort_keys=sort_keys)
+    return frozen
+
+
+def _plain(value):
+    """JSON-native form of values orjson hands to `default`"""
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    if isinstance(value, str):
+        return str(value)
+    if isinstance(value, int):
+        return int(value)
+    if hasattr(value, 'item'):
+        # NumPy scalars from the precomputed score files
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode(obj, sort_keys=True):
+    """UTF-8 JSON bytes for `obj`, splicing in the pre-encoded static values"""
+    if orjson is None:
+        return json.dumps(obj, sort_keys=sort_keys, separators=(',', ':'), ensure_ascii=False,
+                          default=_plain).encode('utf-8')
+
+    fragments = []
+
+    def default(value):
+        encoded = getattr(value, 'encoded', None)
+        if encoded is None:
+            return _plain(value)
+        fragments.append(encoded)
+        return _PLACEHOLDER
+
+    options = orjson.OPT_PASSTHROUGH_SUBCLASS | orjson.OPT_NON_STR_KEYS
+    if sort_keys:
+        options |= orjson.OPT_SORT_KEYS
+    encoded = orjson.dumps(obj, default=default, option=options)
+    if not fragments:
+        return encoded
+
+    pieces = encoded.split(_ENCODED_PLACEHOLDER)
+    if len(pieces) != len(fragments) + 1:
+        # Some string in `obj` is the placeholder itself: splicing would replace it
+        return orjson.dumps(obj, default=_plain, option=options)
+
+    # Placeholders come out in the order default() saw them: interleave
+    spliced = [None] * (2 * len(pieces) - 1)
+    spliced[0::2] = pieces
+    spliced[1::2] = fragments
+    return b''.join(spliced)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider using encode(); keys stay sorted like the default provider"""
+
+    def dumps(self, obj, **kwargs):
+        return encode(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys)).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(encode(obj, sort_keys=self.sort_keys), mimetype=self.mimetype)
@@ -0,0 +1,51 @@
+"""
+Gunicorn configuration for running the API in production.
+
+    cd backend && gunicorn -c gunicorn.conf.py
+
+The app is imported once in the master (preload_app): reference data, the
+listing index and precomputed scores are built before the workers fork and
+shared with them copy-on-write. gc.freeze() moves those objects out of the
+collector's reach so collections in the workers do not write to, and so
+copy, the shared pages. Each worker opens its own database connections and
+starts its background threads after fork.
+
+Workers are recycled after CARTHERO_MAX_REQUESTS requests (with jitter so
+they do not all restart at once) and given CARTHERO_GRACEFUL_TIMEOUT seconds
+to finish in-flight requests; the replacement forks from the preloaded
+master, so recycling costs no reload.
+"""
+
+import gc
+import multiprocessing
+import os
+
+wsgi_app = 'app:app'
+preload_app = True
+
+bind = os.environ.get('CARTHERO_BIND', '0.0.0.0:5001')
+workers = int(os.environ.get('CARTHERO_WORKERS', multiprocessing.cpu_count()))
+# Marketplace scrapes and streamed responses wait on I/O; threads keep a worker busy meanwhile
+worker_class = 'gthread'
+threads = int(os.environ.get('CARTHERO_THREADS', 4))
+keepalive = 5
+
+max_requests = int(os.environ.get('CARTHERO_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+graceful_timeout = int(os.environ.get('CARTHERO_GRACEFUL_TIMEOUT', 30))
+timeout = 60
+
+
+def when_ready(server):
+    gc.freeze()
+    server.log.info("Preloaded app; forking %s workers", workers)
+
+
+def post_fork(server, worker):
+    from app import start_services
+    start_services()
+
+
+def worker_exit(server, worker):
+    from app import stop_services
+    stop_services()
@@ -0,0 +1,238 @@
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class CircuitOpenError(Exception):
+    """Raised when a host's circuit breaker is rejecting requests"""
+
+
+class HostBusyError(Exception):
+    """Raised when a host already has `max_per_host` requests in flight"""
+
+
+class CircuitBreaker:
+    """Trips open after consecutive failures and probes again after a cool-down"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now):
+        if self.opened_at is None:
+            return self.CLOSED
+        if now - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """False to reject; otherwise the state the request was let through in (HALF_OPEN: it is the probe)"""
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == self.CLOSED:
+                return self.CLOSED
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                # Let exactly one request through to test the upstream
+                self._probe_in_flight = True
+                return self.HALF_OPEN
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Free the half-open probe slot if the probe ended without a recorded outcome"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            was_probe = self._probe_in_flight
+            self._probe_in_flight = False
+            if was_probe or self.failures >= self.failure_threshold:
+                if self.opened_at is None or was_probe:
+                    self.trips += 1
+                self.opened_at = time.monotonic()
+
+
+class PooledHTTPClient:
+    """Shared keep-alive session for marketplace fetches.
+
+    Connections are reused per host, at most `max_per_host` requests run
+    against one host at a time, transient errors are retried with
+    exponential backoff, and each host has its own circuit breaker so a
+    failing upstream is skipped until it recovers.
+
+    get(url, deadline=...) bounds the whole call instead: the semaphore
+    wait, every attempt and every backoff pause all end by the deadline, so
+    a caller that has given up does not leave a thread and a host slot busy
+    retrying behind it.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    # Also trip the breaker: 403 and 429 are how marketplaces block scrapers
+    FAILURE_STATUSES = RETRY_STATUSES + (403,)
+
+    def __init__(self, max_per_host=8, max_hosts=16, max_retries=2, backoff_factor=0.3,
+                 timeout=10, acquire_timeout=2, failure_threshold=5, reset_timeout=30):
+        self.max_per_host = max_per_host
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.acquire_timeout = acquire_timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        retry = Retry(total=max_retries, connect=max_retries, read=max_retries,
+                      status=max_retries, backoff_factor=backoff_factor,
+                      status_forcelist=self.RETRY_STATUSES,
+                      allowed_methods=frozenset(['GET', 'HEAD']),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=max_per_host,
+                              pool_block=True, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Deadline-bound requests retry in _get_by() instead, where the pauses can be bounded
+        single_try = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=max_per_host,
+                                 pool_block=True, max_retries=0)
+        self._single_try_session = requests.Session()
+        self._single_try_session.mount('http://', single_try)
+        self._single_try_session.mount('https://', single_try)
+
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+        self.rejected = 0
+
+    def _host_state(self, host):
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = {
+                    'semaphore': threading.BoundedSemaphore(self.max_per_host),
+                    'breaker': CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                }
+                self._hosts[host] = state
+            return state
+
+    def get(self, url, deadline=None, **kwargs):
+        """GET `url`; `deadline` is a time.monotonic() value the whole call must finish by"""
+        host = urllib.parse.urlsplit(url).netloc
+        state = self._host_state(host)
+        breaker = state['breaker']
+
+        # The breaker first, so a request to an open circuit fails fast even when the host is busy
+        admitted = breaker.allow()
+        if not admitted:
+            with self._lock:
+                self.rejected += 1
+            raise CircuitOpenError(f"Circuit open for {host}")
+
+        acquire_timeout = self.acquire_timeout
+        if deadline is not None:
+            acquire_timeout = max(0, min(acquire_timeout, deadline - time.monotonic()))
+        if not state['semaphore'].acquire(timeout=acquire_timeout):
+            if admitted == breaker.HALF_OPEN:
+                breaker.release_probe()
+            with self._lock:
+                self.rejected += 1
+            raise HostBusyError(f"Too many concurrent requests to {host}")
+
+        try:
+            if deadline is None:
+                kwargs.setdefault('timeout', self.timeout)
+                with self._lock:
+                    self.requests_sent += 1
+                response = self.session.get(url, **kwargs)
+            else:
+                response = self._get_by(url, deadline, kwargs)
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+        else:
+            if response.status_code in self.FAILURE_STATUSES:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            return response
+        finally:
+            # Any other exception must not leave a half-open breaker waiting on its probe forever
+            if admitted == breaker.HALF_OPEN:
+                breaker.release_probe()
+            state['semaphore'].release()
+
+    def _get_by(self, url, deadline, kwargs):
+        """Up to 1 + max_retries attempts, each attempt and backoff pause ending by `deadline`"""
+        timeout = kwargs.pop('timeout', self.timeout)
+        response = error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                pause = self.backoff_factor * 2 ** (attempt - 1)
+                if time.monotonic() + pause >= deadline:
+                    break
+                time.sleep(pause)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            if response is not None:
+                response.close()
+            with self._lock:
+                self.requests_sent += 1
+            try:
+                response = self._single_try_session.get(url, timeout=min(timeout, remaining), **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error = None, e
+                continue
+            if response.status_code not in self.RETRY_STATUSES:
+                return response
+
+        if response is not None:
+            return response
+        raise error or requests.Timeout(f"Deadline passed before {url} could be requested")
+
+    def stats(self):
+        with self._lock:
+            hosts = dict(self._hosts)
+            requests_sent, rejected = self.requests_sent, self.rejected
+        return {
+            'requestsSent': requests_sent,
+            'rejected': rejected,
+            'hosts': {
+                host: {
+                    'circuit': state['breaker'].state,
+                    'failures': state['breaker'].failures,
+                    'trips': state['breaker'].trips
+                }
+                for host, state in hosts.items()
+            }
+        }
+
+    def close(self):
+        self.session.close()
+        self._single_try_session.close()
@@ -0,0 +1,556 @@
+"""
+In-process inverted index over secondhand listings.
+
+Listings are stored in immutable segments. Inside a segment, documents are
+numbered in (price, id) order and every term maps to a sorted NumPy array
+of those positions:
+
+    title tokens            "iphone", "13", "128gb", ...
+    m:<marketplace>         "m:ebay"
+    c:<condition>           "c:excellent"
+    k:<category>            "k:smartphone"
+
+Because positions follow price, a price range is one contiguous slice of
+every posting list (two bisects), results come out cheapest first without
+sorting, and a cursor is just the (price, id) of the last result returned.
+A query intersects its posting lists in growing chunks starting at the
+cursor and stops as soon as it has a page, so its cost depends on the page
+size and the selectivity of the terms rather than on how many listings
+match.
+
+New listings collect in a small buffer that is sealed into a segment when
+full; segments of similar size are merged by remapping their posting lists,
+without re-tokenizing titles. Re-adding a listing (same marketplace and URL)
+replaces the old copy; remove_many() deletes listings by the same identity.
+"""
+
+import base64
+import json
+import threading
+from array import array
+from itertools import repeat
+
+import numpy as np
+
+from product_context import parse_price, tokenize
+
+MARKETPLACE_PREFIX = 'm:'
+CONDITION_PREFIX = 'c:'
+CATEGORY_PREFIX = 'k:'
+
+# Candidates examined by the first intersection chunk, as a multiple of the page size
+FIRST_CHUNK_FACTOR = 8
+
+
+def _normalize(value):
+    return ' '.join(str(value).lower().split())
+
+
+def listing_key(marketplace, url, title):
+    """Identity of a listing within this process: same marketplace and URL (or title)"""
+    return hash((_normalize(marketplace), url or _normalize(title)))
+
+
+def key_for(listing):
+    """listing_key() of a listing dict, with the defaults the index applies"""
+    return listing_key(listing.get('marketplace') or 'Unknown', listing.get('url'), listing.get('title') or '')
+
+
+def encode_cursor(price, doc_id):
+    return base64.urlsafe_b64encode(f"{price!r}:{doc_id}".encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(price, id) from a cursor string; raises ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+        price, doc_id = raw.split(':')
+        return float(price), int(doc_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+class _Codes:
+    """Interned display names for a low-cardinality field"""
+
+    def __init__(self):
+        self.names = []
+        self._codes = {}
+        self._normalized = {}
+
+    def code(self, name):
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.names)
+            self.names.append(name)
+            self._normalized.setdefault(_normalize(name), []).append(code)
+        return code
+
+    def matching(self, value):
+        """Codes of every name equal to `value` ignoring case and spacing"""
+        return tuple(self._normalized.get(_normalize(value), ()))
+
+
+class _Segment:
+    """Immutable block of listings sorted by (price, id) with its posting lists"""
+
+    def __init__(self, ids, prices, keys, titles, urls, sellers, fields, postings):
+        self.ids = ids
+        self.prices = prices
+        self.keys = keys
+        self.titles = titles
+        self.urls = urls
+        self.sellers = sellers
+        # (marketplace, condition, category) codes, one row per document
+        self.fields = fields
+        self.postings = postings
+        self._key_order = np.argsort(keys, kind='stable')
+        self._sorted_keys = keys[self._key_order]
+
+    @classmethod
+    def build(cls, builder):
+        """Segment from the unsorted columns collected by a _SegmentBuilder"""
+        ids = np.frombuffer(builder.ids, dtype=np.int64)
+        prices = np.frombuffer(builder.prices, dtype=np.float64)
+        order = np.lexsort((ids, prices))
+        rows = order.tolist()
+        positions = np.empty(len(ids), dtype=np.int64)
+        positions[order] = np.arange(len(ids))
+
+        term_ids = np.frombuffer(builder.term_ids, dtype=np.uint32)
+        term_positions = positions[np.frombuffer(builder.term_docs, dtype=np.uint32)].astype(np.uint32)
+        postings = _split_postings(term_ids, term_positions, builder.vocabulary)
+
+        return cls(ids[order], prices[order], np.frombuffer(builder.keys, dtype=np.int64)[order],
+                   [builder.titles[i] for i in rows], [builder.urls[i] for i in rows],
+                   [builder.sellers[i] for i in rows],
+                   np.frombuffer(builder.fields, dtype=np.uint16).reshape(len(ids), 3)[order],
+                   postings)
+
+    @classmethod
+    def merge(cls, segments, deleted):
+        """One segment holding the live documents of `segments`"""
+        ids = np.concatenate([segment.ids for segment in segments])
+        prices = np.concatenate([segment.prices for segment in segments])
+        keep = ~np.isin(ids, np.fromiter(deleted, dtype=np.int64, count=len(deleted))) if deleted else \
+            np.ones(len(ids), dtype=bool)
+        kept = np.flatnonzero(keep)
+        order = kept[np.lexsort((ids[kept], prices[kept]))]
+
+        # Old position (in the concatenation) -> new position, or -1 if dropped
+        remap = np.full(len(ids), -1, dtype=np.int64)
+        remap[order] = np.arange(len(order))
+        offsets = np.cumsum([0] + [len(segment.ids) for segment in segments])
+
+        vocabulary = {}
+        term_ids, term_positions = [], []
+        for segment, offset in zip(segments, offsets):
+            for term, posting in segment.postings.items():
+                mapped = remap[posting.astype(np.int64) + offset]
+                mapped = mapped[mapped >= 0]
+                if len(mapped):
+                    term_ids.append(np.full(len(mapped), vocabulary.setdefault(term, len(vocabulary)),
+                                            dtype=np.uint32))
+                    term_positions.append(mapped.astype(np.uint32))
+        postings = _split_postings(np.concatenate(term_ids) if term_ids else np.empty(0, np.uint32),
+                                   np.concatenate(term_positions) if term_positions else np.empty(0, np.uint32),
+                                   vocabulary)
+
+        rows = order.tolist()
+
+        def gather(column):
+            combined = [value for segment in segments for value in getattr(segment, column)]
+            return [combined[i] for i in rows]
+
+        keys = np.concatenate([segment.keys for segment in segments])
+        return cls(ids[order], prices[order], keys[order], gather('titles'), gather('urls'), gather('sellers'),
+                   np.concatenate([segment.fields for segment in segments])[order], postings)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def position_of(self, key):
+        index = self._sorted_keys.searchsorted(key)
+        if index < len(self._sorted_keys) and self._sorted_keys[index] == key:
+            return int(self._key_order[index])
+        return None
+
+    def price_range(self, min_price, max_price, after):
+        start = 0 if min_price is None else int(self.prices.searchsorted(min_price, 'left'))
+        end = len(self.prices) if max_price is None else int(self.prices.searchsorted(max_price, 'right'))
+        if after is not None:
+            price, doc_id = after
+            position = int(self.prices.searchsorted(price, 'left'))
+            while position < end and self.prices[position] == price and self.ids[position] <= doc_id:
+                position += 1
+            start = max(start, position)
+        return start, end
+
+    def search(self, terms, filters, start, end, limit, deleted, range_start=None):
+        """Up to `limit` positions in [start, end) matching all `terms` and `filters`.
+
+        `filters` are (term, column, codes) for the marketplace, condition
+        and category fields. Unless one of them has the shortest posting
+        list, they are checked against the field column, which is cheaper
+        than searching their (long) posting lists.
+
+        Also returns how many lead-list candidates were examined and how
+        many lie in [range_start, end), for estimating the total number of
+        matches.
+        """
+        lists = []
+        for term, field in [(term, None) for term in terms] + [(term, (column, codes))
+                                                                for term, column, codes in filters]:
+            posting = self.postings.get(term)
+            if posting is None:
+                return [], 0, 0
+            lists.append((len(posting), posting, field))
+        lists.sort(key=lambda entry: entry[0])
+        lead = lists[0][1]
+        others = [posting for _, posting, field in lists[1:] if field is None]
+        columns = [field for _, _, field in lists[1:] if field is not None]
+
+        # Probe with the postings' own dtype; a Python int would make NumPy
+        # convert the whole array before every search
+        position_type = lead.dtype.type
+        first = i = int(lead.searchsorted(position_type(start)))
+        stop = int(lead.searchsorted(position_type(end)))
+        hits = []
+        chunk = limit * FIRST_CHUNK_FACTOR
+        while i < stop and len(hits) < limit:
+            candidates = lead[i:min(i + chunk, stop)]
+            for posting in others:
+                found = posting.searchsorted(candidates)
+                found[found == len(posting)] = 0
+                candidates = candidates[posting[found] == candidates]
+                if not len(candidates):
+                    break
+            for column, codes in columns:
+                values = self.fields[candidates, column]
+                candidates = candidates[values == codes[0] if len(codes) == 1 else np.isin(values, codes)]
+            for position in candidates.tolist():
+                if deleted and int(self.ids[position]) in deleted:
+                    continue
+                hits.append(position)
+                if len(hits) >= limit:
+                    # Count candidates up to and including the last hit only
+                    i = int(lead.searchsorted(position_type(position), 'right'))
+                    break
+            else:
+                i = min(i + chunk, stop)
+            chunk *= 4
+        range_first = first if range_start is None else int(lead.searchsorted(position_type(range_start)))
+        return hits, i - first, stop - range_first
+
+    def row(self, position, codes):
+        marketplace, condition, category = self.fields[position].tolist()
+        return {
+            'title': self.titles[position],
+            'price': f"${self.prices[position]:.2f}",
+            'condition': codes[1].names[condition],
+            'seller': self.sellers[position],
+            'url': self.urls[position],
+            'marketplace': codes[0].names[marketplace],
+            'category': codes[2].names[category]
+        }
+
+
+def _split_postings(term_ids, term_positions, vocabulary):
+    """{term: sorted positions}, as views into one array sorted by (term, position)"""
+    order = np.lexsort((term_positions, term_ids))
+    term_ids = term_ids[order]
+    term_positions = term_positions[order]
+    boundaries = np.flatnonzero(np.diff(term_ids)) + 1
+    starts = np.concatenate(([0], boundaries)) if len(term_ids) else np.empty(0, dtype=np.int64)
+    ends = np.concatenate((boundaries, [len(term_ids)])) if len(term_ids) else starts
+    names = {term_id: term for term, term_id in vocabulary.items()}
+    return {names[int(term_ids[start])]: term_positions[start:end] for start, end in zip(starts, ends)}
+
+
+def _terms(title, marketplace, condition, category):
+    terms = set(tokenize(title))
+    terms.add(MARKETPLACE_PREFIX + _normalize(marketplace))
+    terms.add(CONDITION_PREFIX + _normalize(condition))
+    terms.add(CATEGORY_PREFIX + _normalize(category))
+    return terms
+
+
+class _SegmentBuilder:
+    """Collects documents column by column, with terms already mapped to ids"""
+
+    def __init__(self):
+        self.ids = array('q')
+        self.prices = array('d')
+        self.keys = array('q')
+        self.titles = []
+        self.urls = []
+        self.sellers = []
+        self.fields = array('H')
+        self.term_ids = array('I')
+        self.term_docs = array('I')
+        self.vocabulary = {}
+
+    def add(self, doc, terms):
+        doc_id, price, key, title, url, seller, fields = doc
+        index = len(self.ids)
+        self.ids.append(doc_id)
+        self.prices.append(price)
+        self.keys.append(key)
+        self.titles.append(title)
+        self.urls.append(url)
+        self.sellers.append(seller)
+        self.fields.extend(fields)
+        vocabulary = self.vocabulary
+        for term in terms:
+            term_id = vocabulary.get(term)
+            if term_id is None:
+                term_id = vocabulary[term] = len(vocabulary)
+            self.term_ids.append(term_id)
+            self.term_docs.append(index)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class ListingIndex:
+    """Searchable listings: filtered, cheapest first and cursor-paginated (no relevance ranking)"""
+
+    def __init__(self, buffer_size=256, merge_factor=4):
+        self.buffer_size = buffer_size
+        self.merge_factor = merge_factor
+        self.codes = (_Codes(), _Codes(), _Codes())
+        self.skipped = 0
+        self.queries = 0
+
+        self._segments = ()
+        # Unsealed docs, their terms, and term -> buffer indexes
+        self._buffer = []
+        self._buffer_terms = []
+        self._buffer_postings = {}
+        self._buffer_keys = {}
+        self._deleted = set()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _doc(self, listing, category):
+        """(doc, terms) for a listing dict, or None if it has no usable title or price"""
+        title = listing.get('title')
+        price = listing.get('price')
+        price = price if isinstance(price, (int, float)) else parse_price(price)
+        if not title or price is None:
+            return None
+        marketplace = listing.get('marketplace') or 'Unknown'
+        condition = listing.get('condition') or 'Good'
+        category = listing.get('category') or category or 'electronics'
+        key = key_for(listing)
+
+        doc_id = self._next_id
+        self._next_id += 1
+        fields = (self.codes[0].code(marketplace), self.codes[1].code(condition), self.codes[2].code(category))
+        doc = (doc_id, float(price), key, title, listing.get('url'), listing.get('seller'), fields)
+        return doc, _terms(title, marketplace, condition, category)
+
+    def _replace(self, key):
+        """Mark any live copy of `key` deleted"""
+        previous = self._buffer_keys.get(key)
+        if previous is not None:
+            self._deleted.add(previous)
+        for segment in self._segments:
+            position = segment.position_of(key)
+            if position is not None:
+                self._deleted.add(int(segment.ids[position]))
+
+    def add_many(self, listings, category=None):
+        """Index listing dicts (the shape returned by the marketplace adapters); returns how many were added"""
+        added = 0
+        with self._lock:
+            for listing in listings:
+                entry = self._doc(listing, category)
+                if entry is None:
+                    self.skipped += 1
+                    continue
+                doc, terms = entry
+                self._replace(doc[2])
+                index = len(self._buffer)
+                self._buffer.append(doc)
+                self._buffer_terms.append(terms)
+                self._buffer_keys[doc[2]] = doc[0]
+                for term in terms:
+                    self._buffer_postings.setdefault(term, []).append(index)
+                added += 1
+                if len(self._buffer) >= self.buffer_size:
+                    self._seal()
+        return added
+
+    def remove_many(self, listings):
+        """Delete the indexed copies of listing dicts (matched by key_for()); returns how many were live"""
+        with self._lock:
+            before = len(self._deleted)
+            for listing in listings:
+                self._replace(key_for(listing))
+            return len(self._deleted) - before
+
+    def add(self, listing, category=None):
+        return self.add_many([listing], category) == 1
+
+    def bulk_load(self, listings, category=None):
+        """Index a large batch straight into one segment, skipping the buffer"""
+        with self._lock:
+            builder = _SegmentBuilder()
+            for listing in listings:
+                entry = self._doc(listing, category)
+                if entry is None:
+                    self.skipped += 1
+                else:
+                    builder.add(*entry)
+            if not len(builder):
+                return 0
+
+            if self._segments or self._buffer:
+                for key in builder.keys:
+                    self._replace(key)
+            # Within the batch the last copy of a listing wins
+            keys = np.frombuffer(builder.keys, dtype=np.int64)
+            _, last = np.unique(keys[::-1], return_index=True)
+            if len(last) < len(keys):
+                latest = np.zeros(len(keys), dtype=bool)
+                latest[len(keys) - 1 - last] = True
+                self._deleted.update(np.frombuffer(builder.ids, dtype=np.int64)[~latest].tolist())
+
+            self._segments = self._segments + (_Segment.build(builder),)
+            self._compact()
+            return len(last)
+
+    def _seal(self):
+        builder = _SegmentBuilder()
+        for doc, terms in zip(self._buffer, self._buffer_terms):
+            if doc[0] not in self._deleted:
+                builder.add(doc, terms)
+        self._deleted.difference_update(doc[0] for doc in self._buffer)
+        self._buffer, self._buffer_terms, self._buffer_postings, self._buffer_keys = [], [], {}, {}
+        if len(builder):
+            self._segments = self._segments + (_Segment.build(builder),)
+            self._compact()
+
+    def _compact(self):
+        """Merge the smallest segments while they are within `merge_factor` of each other in size"""
+        segments = sorted(self._segments, key=len, reverse=True)
+        while len(segments) >= 2 and len(segments[-2]) <= self.merge_factor * len(segments[-1]):
+            merging = (segments.pop(), segments.pop())
+            merged_ids = np.concatenate([segment.ids for segment in merging])
+            segments.append(_Segment.merge(merging, self._deleted))
+            self._deleted.difference_update(merged_ids.tolist())
+            segments.sort(key=len, reverse=True)
+        self._segments = tuple(segments)
+
+    def _buffer_row(self, doc):
+        marketplace, condition, category = doc[6]
+        return {
+            'title': doc[3],
+            'price': f"${doc[1]:.2f}",
+            'condition': self.codes[1].names[condition],
+            'seller': doc[5],
+            'url': doc[4],
+            'marketplace': self.codes[0].names[marketplace],
+            'category': self.codes[2].names[category]
+        }
+
+    def search(self, query, marketplace=None, condition=None, category=None,
+               min_price=None, max_price=None, limit=10, cursor=None):
+        """One page of listings matching every known query token, cheapest first.
+
+        Tokens that appear in no listing at all are ignored (and reported)
+        rather than emptying the result, as long as at least one token is
+        known; a query with no known token matches nothing. Raises
+        ValueError for a bad cursor.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        tokens = list(dict.fromkeys(tokenize(query)))
+        filters = [(prefix + _normalize(value), column, self.codes[column].matching(value))
+                   for column, prefix, value in ((0, MARKETPLACE_PREFIX, marketplace), (1, CONDITION_PREFIX, condition),
+                                                 (2, CATEGORY_PREFIX, category)) if value]
+        filter_terms = [term for term, _, _ in filters]
+        with self._lock:
+            segments = self._segments
+            buffer = self._buffer
+            buffer_terms = self._buffer_terms
+            # Only the posting lists this query reads are copied out of the buffer
+            buffer_postings = {term: self._buffer_postings[term][:]
+                               for term in tokens + filter_terms if term in self._buffer_postings}
+            # Writers update the deleted set in place
+            deleted = frozenset(self._deleted)
+            self.queries += 1
+
+        known = [token for token in tokens
+                 if token in buffer_postings or any(token in segment.postings for segment in segments)]
+        # Filters alone would list the whole marketplace/condition/category
+        terms = known + filter_terms if known else []
+
+        page = []
+        total = 0
+        exact = True
+        if terms:
+            for segment in segments:
+                range_start, _ = segment.price_range(min_price, max_price, None)
+                start, end = segment.price_range(min_price, max_price, after)
+                hits, examined, candidates = segment.search(known, filters, start, end, limit + 1, deleted,
+                                                            range_start)
+                page.extend(zip(segment.prices[hits].tolist(), segment.ids[hits].tolist(), repeat(segment), hits))
+
+                # Exact when the scan covered the whole range, otherwise
+                # extrapolated from the hit rate of the candidates examined
+                if after is None and len(hits) <= limit:
+                    total += len(hits)
+                elif len(terms) == 1 and not deleted:
+                    total += candidates
+                elif examined:
+                    total += round(candidates * len(hits) / examined)
+                    exact = False
+
+            lists = [buffer_postings.get(term, ()) for term in terms]
+            for index in min(lists, key=len):
+                doc = buffer[index]
+                price = doc[1]
+                if ((min_price is not None and price < min_price) or (max_price is not None and price > max_price)
+                        or doc[0] in deleted or not all(term in buffer_terms[index] for term in terms)):
+                    continue
+                if after is None or (price, doc[0]) > after:
+                    page.append((price, doc[0], None, doc))
+                total += 1
+
+        page.sort(key=lambda hit: (hit[0], hit[1]))
+        next_cursor = encode_cursor(*page[limit - 1][:2]) if len(page) > limit else None
+        return {
+            'results': [segment.row(position, self.codes) if segment is not None else self._buffer_row(position)
+                        for _, _, segment, position in page[:limit]],
+            'totalFound': total,
+            'totalIsEstimate': not exact,
+            'nextCursor': next_cursor,
+            'ignoredTerms': [token for token in tokens if token not in known]
+        }
+
+    def __len__(self):
+        return sum(len(segment) for segment in self._segments) + len(self._buffer) - len(self._deleted)
+
+    def stats(self):
+        return {
+            'listings': len(self),
+            'segments': len(self._segments),
+            'buffered': len(self._buffer),
+            'deleted': len(self._deleted),
+            'skipped': self.skipped,
+            'queries': self.queries
+        }
+
+
+def read_listings(path):
+    """Listing dicts from a JSON Lines file, skipping blank and malformed lines"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
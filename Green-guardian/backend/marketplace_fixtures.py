@@ -0,0 +1,150 @@
+"""
+Local fixture servers standing in for the marketplace sites.
+
+Each server answers any search with a small canned result page in that
+site's format (eBay s-item markup, schema.org JSON-LD for BackMarket and
+Swappa) built from the query, after an optional delay to simulate a slow
+upstream.
+
+Usage:
+    python marketplace_fixtures.py [--delay swappa=12] [--base-port 8101]
+
+then start the API with the printed CARTHERO_*_URL variables.
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURE_LISTINGS = (
+    ('Refurbished', 0.62, 'Excellent - Refurbished'),
+    ('Used', 0.48, 'Pre-Owned'),
+    ('Open Box', 0.81, 'Open box')
+)
+
+
+def _search_terms(path):
+    params = urllib.parse.parse_qs(urllib.parse.urlsplit(path).query)
+    query = (params.get('_nkw') or params.get('q') or ['Product'])[0]
+    return query.replace(' refurbished OR used', '')
+
+
+def _slug(query):
+    return '-'.join(query.lower().split())
+
+
+def ebay_page(query, base_url):
+    items = ''.join(
+        f'<li class="s-item"><div class="s-item__info">'
+        f'<a class="s-item__link" href="{base_url}/itm/{_slug(query)}-{position}"><h3 class="s-item__title">{label} {query}</h3></a>'
+        f'<span class="s-item__subtitle">{condition}</span>'
+        f'<span class="s-item__price">${300 * share:.2f}</span>'
+        f'<span class="s-item__shipping">Free shipping</span></div></li>'
+        for position, (label, share, condition) in enumerate(FIXTURE_LISTINGS))
+    return f'<html><body><ul class="srp-results">{items}</ul></body></html>'
+
+
+def json_ld_page(query, base_url, condition='https://schema.org/RefurbishedCondition'):
+    products = {
+        '@context': 'https://schema.org',
+        '@type': 'ItemList',
+        'itemListElement': [
+            {'@type': 'ListItem', 'position': position + 1, 'item': {
+                '@type': 'Product',
+                'name': f"{query} - {label}",
+                'url': f"{base_url}/p/{_slug(query)}-{position}",
+                'offers': {'@type': 'Offer', 'price': f"{320 * share:.2f}", 'priceCurrency': 'USD',
+                           'itemCondition': condition}
+            }}
+            for position, (label, share, _) in enumerate(FIXTURE_LISTINGS)
+        ]
+    }
+    return f'<html><head><script type="application/ld+json">{json.dumps(products)}</script></head><body></body></html>'
+
+
+PAGES = {
+    'ebay': ebay_page,
+    'backmarket': json_ld_page,
+    'swappa': lambda query, base_url: json_ld_page(query, base_url, 'https://schema.org/UsedCondition')
+}
+
+
+class FixtureServer:
+    """Serves one marketplace's fixture pages on a background thread"""
+
+    def __init__(self, key, port=0, delay=0.0, host='127.0.0.1'):
+        page = PAGES[key]
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fixture.requests += 1
+                if fixture.delay:
+                    time.sleep(fixture.delay)
+                body = page(_search_terms(self.path), fixture.url).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.key = key
+        self.delay = delay
+        self.requests = 0
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = None
+
+    @property
+    def env_var(self):
+        return f"CARTHERO_{self.key.upper()}_URL"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name=f"fixture-{self.key}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def start_fixtures(delays=None, base_port=0):
+    """Start one fixture server per marketplace; returns {key: FixtureServer}"""
+    delays = delays or {}
+    return {key: FixtureServer(key, port=base_port + offset if base_port else 0, delay=delays.get(key, 0.0)).start()
+            for offset, key in enumerate(PAGES)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--base-port', type=int, default=8101)
+    parser.add_argument('--delay', action='append', default=[], metavar='SITE=SECONDS',
+                        help='Delay every response from SITE (ebay, backmarket, swappa)')
+    args = parser.parse_args()
+
+    delays = {}
+    for entry in args.delay:
+        key, _, seconds = entry.partition('=')
+        delays[key.strip().lower()] = float(seconds)
+
+    fixtures = start_fixtures(delays, args.base_port)
+    for fixture in fixtures.values():
+        print(f"export {fixture.env_var}={fixture.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for fixture in fixtures.values():
+            fixture.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,350 @@
+"""
+Marketplace adapters and the concurrent fan-out that queries them.
+
+Each adapter knows one site: how to build its search URL, how to parse the
+result page into raw listing fields, and how to shape those fields into a
+secondhand option. Base URLs can be overridden per site
+(CARTHERO_EBAY_URL, CARTHERO_BACKMARKET_URL, CARTHERO_SWAPPA_URL) to point
+at local fixture servers.
+
+MarketplaceFanout queries every adapter at once under one shared deadline.
+Listings are merged into a single ranking as each adapter answers; adapters
+still running when the deadline passes are left out of the result instead
+of holding it up (MarketplacesUnavailableError when no adapter answered).
+Each adapter's fetch, retries and backoff included, is bound by the same
+deadline, so a cut-off fetch does not keep its thread and host slot busy
+after the search has returned.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+from bisect import insort
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+
+from lxml import etree, html as lxml_html
+
+import ebay_parser
+from metrics import latency
+from product_context import parse_price, stable_rng, tokenize
+
+class MarketplaceError(Exception):
+    """Raised when a marketplace answers a search with an error status"""
+
+
+class MarketplacesUnavailableError(Exception):
+    """Raised when every adapter of a fan-out search failed or was cut off"""
+
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# schema.org itemCondition values, as used in the JSON-LD of product pages
+SCHEMA_CONDITIONS = {
+    'newcondition': 'Excellent',
+    'refurbishedcondition': 'Very Good',
+    'usedcondition': 'Good',
+    'damagedcondition': 'Fair'
+}
+
+
+def normalize_condition(text):
+    condition = "Good"
+    if text:
+        condition_text = text.lower()
+        if 'excellent' in condition_text or 'mint' in condition_text:
+            condition = "Excellent"
+        elif 'very good' in condition_text:
+            condition = "Very Good"
+        elif 'fair' in condition_text or 'acceptable' in condition_text:
+            condition = "Fair"
+        else:
+            condition = SCHEMA_CONDITIONS.get(condition_text.rsplit('/', 1)[-1], condition)
+    return condition
+
+
+def _json_ld_products(data):
+    """Yield every schema.org Product in a JSON-LD document, including ItemList entries"""
+    if isinstance(data, list):
+        for entry in data:
+            yield from _json_ld_products(entry)
+    elif isinstance(data, dict):
+        kind = data.get('@type')
+        if kind == 'Product' or (isinstance(kind, list) and 'Product' in kind):
+            yield data
+        elif '@graph' in data:
+            yield from _json_ld_products(data['@graph'])
+        elif 'itemListElement' in data:
+            for element in data['itemListElement']:
+                yield from _json_ld_products(element.get('item', element) if isinstance(element, dict) else element)
+
+
+def parse_json_ld_listings(content, max_results=3):
+    """Listings from the schema.org Product data embedded in a search page"""
+    listings = []
+    if max_results <= 0 or not content:
+        return listings
+    try:
+        document = lxml_html.fromstring(content)
+    except (etree.ParserError, ValueError):
+        return listings
+
+    for script in document.iter('script'):
+        if script.get('type') != 'application/ld+json' or not script.text:
+            continue
+        try:
+            data = json.loads(script.text)
+        except ValueError:
+            continue
+        for product in _json_ld_products(data):
+            offers = product.get('offers') or {}
+            if isinstance(offers, list):
+                offers = offers[0] if offers else {}
+            price = offers.get('price', offers.get('lowPrice'))
+            listings.append({
+                'title': product.get('name'),
+                'price': f"${float(price):.2f}" if price not in (None, '') else None,
+                'link': product.get('url') or offers.get('url'),
+                'condition': offers.get('itemCondition') or product.get('itemCondition'),
+                'shipping': None
+            })
+            if len(listings) >= max_results:
+                return listings
+    return listings
+
+
+class MarketplaceAdapter:
+    """One marketplace: search URL, result-page parser and listing shape"""
+
+    key = None
+    name = None
+    default_url = None
+    seller = None
+    warranties = ('30 days', '90 days', '6 months', 'No warranty')
+    shipping = 'Shipping varies'
+
+    def __init__(self, http_client, base_url=None, deterministic=True):
+        self.http_client = http_client
+        self.deterministic = deterministic
+        base_url = base_url or os.environ.get(f"CARTHERO_{self.key.upper()}_URL", self.default_url)
+        self.base_url = base_url.rstrip('/')
+
+    def search_url(self, query):
+        raise NotImplementedError
+
+    def parse(self, content, max_results):
+        raise NotImplementedError
+
+    def search(self, query, max_results=3, timeout=10, deadline=None):
+        """Shaped options for `query`; HTTP, circuit and MarketplaceError errors propagate.
+
+        `deadline` (a time.monotonic() value) bounds the whole fetch, retries included.
+        """
+        with latency.timer('carthero_marketplace_fetch_seconds', marketplace=self.key):
+            response = self.http_client.get(self.search_url(query), headers=HEADERS, timeout=timeout,
+                                            deadline=deadline)
+        if response.status_code != 200:
+            raise MarketplaceError(f"{self.name} answered HTTP {response.status_code}")
+
+        with latency.timer('carthero_marketplace_parse_seconds', marketplace=self.key):
+            listings = self.parse(response.content, max_results)
+
+        items = []
+        for listing in listings:
+            try:
+                items.append(self.to_option(listing, query))
+            except Exception as e:
+                print(f"Error parsing {self.name} listing: {e}")
+        return items
+
+    def to_option(self, listing, query):
+        title = listing['title'] or "Item"
+        price = listing['price'] or "Price unavailable"
+        # Simulated fields are derived from the listing so a re-fetch yields the same option
+        rng = stable_rng(self.key, listing['link'] or title, price) if self.deterministic else random
+
+        # Calculate savings and CO2 reduction
+        price_num = parse_price(price)
+        savings_pct = rng.randint(25, 60)
+        co2_saved = round(rng.uniform(2.0, 6.0), 1)
+
+        return {
+            'title': title[:60] + "..." if len(title) > 60 else title,
+            'price': price,
+            'originalPrice': f"${price_num * 1.4:.2f}" if price_num else "N/A",
+            'condition': normalize_condition(listing['condition']),
+            'warranty': rng.choice(self.warranties),
+            'seller': self.seller,
+            'rating': round(rng.uniform(4.0, 4.9), 1),
+            'reviewCount': rng.randint(10, 500),
+            'url': listing['link'] or self.search_url(query),
+            'savings': f"Save {savings_pct}%",
+            'co2Reduction': f"{co2_saved} kg CO₂ saved",
+            'marketplace': self.name,
+            'shippingInfo': listing['shipping'] or self.shipping,
+            'sustainabilityScore': rng.randint(70, 95),
+            'verifiedSeller': True,
+            'realData': True
+        }
+
+
+class EbayAdapter(MarketplaceAdapter):
+    key = 'ebay'
+    name = 'eBay'
+    default_url = 'https://www.ebay.com'
+    seller = 'eBay Seller'
+
+    def __init__(self, http_client, base_url=None, parser='lxml', deterministic=True):
+        super().__init__(http_client, base_url, deterministic)
+        # 'lxml' streams only the listings we need; 'bs4' is the original full-tree parser
+        self.parse_listings = ebay_parser.PARSERS[parser]
+
+    def search_url(self, query):
+        encoded_query = urllib.parse.quote_plus(f"{query} refurbished OR used")
+        return f"{self.base_url}/sch/i.html?_nkw={encoded_query}&_sacat=0&LH_ItemCondition=2500%2C3000%2C4000&rt=nc&_udlo=50"
+
+    def parse(self, content, max_results):
+        return self.parse_listings(content, max_results)
+
+
+class BackMarketAdapter(MarketplaceAdapter):
+    key = 'backmarket'
+    name = 'BackMarket'
+    default_url = 'https://www.backmarket.com'
+    seller = 'BackMarket Refurbisher'
+    warranties = ('12 months',)
+    shipping = '2-3 day shipping'
+
+    def search_url(self, query):
+        return f"{self.base_url}/en-us/search?q={urllib.parse.quote_plus(query)}"
+
+    def parse(self, content, max_results):
+        return parse_json_ld_listings(content, max_results)
+
+
+class SwappaAdapter(MarketplaceAdapter):
+    key = 'swappa'
+    name = 'Swappa'
+    default_url = 'https://swappa.com'
+    seller = 'Swappa Seller'
+    warranties = ('No warranty', '30 days')
+
+    def search_url(self, query):
+        return f"{self.base_url}/search?q={urllib.parse.quote_plus(query)}"
+
+    def parse(self, content, max_results):
+        return parse_json_ld_listings(content, max_results)
+
+
+ADAPTERS = {adapter.key: adapter for adapter in (EbayAdapter, BackMarketAdapter, SwappaAdapter)}
+
+
+def rank_key(item, query_tokens):
+    """Most query tokens matched first, then cheapest; unpriced listings last"""
+    title_tokens = set(tokenize(item.get('title') or ''))
+    relevance = len(query_tokens & title_tokens) / len(query_tokens) if query_tokens else 0
+    price = parse_price(item.get('price'))
+    return (-relevance, price if price is not None else float('inf'))
+
+
+class MarketplaceFanout:
+    """Queries all adapters concurrently and merges their listings by rank"""
+
+    def __init__(self, adapters, deadline=8.0, per_adapter=2, max_results=4, max_workers=None):
+        self.adapters = list(adapters)
+        self.deadline = deadline
+        self.per_adapter = per_adapter
+        self.max_results = max_results
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or 4 * max(1, len(self.adapters)),
+                                            thread_name_prefix='marketplace')
+        self._lock = threading.Lock()
+        self._stats = {adapter.name: {'ok': 0, 'empty': 0, 'errors': 0, 'cutOff': 0, 'lastMs': None}
+                       for adapter in self.adapters}
+
+    def adapter(self, key):
+        return next((adapter for adapter in self.adapters if adapter.key == key), None)
+
+    def _count(self, adapter, outcome, elapsed=None):
+        with self._lock:
+            stats = self._stats[adapter.name]
+            stats[outcome] += 1
+            if elapsed is not None:
+                stats['lastMs'] = round(elapsed * 1000, 1)
+
+    def _query(self, adapter, query, ends_at):
+        """The adapter's listings, or None if it failed"""
+        started = time.monotonic()
+        if started >= ends_at:
+            # Queued behind other searches until after the deadline: nobody is waiting for it
+            return None
+        try:
+            items = adapter.search(query, max_results=self.per_adapter, deadline=ends_at)
+        except Exception as e:
+            self._count(adapter, 'errors', time.monotonic() - started)
+            print(f"{adapter.name} search error: {e}")
+            return None
+        self._count(adapter, 'ok' if items else 'empty', time.monotonic() - started)
+        return items
+
+    def search(self, query, deadline=None):
+        """Best `max_results` listings found across adapters within `deadline` seconds.
+
+        Raises MarketplacesUnavailableError when no adapter answered, so
+        callers can tell an outage from a search without results.
+        """
+        deadline = self.deadline if deadline is None else deadline
+        ends_at = time.monotonic() + deadline
+        query_tokens = set(tokenize(query))
+        futures = {self._executor.submit(self._query, adapter, query, ends_at): adapter
+                   for adapter in self.adapters}
+
+        ranked = []
+        answered = 0
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                adapter = futures[future]
+                items = future.result()
+                if items is None:
+                    continue
+                answered += 1
+                for position, item in enumerate(items):
+                    insort(ranked, (rank_key(item, query_tokens), adapter.key, position, item))
+        except FutureTimeoutError:
+            for future, adapter in futures.items():
+                if not future.done():
+                    self._count(adapter, 'cutOff')
+                    print(f"{adapter.name} search cut off after {deadline}s")
+
+        if futures and not answered:
+            raise MarketplacesUnavailableError(f"No marketplace answered {query!r} within {deadline}s")
+        return [item for *_, item in ranked[:self.max_results]]
+
+    def stats(self):
+        with self._lock:
+            adapters = {name: dict(stats) for name, stats in self._stats.items()}
+        return {
+            'deadline': self.deadline,
+            'adapters': adapters
+        }
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait)
+
+
+def build_adapters(http_client, keys, ebay_parser_name='lxml', deterministic=True):
+    """Adapters for the comma-separated marketplace `keys`; raises ValueError on unknown keys"""
+    adapters = []
+    for key in (key.strip().lower() for key in keys.split(',')):
+        if not key:
+            continue
+        if key not in ADAPTERS:
+            raise ValueError(f"Unknown marketplace {key!r}; expected one of: {', '.join(ADAPTERS)}")
+        if key == 'ebay':
+            adapters.append(EbayAdapter(http_client, parser=ebay_parser_name, deterministic=deterministic))
+        else:
+            adapters.append(ADAPTERS[key](http_client, deterministic=deterministic))
+    return adapters
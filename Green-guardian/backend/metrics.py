@@ -0,0 +1,146 @@
+"""
+Latency histograms for requests, response sections and marketplace fetches.
+
+Timers feed per-process histograms with fixed buckets. /metrics renders
+them in the Prometheus text format (every worker process keeps its own, so
+scrape each one or sum the buckets); /api/health reports p50/p95/p99
+estimated from the same buckets.
+
+Timers named with `timing=` also land in the current request's timings
+(see start_request()), which the API can echo in a Server-Timing header.
+"""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds in seconds; the last bucket (+Inf) takes everything slower
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+DESCRIPTIONS = {
+    'carthero_request_duration_seconds': 'Time from request start until the response body was sent',
+    'carthero_section_duration_seconds': 'Time to generate one response section (cache misses only)',
+    'carthero_marketplace_fetch_seconds': 'Marketplace search page download time',
+    'carthero_marketplace_parse_seconds': 'Marketplace search page parse time'
+}
+
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+class Histogram:
+    """Bucketed latency observations; not thread-safe on its own"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q):
+        """Estimate, interpolating linearly inside the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(BUCKETS):
+                    return BUCKETS[-1]
+                lower = BUCKETS[index - 1] if index else 0.0
+                return lower + (BUCKETS[index] - lower) * (rank - seen) / count
+            seen += count
+        return BUCKETS[-1]
+
+
+class LatencyRegistry:
+    """Histograms keyed by metric name and label values, safe to share between threads"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name, timing=None, **labels):
+        """Time the block into `name`; `timing` also adds it to the current request's timings"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe(name, elapsed, **labels)
+            timings = _request_timings.get()
+            if timing is not None and timings is not None:
+                timings.append((timing, elapsed))
+
+    def _snapshot(self):
+        with self._lock:
+            return sorted((key, list(histogram.counts), histogram.count, histogram.total)
+                          for key, histogram in self._histograms.items())
+
+    def summary(self):
+        """{metric: {"label=value,...": {count, mean, p50, p95, p99}}}, times in ms"""
+        result = {}
+        for (name, labels), counts, count, total in self._snapshot():
+            histogram = Histogram()
+            histogram.counts, histogram.count, histogram.total = counts, count, total
+            stats = {'count': count, 'meanMs': round(total / count * 1000, 2) if count else None}
+            for label, q in (('p50Ms', 0.5), ('p95Ms', 0.95), ('p99Ms', 0.99)):
+                stats[label] = round(histogram.quantile(q) * 1000, 2)
+            result.setdefault(name, {})[','.join(f"{k}={v}" for k, v in labels)] = stats
+        return result
+
+    def prometheus(self):
+        """All histograms in the Prometheus text exposition format"""
+        lines = []
+        current = None
+        for (name, labels), counts, count, total in self._snapshot():
+            if name != current:
+                current = name
+                lines.append(f"# HELP {name} {DESCRIPTIONS.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+            label_text = ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+            prefix = f"{label_text}," if label_text else ''
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS + ('+Inf',), counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            suffix = f"{{{label_text}}}" if label_text else ''
+            lines.append(f"{name}_sum{suffix} {total:.6f}")
+            lines.append(f"{name}_count{suffix} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def start_request():
+    """Start collecting Server-Timing entries for the current request (thread or task)"""
+    timings = []
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing(timings, total=None):
+    """Server-Timing header value for `timings` [(name, seconds)] plus an optional total"""
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.1f}")
+    return ', '.join(entries)
+
+
+latency = LatencyRegistry()
@@ -0,0 +1,233 @@
+"""
+Columnar storage for pre-scored catalog results.
+
+Each response section is flattened into one column per leaf value
+('carbonFootprint.newProduct.total', ...). Numbers and booleans are stored
+as typed NumPy arrays; strings, lists and other values are JSON-encoded and
+dictionary-encoded (int32 codes into a table of distinct values), which
+keeps repeated values like warranty lengths or tips down to 4 bytes a row.
+A column missing from some rows (a key only some products have) also
+stores a presence mask, so those rows rebuild without the key rather
+than with an explicit None.
+
+Records are keyed by catalog key (title and brand), but scores and
+footprints also depend on price and site, so every record carries the
+price and site it was scored for under SCORED_FOR; lookup_product() only
+returns it to a request for that same price and site.
+"""
+
+import json
+from array import array
+
+import numpy as np
+
+SCHEMA_ARRAY = '__schema__'
+KEYS_ARRAY = '__keys__'
+FORMAT_VERSION = 1
+SCORED_FOR = 'scoredFor'
+
+
+def scored_for(product):
+    """The facts besides title and brand that a ProductContext's scores depend on"""
+    return {'price': round(product.price, 2) if product.price is not None else None, 'site': product.site}
+
+
+def lookup_product(scores, product):
+    """Precomputed sections for a ProductContext from a PrecomputedScores or MappedIndex,
+    or None when the product is unknown or was scored at another price or site"""
+    record = scores.lookup(product.catalog_key)
+    if record is None or record.pop(SCORED_FOR, None) != scored_for(product):
+        return None
+    return record
+
+
+def flatten(value, prefix=''):
+    """Yield (path, leaf) pairs for the nested dicts of a section"""
+    if isinstance(value, dict) and value:
+        for key, child in value.items():
+            yield from flatten(child, f"{prefix}.{key}" if prefix else key)
+    else:
+        yield prefix, value
+
+
+def unflatten(pairs):
+    result = {}
+    for path, value in pairs:
+        node = result
+        parts = path.split('.')
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+    return result
+
+
+def _kind(value):
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int'
+    if isinstance(value, float):
+        return 'float'
+    return 'json'
+
+
+class _Column:
+    TYPECODES = {'bool': 'b', 'int': 'q', 'float': 'd', 'json': 'i'}
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.values = array(self.TYPECODES[kind])
+        self.table = {}
+        self.present = array('b')
+
+    def _widen(self, kind):
+        # int -> float keeps numbers numeric; anything else falls back to JSON
+        if self.kind == 'int' and kind == 'float':
+            self.values = array('d', self.values)
+            self.kind = 'float'
+            return
+        old = [self._decode(v) for v in self.values]
+        present = self.present
+        self.kind, self.values, self.table, self.present = 'json', array('i'), {}, array('b')
+        for value, is_present in zip(old, present):
+            self.append(value, is_present)
+
+    def _decode(self, stored):
+        return bool(stored) if self.kind == 'bool' else stored
+
+    def append(self, value, present=True):
+        if not present:
+            value = None
+        kind = _kind(value)
+        if kind != self.kind and not (self.kind == 'float' and kind == 'int'):
+            self._widen(kind)
+
+        if self.kind == 'json':
+            encoded = json.dumps(value, ensure_ascii=False)
+            code = self.table.get(encoded)
+            if code is None:
+                code = self.table[encoded] = len(self.table)
+            self.values.append(code)
+        else:
+            self.values.append(value)
+        self.present.append(present)
+
+
+class ColumnarWriter:
+    """Accumulates flattened rows column by column and writes a .npz file"""
+
+    def __init__(self):
+        self.keys = array('Q')
+        self.columns = {}
+        self.rows = 0
+
+    def add(self, key, sections):
+        pairs = dict(flatten(sections))
+
+        for path, value in pairs.items():
+            column = self.columns.get(path)
+            if column is None:
+                # Backfill rows written before this path first appeared
+                column = _Column(_kind(value) if self.rows == 0 else 'json')
+                for _ in range(self.rows):
+                    column.append(None, present=False)
+                self.columns[path] = column
+            column.append(value)
+
+        for path, column in self.columns.items():
+            if path not in pairs:
+                column.append(None, present=False)
+
+        self.keys.append(key)
+        self.rows += 1
+
+    def write(self, path):
+        arrays = {KEYS_ARRAY: np.frombuffer(self.keys, dtype=np.uint64)}
+        schema = {'version': FORMAT_VERSION, 'rows': self.rows, 'columns': []}
+
+        for index, (name, column) in enumerate(self.columns.items()):
+            array_name = f"c{index}"
+            entry = {'path': name, 'kind': column.kind, 'array': array_name}
+
+            if column.kind == 'bool':
+                arrays[array_name] = np.frombuffer(column.values, dtype=np.int8).astype(np.bool_)
+            elif column.kind == 'int':
+                arrays[array_name] = np.frombuffer(column.values, dtype=np.int64)
+            elif column.kind == 'float':
+                arrays[array_name] = np.frombuffer(column.values, dtype=np.float64)
+            else:
+                codes = np.frombuffer(column.values, dtype=np.int32)
+                # Narrow the codes when the table is small
+                if len(column.table) < 2 ** 7:
+                    codes = codes.astype(np.int8)
+                elif len(column.table) < 2 ** 15:
+                    codes = codes.astype(np.int16)
+                arrays[array_name] = codes
+                table = json.dumps(list(column.table), ensure_ascii=False).encode('utf-8')
+                arrays[array_name + '_table'] = np.frombuffer(table, dtype=np.uint8)
+
+            if not all(column.present):
+                entry['present'] = array_name + '_present'
+                arrays[entry['present']] = np.frombuffer(column.present, dtype=np.int8).astype(np.bool_)
+
+            schema['columns'].append(entry)
+
+        arrays[SCHEMA_ARRAY] = np.frombuffer(json.dumps(schema).encode('utf-8'), dtype=np.uint8)
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+
+
+class PrecomputedScores:
+    """Read-only lookup of pre-scored sections by catalog key"""
+
+    def __init__(self, path):
+        self.path = path
+        with np.load(path, allow_pickle=False) as data:
+            schema = json.loads(data[SCHEMA_ARRAY].tobytes().decode('utf-8'))
+            keys = data[KEYS_ARRAY]
+            self.columns = []
+            for entry in schema['columns']:
+                values = data[entry['array']]
+                table = None
+                if entry['kind'] == 'json':
+                    table = [json.loads(v) for v in
+                             json.loads(data[entry['array'] + '_table'].tobytes().decode('utf-8'))]
+                present = data[entry['present']] if 'present' in entry else None
+                self.columns.append((entry['path'], entry['kind'], values, table, present))
+
+        self.rows = schema['rows']
+        self._row_for_key = {int(key): row for row, key in enumerate(keys)}
+
+    def __len__(self):
+        return self.rows
+
+    def __contains__(self, key):
+        return key in self._row_for_key
+
+    def _row(self, row):
+        pairs = []
+        for path, kind, values, table, present in self.columns:
+            if present is not None and not present[row]:
+                continue
+            stored = values[row]
+            if kind == 'json':
+                value = table[int(stored)]
+            elif kind == 'bool':
+                value = bool(stored)
+            elif kind == 'int':
+                value = int(stored)
+            else:
+                value = float(stored)
+            pairs.append((path, value))
+        return unflatten(pairs)
+
+    def lookup(self, key):
+        """Sections for `key` as nested dicts, or None for unknown products"""
+        row = self._row_for_key.get(key)
+        if row is None:
+            return None
+        return self._row(row)
+
+    def items(self):
+        for key, row in self._row_for_key.items():
+            yield key, self._row(row)
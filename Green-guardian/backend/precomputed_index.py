@@ -0,0 +1,167 @@
+"""
+Memory-mapped lookup index for pre-scored products.
+
+File layout (little-endian):
+
+    magic     8 bytes   b'CHIDX001'
+    count     uint64
+    keys      count x uint64, sorted catalog keys
+    offsets   count x uint64, record start relative to the records block
+    lengths   count x uint32
+    records   packed UTF-8 JSON, one object of sections per product
+
+The file is opened read-only with mmap, so every worker process serving it
+shares the same page-cache pages. Lookups binary-search the keys in place.
+Replacing the file on disk (write elsewhere, then rename over it) is picked
+up by running servers without a restart.
+
+Build one from a prescore.py output file:
+
+    python precomputed_index.py catalog_scores.npz catalog.idx
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+MAGIC = b'CHIDX001'
+HEADER = struct.Struct('<8sQ')
+
+
+def write_index(path, items):
+    """Write (catalog_key, sections) pairs to `path` atomically"""
+    directory = os.path.dirname(os.path.abspath(path))
+    keys, offsets, lengths = [], [], []
+
+    # Records are spooled in arrival order; only the small key/offset arrays
+    # need sorting, so feeds larger than memory still index fine
+    with tempfile.TemporaryFile(dir=directory) as records:
+        position = 0
+        for key, sections in items:
+            record = json.dumps(sections, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            records.write(record)
+            keys.append(key)
+            offsets.append(position)
+            lengths.append(len(record))
+            position += len(record)
+
+        keys = np.array(keys, dtype='<u8')
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        if len(keys) and np.any(keys[1:] == keys[:-1]):
+            raise ValueError("Duplicate catalog keys in index input")
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.idx.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                out.write(HEADER.pack(MAGIC, len(keys)))
+                out.write(keys.tobytes())
+                out.write(np.array(offsets, dtype='<u8')[order].tobytes())
+                out.write(np.array(lengths, dtype='<u4')[order].tobytes())
+                records.seek(0)
+                while True:
+                    block = records.read(1 << 20)
+                    if not block:
+                        break
+                    out.write(block)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    return len(keys)
+
+
+class _MappedFile:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a CartHero index file")
+
+        self.count = count
+        position = HEADER.size
+        self.keys = np.frombuffer(self.map, dtype='<u8', count=count, offset=position)
+        position += 8 * count
+        self.offsets = np.frombuffer(self.map, dtype='<u8', count=count, offset=position)
+        position += 8 * count
+        self.lengths = np.frombuffer(self.map, dtype='<u4', count=count, offset=position)
+        self.records_start = position + 4 * count
+
+    def record(self, key):
+        row = int(np.searchsorted(self.keys, np.uint64(key)))
+        if row >= self.count or int(self.keys[row]) != key:
+            return None
+        start = self.records_start + int(self.offsets[row])
+        return self.map[start:start + int(self.lengths[row])]
+
+
+class MappedIndex:
+    """Read-only, hot-swappable view of an index file"""
+
+    def __init__(self, path, check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._current = _MappedFile(path)
+        self._next_check = time.monotonic() + check_interval
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._current.count
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check or not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = now + self.check_interval
+            stat = os.stat(self.path)
+            if (stat.st_ino, stat.st_size, stat.st_mtime_ns) != self._current.identity:
+                # In-flight lookups keep using the old mapping they already hold;
+                # it is unmapped once the last reference goes away
+                self._current = _MappedFile(self.path)
+                self.reloads += 1
+                print(f"Reloaded precomputed index {self.path} ({self._current.count} products)")
+        except (OSError, ValueError) as e:
+            print(f"Keeping current precomputed index, reload failed: {e}")
+        finally:
+            self._lock.release()
+
+    def lookup_raw(self, key):
+        """Encoded JSON sections for `key`, or None"""
+        self._maybe_reload()
+        return self._current.record(key)
+
+    def lookup(self, key):
+        record = self.lookup_raw(key)
+        return json.loads(record) if record is not None else None
+
+
+def main(argv=None):
+    from precomputed import PrecomputedScores
+
+    parser = argparse.ArgumentParser(description='Build a memory-mapped index from prescore.py output')
+    parser.add_argument('scores', help='columnar .npz written by prescore.py')
+    parser.add_argument('index', help='index file to write (replaced atomically)')
+    args = parser.parse_args(argv)
+
+    scores = PrecomputedScores(args.scores)
+    count = write_index(args.index, scores.items())
+    print(f"Indexed {count} products -> {args.index}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Offline catalog pre-scoring.
+
+Streams a CSV or JSONL product feed (title, brand, price, site columns),
+scores it on a process pool and writes either a columnar .npz file or a
+memory-mapped .idx lookup index. The API loads either via
+CARTHERO_PRECOMPUTED, so requests for known products skip the generators
+entirely.
+
+Usage:
+    python prescore.py feed.jsonl -o catalog.idx [--workers 8] [--chunk-size 2000]
+    python prescore.py feed.jsonl -o catalog_scores.npz
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from precomputed import SCORED_FOR, ColumnarWriter, scored_for
+from precomputed_index import write_index
+from scoring import ProductScorer
+
+# Sections whose values don't depend on live marketplace data
+PRESCORED_SECTIONS = [
+    ('sustainabilityScore', 'calculate_ai_sustainability_score'),
+    ('carbonFootprint', 'calculate_carbon_footprint'),
+    ('durability', 'generate_durability_info'),
+    ('recommendations', 'generate_recommendations')
+]
+
+_worker_scorer = None
+
+
+def _init_worker():
+    global _worker_scorer
+    # Only the reference data and classifier: importing the API would open
+    # the price database and marketplace pools in every worker
+    _worker_scorer = ProductScorer()
+
+
+def score_chunk(products):
+    """Score one chunk of raw product dicts; runs in a worker process"""
+    results = []
+    for product_data in products:
+        try:
+            product = _worker_scorer.product_context(product_data)
+            sections = {name: getattr(_worker_scorer, method)(product) for name, method in PRESCORED_SECTIONS}
+            sections[SCORED_FOR] = scored_for(product)
+            results.append((product.catalog_key, sections))
+        except Exception as e:
+            print(f"Skipping product {product_data.get('title', '')!r}: {e}", file=sys.stderr)
+    return results
+
+
+def read_feed(path, feed_format=None):
+    """Yield product dicts from a CSV or JSONL feed without loading it all"""
+    if feed_format is None:
+        feed_format = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if feed_format == 'csv':
+            for row in csv.DictReader(f):
+                yield row
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def score_feed(feed_path, workers, chunk_size, feed_format, stats):
+    """Yield (catalog_key, sections) for each distinct product in the feed"""
+    seen = set()
+    # Only a few chunks are in flight at once so huge feeds stream in bounded memory
+    max_pending = workers * 2
+
+    def distinct(results):
+        for key, sections in results:
+            if key in seen:
+                stats['duplicates'] += 1
+                continue
+            seen.add(key)
+            stats['rows'] += 1
+            yield key, sections
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = deque()
+        for chunk in chunked(read_feed(feed_path, feed_format), chunk_size):
+            pending.append(pool.submit(score_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from distinct(pending.popleft().result())
+        while pending:
+            yield from distinct(pending.popleft().result())
+
+
+def prescore(feed_path, output_path, workers=None, chunk_size=2000, feed_format=None):
+    workers = workers or os.cpu_count() or 1
+    stats = {'rows': 0, 'duplicates': 0}
+    started = time.perf_counter()
+    scored = score_feed(feed_path, workers, chunk_size, feed_format, stats)
+
+    if output_path.endswith('.idx'):
+        write_index(output_path, scored)
+    else:
+        writer = ColumnarWriter()
+        for key, sections in scored:
+            writer.add(key, sections)
+        writer.write(output_path)
+
+    elapsed = time.perf_counter() - started
+    print(f"Scored {stats['rows']} products ({stats['duplicates']} duplicates skipped) "
+          f"in {elapsed:.1f}s -> {output_path}")
+    return stats['rows']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pre-score a product feed for the CartHero API')
+    parser.add_argument('feed', help='CSV or JSONL product feed')
+    parser.add_argument('-o', '--output', default='catalog.idx',
+                        help='.idx for a memory-mapped index, .npz for columnar arrays')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help='feed format (default: by extension)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=2000, help='products per worker task')
+    args = parser.parse_args(argv)
+
+    prescore(args.feed, args.output, workers=args.workers, chunk_size=args.chunk_size,
+             feed_format=args.format)
+
+
+if __name__ == '__main__':
+    main()
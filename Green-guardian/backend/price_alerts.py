@@ -0,0 +1,477 @@
+"""
+Durable price alerts with indexed trigger evaluation.
+
+Alerts live in SQLite (same database as the price history) and are loaded
+into a per-product index at startup. For each product and site the index
+keeps two sorted arrays:
+
+    targets     targetPrice of its price_drop alerts
+    thresholds  sustainabilityThreshold of its sustainability_improvement alerts
+
+A price observation p fires the suffix of `targets` that is >= p and a
+sustainability score s fires the prefix of `thresholds` that is <= s, both
+found by binary search, so evaluation touches only the alerts it crosses.
+`frequency` is a cooldown: an alert that fired is not fired again until the
+period has passed.
+
+With several worker processes each keeps its own index. The table is read
+in full once, at startup; after that start() periodically syncs only the
+alerts inserted since (rows past the last rowid seen) and the cancellations
+logged since in price_alert_cancellations, so a sync costs the changes,
+not the table. get()/cancel() fall back to the database for ids this
+process has not loaded yet, and evaluate() re-checks cancellations and
+triggers made elsewhere before firing.
+"""
+
+import json
+import math
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from price_history import signed_key
+
+FREQUENCY_SECONDS = {
+    'hourly': 3600,
+    'daily': 86400,
+    'weekly': 7 * 86400
+}
+ALERT_TYPES = ('price_drop', 'sustainability_improvement')
+DEFAULT_SUSTAINABILITY_THRESHOLD = 70
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_alerts (
+    alert_id TEXT PRIMARY KEY,
+    product_key INTEGER NOT NULL,
+    site TEXT NOT NULL,
+    product_title TEXT NOT NULL,
+    created_price REAL,
+    target_price REAL NOT NULL,
+    frequency TEXT NOT NULL,
+    alert_types TEXT NOT NULL,
+    sustainability_threshold REAL NOT NULL,
+    created REAL NOT NULL,
+    last_triggered REAL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS price_alerts_by_product ON price_alerts (product_key, site);
+
+CREATE TABLE IF NOT EXISTS price_alert_events (
+    alert_id TEXT NOT NULL,
+    triggered_at REAL NOT NULL,
+    alert_type TEXT NOT NULL,
+    price REAL,
+    sustainability_score REAL
+);
+CREATE INDEX IF NOT EXISTS price_alert_events_by_alert ON price_alert_events (alert_id, triggered_at);
+
+-- One row per cancellation, so other processes can sync them incrementally
+CREATE TABLE IF NOT EXISTS price_alert_cancellations (
+    seq INTEGER PRIMARY KEY,
+    alert_id TEXT NOT NULL
+);
+"""
+
+COLUMNS = ('alert_id', 'product_key', 'site', 'product_title', 'created_price', 'target_price', 'frequency',
+           'alert_types', 'sustainability_threshold', 'created', 'last_triggered', 'status')
+
+
+class PriceAlert:
+    __slots__ = ('alert_id', 'series', 'product_title', 'created_price', 'target_price', 'frequency',
+                 'alert_types', 'sustainability_threshold', 'created', 'last_triggered', 'status')
+
+    def __init__(self, alert_id, series, product_title, created_price, target_price, frequency,
+                 alert_types, sustainability_threshold, created, last_triggered=None, status='active'):
+        self.alert_id = alert_id
+        self.series = series
+        self.product_title = product_title
+        self.created_price = created_price
+        self.target_price = target_price
+        self.frequency = frequency
+        self.alert_types = alert_types
+        self.sustainability_threshold = sustainability_threshold
+        self.created = created
+        self.last_triggered = last_triggered
+        self.status = status
+
+    def cooling_down(self, now):
+        return self.last_triggered is not None and now - self.last_triggered < FREQUENCY_SECONDS[self.frequency]
+
+    def to_dict(self):
+        price = self.created_price
+        return {
+            'alertId': self.alert_id,
+            'productTitle': self.product_title,
+            'currentPrice': price,
+            'targetPrice': self.target_price,
+            'discount': f"{((price - self.target_price) / price * 100):.0f}%" if price else "20%",
+            'frequency': self.frequency,
+            'alertTypes': list(self.alert_types),
+            'created': datetime.fromtimestamp(self.created).isoformat(),
+            'lastTriggered': datetime.fromtimestamp(self.last_triggered).isoformat() if self.last_triggered else None,
+            'status': self.status,
+            'sustainabilityThreshold': self.sustainability_threshold
+        }
+
+
+class _SeriesIndex:
+    """Sorted trigger values of one product's alerts, with alert ids alongside"""
+
+    __slots__ = ('targets', 'target_ids', 'thresholds', 'threshold_ids')
+
+    def __init__(self):
+        self.targets, self.target_ids = [], []
+        self.thresholds, self.threshold_ids = [], []
+
+    @staticmethod
+    def _insert(values, ids, value, alert_id):
+        position = bisect_right(values, value)
+        values.insert(position, value)
+        ids.insert(position, alert_id)
+
+    @staticmethod
+    def _remove(values, ids, value, alert_id):
+        position = bisect_left(values, value)
+        while position < len(values) and values[position] == value:
+            if ids[position] == alert_id:
+                del values[position]
+                del ids[position]
+                return
+            position += 1
+
+    def add(self, alert):
+        if 'price_drop' in alert.alert_types:
+            self._insert(self.targets, self.target_ids, alert.target_price, alert.alert_id)
+        if 'sustainability_improvement' in alert.alert_types:
+            self._insert(self.thresholds, self.threshold_ids, alert.sustainability_threshold, alert.alert_id)
+
+    def remove(self, alert):
+        if 'price_drop' in alert.alert_types:
+            self._remove(self.targets, self.target_ids, alert.target_price, alert.alert_id)
+        if 'sustainability_improvement' in alert.alert_types:
+            self._remove(self.thresholds, self.threshold_ids, alert.sustainability_threshold, alert.alert_id)
+
+    def price_crossings(self, price):
+        return self.target_ids[bisect_left(self.targets, price):]
+
+    def score_crossings(self, score):
+        return self.threshold_ids[:bisect_right(self.thresholds, score)]
+
+    def __len__(self):
+        return len(self.target_ids) + len(self.threshold_ids)
+
+
+class PriceAlertEngine:
+    """Persistent alerts plus the in-memory trigger index built from them"""
+
+    def __init__(self, path):
+        self.path = path
+        self.evaluations = 0
+        self.touched = 0
+        self.triggered = 0
+        self.suppressed = 0
+
+        self._lock = threading.Lock()
+        self._alerts = {}
+        self._index = {}
+        # Highest price_alerts rowid and cancellation seq applied so far
+        self._last_rowid = 0
+        self._last_cancellation = 0
+        self.sync_seconds = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._connect()
+        self.load_seconds = self._load()
+
+    def _connect(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._pid = os.getpid()
+
+    def reopen(self):
+        """Open this process's own connection if the current one was inherited across fork"""
+        if self._pid != os.getpid():
+            with self._lock:
+                self._connect()
+        return self
+
+    def start(self, sync_interval=30):
+        """Sync alerts changed by other processes every `sync_interval` seconds on a background thread"""
+        if self._thread is None and sync_interval > 0:
+            self._thread = threading.Thread(target=self._run, args=(sync_interval,),
+                                            name='price-alert-sync', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, sync_interval):
+        while not self._stop.wait(sync_interval):
+            try:
+                self.sync()
+            except sqlite3.Error as e:
+                print(f"Price alert sync failed: {e}")
+
+    @staticmethod
+    def _alert_from_row(row, parsed_types=None):
+        (alert_id, product_key, site, title, created_price, target_price, frequency,
+         alert_types, threshold, created, last_triggered, status) = row
+        types = parsed_types.get(alert_types) if parsed_types is not None else None
+        if types is None:
+            types = tuple(json.loads(alert_types))
+            if parsed_types is not None:
+                parsed_types[alert_types] = types
+        return PriceAlert(alert_id, (product_key, site), title, created_price, target_price, frequency,
+                          types, threshold, created, last_triggered, status)
+
+    def _load(self):
+        """Build the index from every active alert, sorting each product's arrays once.
+
+        Returns the seconds taken.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            # Read the sync positions first: anything written after them is picked up by sync()
+            last_cancellation = self._conn.execute(
+                'SELECT COALESCE(MAX(seq), 0) FROM price_alert_cancellations').fetchone()[0]
+            last_rowid = self._conn.execute('SELECT COALESCE(MAX(rowid), 0) FROM price_alerts').fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM price_alerts WHERE status = 'active' AND rowid <= ?",
+                (last_rowid,)).fetchall()
+        alerts_by_id = {}
+        grouped = {}
+        # Only a handful of distinct alert_types lists exist; parse each once
+        parsed_types = {}
+        for row in rows:
+            alert = self._alert_from_row(row, parsed_types)
+            alerts_by_id[alert.alert_id] = alert
+            grouped.setdefault(alert.series, []).append(alert)
+
+        index_by_series = {}
+        for series, alerts in grouped.items():
+            index = index_by_series[series] = _SeriesIndex()
+            priced = sorted((a.target_price, a.alert_id) for a in alerts if 'price_drop' in a.alert_types)
+            scored = sorted((a.sustainability_threshold, a.alert_id)
+                            for a in alerts if 'sustainability_improvement' in a.alert_types)
+            index.targets = [value for value, _ in priced]
+            index.target_ids = [alert_id for _, alert_id in priced]
+            index.thresholds = [value for value, _ in scored]
+            index.threshold_ids = [alert_id for _, alert_id in scored]
+
+        with self._lock:
+            self._alerts = alerts_by_id
+            self._index = index_by_series
+            self._last_rowid = last_rowid
+            self._last_cancellation = last_cancellation
+        return time.perf_counter() - started
+
+    def sync(self):
+        """Apply alerts created and cancelled through other processes since the last load or sync.
+
+        Reads only the rows past the last rowid and cancellation seen, so
+        the cost follows the number of changes. Returns the seconds taken.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT rowid, {', '.join(COLUMNS)} FROM price_alerts WHERE rowid > ? ORDER BY rowid",
+                (self._last_rowid,)).fetchall()
+            for rowid, *row in rows:
+                self._last_rowid = rowid
+                alert_id, status = row[0], row[-1]
+                if status == 'active' and alert_id not in self._alerts:
+                    alert = self._alerts[alert_id] = self._alert_from_row(row)
+                    self._index.setdefault(alert.series, _SeriesIndex()).add(alert)
+
+            cancellations = self._conn.execute(
+                'SELECT seq, alert_id FROM price_alert_cancellations WHERE seq > ? ORDER BY seq',
+                (self._last_cancellation,)).fetchall()
+            for seq, alert_id in cancellations:
+                self._last_cancellation = seq
+                self._drop(alert_id)
+        self.sync_seconds = time.perf_counter() - started
+        return self.sync_seconds
+
+    def _fetch(self, alert_id):
+        """Load and index an active alert stored by another process; caller holds the lock"""
+        row = self._conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM price_alerts WHERE alert_id = ? AND status = 'active'",
+            (alert_id,)).fetchone()
+        if row is None:
+            return None
+        alert = self._alerts[alert_id] = self._alert_from_row(row)
+        self._index.setdefault(alert.series, _SeriesIndex()).add(alert)
+        return alert
+
+    def create(self, product_key, site, product_title, current_price, settings):
+        """Store and index a new alert; raises ValueError for invalid settings"""
+        target_price = settings.get('targetPrice')
+        if target_price is None:
+            target_price = round(current_price * 0.8, 2) if current_price else 50
+        target_price = float(target_price)
+        if not math.isfinite(target_price) or target_price <= 0:
+            raise ValueError("targetPrice must be a positive number")
+
+        frequency = settings.get('frequency') or 'daily'
+        if frequency not in FREQUENCY_SECONDS:
+            raise ValueError(f"frequency must be one of: {', '.join(FREQUENCY_SECONDS)}")
+
+        alert_types = settings.get('alertTypes') or ALERT_TYPES
+        if not isinstance(alert_types, (list, tuple)):
+            raise ValueError("alertTypes must be a list")
+        alert_types = tuple(alert_types)
+        unknown = set(alert_types).difference(ALERT_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown alertTypes: {', '.join(sorted(unknown))}")
+
+        threshold = settings.get('sustainabilityThreshold')
+        threshold = float(DEFAULT_SUSTAINABILITY_THRESHOLD if threshold is None else threshold)
+        if not math.isfinite(threshold):
+            raise ValueError("sustainabilityThreshold must be a finite number")
+
+        alert = PriceAlert(f"alert_{secrets.token_hex(8)}", (signed_key(product_key), str(site or 'US').upper()),
+                           product_title or 'Unknown Product', current_price, target_price, frequency,
+                           alert_types, threshold, time.time())
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    f"INSERT INTO price_alerts ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                    (alert.alert_id, alert.series[0], alert.series[1], alert.product_title, alert.created_price,
+                     alert.target_price, alert.frequency, json.dumps(alert.alert_types),
+                     alert.sustainability_threshold, alert.created, None, alert.status))
+            self._alerts[alert.alert_id] = alert
+            self._index.setdefault(alert.series, _SeriesIndex()).add(alert)
+        return alert
+
+    def _drop(self, alert_id):
+        """Unindex an alert; caller holds the lock"""
+        alert = self._alerts.pop(alert_id, None)
+        if alert is not None:
+            index = self._index.get(alert.series)
+            if index is not None:
+                index.remove(alert)
+                if not len(index):
+                    del self._index[alert.series]
+        return alert
+
+    def _refresh_state(self, alert_ids):
+        """Apply cancellations and triggers made through other processes; caller holds the lock"""
+        rows = self._conn.execute(
+            f"SELECT alert_id, status, last_triggered FROM price_alerts "
+            f"WHERE alert_id IN ({', '.join('?' * len(alert_ids))})", tuple(alert_ids)).fetchall()
+        for alert_id, status, last_triggered in rows:
+            if status != 'active':
+                self._drop(alert_id)
+                continue
+            alert = self._alerts.get(alert_id)
+            if alert is not None and last_triggered and (alert.last_triggered or 0) < last_triggered:
+                alert.last_triggered = last_triggered
+
+    def get(self, alert_id):
+        with self._lock:
+            if alert_id not in self._alerts:
+                return self._fetch(alert_id)
+            self._refresh_state((alert_id,))
+            return self._alerts.get(alert_id)
+
+    def cancel(self, alert_id):
+        with self._lock:
+            if alert_id not in self._alerts:
+                self._fetch(alert_id)
+            alert = self._drop(alert_id)
+            if alert is None:
+                return None
+            alert.status = 'cancelled'
+            with self._conn:
+                self._conn.execute("UPDATE price_alerts SET status = 'cancelled' WHERE alert_id = ?", (alert_id,))
+                self._conn.execute('INSERT INTO price_alert_cancellations (alert_id) VALUES (?)', (alert_id,))
+        return alert
+
+    def evaluate(self, product_key, site, price=None, sustainability_score=None, now=None):
+        """Fire the alerts crossed by a new price and/or sustainability score.
+
+        Returns the fired events; alerts still inside their frequency window
+        are skipped.
+        """
+        series = (signed_key(product_key), str(site or 'US').upper())
+        now = time.time() if now is None else now
+        events = []
+
+        with self._lock:
+            self.evaluations += 1
+            index = self._index.get(series)
+            if index is None:
+                return events
+
+            crossings = []
+            if price is not None:
+                crossings.extend(('price_drop', alert_id) for alert_id in index.price_crossings(price))
+            if sustainability_score is not None:
+                crossings.extend(('sustainability_improvement', alert_id)
+                                 for alert_id in index.score_crossings(sustainability_score))
+            self.touched += len(crossings)
+
+            due = []
+            for alert_type, alert_id in crossings:
+                if self._alerts[alert_id].cooling_down(now):
+                    self.suppressed += 1
+                else:
+                    due.append((alert_type, alert_id))
+            if due:
+                # Another worker may have fired or cancelled these since they were loaded
+                self._refresh_state({alert_id for _, alert_id in due})
+
+            for alert_type, alert_id in due:
+                alert = self._alerts.get(alert_id)
+                if alert is None:
+                    continue
+                if alert.cooling_down(now):
+                    self.suppressed += 1
+                    continue
+                alert.last_triggered = now
+                events.append((alert_id, now, alert_type, price, sustainability_score))
+
+            if events:
+                self.triggered += len(events)
+                with self._conn:
+                    self._conn.executemany(
+                        'INSERT INTO price_alert_events (alert_id, triggered_at, alert_type, price, sustainability_score) '
+                        'VALUES (?, ?, ?, ?, ?)', events)
+                    self._conn.executemany(
+                        'UPDATE price_alerts SET last_triggered = ? WHERE alert_id = ?',
+                        [(now, alert_id) for alert_id, *_ in events])
+
+        for alert_id, _, alert_type, _, _ in events:
+            print(f"Price alert {alert_id} fired ({alert_type})")
+        return [{'alertId': alert_id, 'triggeredAt': datetime.fromtimestamp(triggered_at).isoformat(),
+                 'type': alert_type, 'price': event_price, 'sustainabilityScore': score}
+                for alert_id, triggered_at, alert_type, event_price, score in events]
+
+    def events(self, alert_id, limit=20):
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT triggered_at, alert_type, price, sustainability_score FROM price_alert_events '
+                'WHERE alert_id = ? ORDER BY triggered_at DESC LIMIT ?', (alert_id, limit)).fetchall()
+        return [{'triggeredAt': datetime.fromtimestamp(triggered_at).isoformat(), 'type': alert_type,
+                 'price': price, 'sustainabilityScore': score}
+                for triggered_at, alert_type, price, score in rows]
+
+    def stats(self):
+        return {
+            'activeAlerts': len(self._alerts),
+            'products': len(self._index),
+            'loadSeconds': round(self.load_seconds, 3),
+            'lastSyncSeconds': round(self.sync_seconds, 4) if self.sync_seconds is not None else None,
+            'evaluations': self.evaluations,
+            'touched': self.touched,
+            'triggered': self.triggered,
+            'suppressed': self.suppressed
+        }
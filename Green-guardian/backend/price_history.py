@@ -0,0 +1,203 @@
+"""
+Persistent price history backed by SQLite.
+
+Every observed price is appended to `observations`. The same write upserts a
+daily rollup row (sample count, sum, low, high, close) keyed by
+(product, site, day), so history analytics read at most one row per day
+from the primary-key index and never re-aggregate raw observations.
+
+Writes are buffered and flushed in one transaction by a background thread;
+repeat sightings of an unchanged price within `min_interval` seconds are
+dropped before they reach the database.
+
+A connection must not be used on both sides of a fork: a pre-forking server
+calls reopen() in each worker before starting the writer.
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    product_key INTEGER NOT NULL,
+    site TEXT NOT NULL,
+    observed_at REAL NOT NULL,
+    price REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS observations_by_product
+    ON observations (product_key, site, observed_at);
+
+CREATE TABLE IF NOT EXISTS daily_prices (
+    product_key INTEGER NOT NULL,
+    site TEXT NOT NULL,
+    day TEXT NOT NULL,
+    samples INTEGER NOT NULL,
+    total REAL NOT NULL,
+    low REAL NOT NULL,
+    high REAL NOT NULL,
+    close REAL NOT NULL,
+    PRIMARY KEY (product_key, site, day)
+) WITHOUT ROWID;
+"""
+
+UPSERT_DAILY = """
+INSERT INTO daily_prices (product_key, site, day, samples, total, low, high, close)
+VALUES (?, ?, ?, 1, ?, ?, ?, ?)
+ON CONFLICT (product_key, site, day) DO UPDATE SET
+    samples = samples + 1,
+    total = total + excluded.total,
+    low = min(low, excluded.low),
+    high = max(high, excluded.high),
+    close = excluded.close
+"""
+
+
+def signed_key(key):
+    """SQLite integers are signed 64-bit; catalog keys are unsigned"""
+    return key - (1 << 64) if key >= (1 << 63) else key
+
+
+def day_of(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d')
+
+
+class PriceHistoryStore:
+    """Append-only price observations with daily rollups"""
+
+    def __init__(self, path, min_interval=300, flush_interval=1.0, max_tracked=100000):
+        self.path = path
+        self.min_interval = min_interval
+        self.flush_interval = flush_interval
+        self.max_tracked = max_tracked
+        self.written = 0
+        self.skipped = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connect()
+
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._pending = []
+        self._last_seen = OrderedDict()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _connect(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._pid = os.getpid()
+
+    def reopen(self):
+        """Open this process's own connection if the current one was inherited across fork"""
+        if self._pid != os.getpid():
+            with self._lock:
+                # Observations queued before the fork belong to the parent
+                self._pending = []
+            self._connect()
+        return self
+
+    def start(self):
+        if self._thread is None and self.flush_interval > 0:
+            self._thread = threading.Thread(target=self._run, name='price-history-writer', daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Price history flush failed: {e}")
+
+    def record(self, product_key, site, price, observed_at=None):
+        """Queue one observed price; returns False if it was throttled"""
+        if price is None:
+            return False
+        observed_at = time.time() if observed_at is None else observed_at
+        series = (signed_key(product_key), str(site or 'US').upper())
+
+        with self._lock:
+            last = self._last_seen.get(series)
+            if last is not None and last[1] == price and observed_at - last[0] < self.min_interval:
+                self.skipped += 1
+                return False
+            self._last_seen[series] = (observed_at, price)
+            self._last_seen.move_to_end(series)
+            if len(self._last_seen) > self.max_tracked:
+                self._last_seen.popitem(last=False)
+            self._pending.append((series[0], series[1], observed_at, price))
+
+        if self._thread is None:
+            self.flush()
+        return True
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+
+        with self._db_lock, self._conn:
+            self._conn.executemany(
+                'INSERT INTO observations (product_key, site, observed_at, price) VALUES (?, ?, ?, ?)',
+                pending)
+            self._conn.executemany(UPSERT_DAILY, [
+                (key, site, day_of(observed_at), price, price, price, price)
+                for key, site, observed_at, price in pending])
+        self.written += len(pending)
+        return len(pending)
+
+    def daily(self, product_key, site, days=30, now=None):
+        """Daily rollups for the last `days` days (today included), oldest first"""
+        # Make this caller's own observation visible before reading
+        self.flush()
+        now = time.time() if now is None else now
+        since = day_of(now - (days - 1) * 86400)
+
+        with self._db_lock:
+            rows = self._conn.execute(
+                'SELECT day, samples, total, low, high, close FROM daily_prices '
+                'WHERE product_key = ? AND site = ? AND day >= ? ORDER BY day',
+                (signed_key(product_key), str(site or 'US').upper(), since)).fetchall()
+
+        return [{'day': day, 'samples': samples, 'total': total, 'low': low, 'high': high, 'close': close}
+                for day, samples, total, low, high, close in rows]
+
+    def prune(self, older_than_days):
+        """Drop raw observations older than the cutoff; daily rollups are kept"""
+        self.flush()
+        cutoff = time.time() - older_than_days * 86400
+        with self._db_lock, self._conn:
+            return self._conn.execute('DELETE FROM observations WHERE observed_at < ?', (cutoff,)).rowcount
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            'path': self.path,
+            'written': self.written,
+            'throttled': self.skipped,
+            'pending': pending
+        }
+
+    def close(self):
+        self._stop.set()
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            print(f"Price history flush failed: {e}")
+
+
+def window_days(days, now=None):
+    """The last `days` calendar days (UTC) as YYYY-MM-DD strings, oldest first"""
+    today = datetime.fromtimestamp(time.time() if now is None else now, timezone.utc).date()
+    return [(today - timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range(days - 1, -1, -1)]
@@ -0,0 +1,101 @@
+import hashlib
+import random
+import re
+
+PRICE_PATTERN = re.compile(r'[\d,]+\.?\d*')
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def parse_price(price_string):
+    if not price_string:
+        return None
+    price_match = PRICE_PATTERN.search(str(price_string))
+    if price_match:
+        return float(price_match.group().replace(',', ''))
+    return None
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def catalog_key(title, brand):
+    """Stable 64-bit key for a product's normalized title and brand.
+
+    Used to look products up in precomputed catalog files, so it must not
+    change between processes (unlike hash()).
+    """
+    normalized = ' '.join(title.lower().split()) + '\x1f' + ' '.join(brand.lower().split())
+    return int.from_bytes(hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def stable_rng(*parts):
+    """random.Random seeded from a stable hash of `parts` (same parts, same sequence in every process)"""
+    data = '\x1f'.join(str(part) for part in parts).encode('utf-8')
+    return random.Random(int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little'))
+
+
+class ProductContext:
+    """Immutable facts about one product, derived once per request.
+
+    The section generators in ProductScorer and CartHeroAPI read the lowercased title/brand,
+    parsed price, upper-cased site and category from here instead of
+    re-deriving them from the raw request body. Every field is already
+    normalized, so the generators and the cache key (fingerprint) always
+    see the same facts.
+    """
+
+    __slots__ = ('title', 'title_lower', 'brand', 'brand_lower', 'price_text', 'price',
+                 'site', 'category', 'tokens', 'fingerprint', 'catalog_key')
+
+    def __init__(self, title, brand, price_text, site, category):
+        set_field = object.__setattr__
+        set_field(self, 'title', title)
+        set_field(self, 'title_lower', title.lower())
+        set_field(self, 'brand', brand)
+        set_field(self, 'brand_lower', brand.lower())
+        set_field(self, 'price_text', price_text)
+        set_field(self, 'price', parse_price(price_text))
+        set_field(self, 'site', str(site or 'US').upper())
+        set_field(self, 'category', category)
+        set_field(self, 'tokens', frozenset(tokenize(title)))
+
+        price = self.price
+        set_field(self, 'fingerprint', (
+            ' '.join(self.title_lower.split()),
+            ' '.join(self.brand_lower.split()),
+            round(price, 2) if price is not None else None,
+            self.site
+        ))
+        set_field(self, 'catalog_key', catalog_key(title, brand))
+
+    @classmethod
+    def from_product_data(cls, product_data, classifier):
+        title = str(product_data.get('title', '') or '')
+        brand = str(product_data.get('brand', '') or '')
+        return cls(
+            title=title,
+            brand=brand,
+            price_text=product_data.get('price', ''),
+            site=product_data.get('site', 'US'),
+            category=classifier.category_for(title, brand)
+        )
+
+    def rng(self, purpose):
+        """Deterministic random source for `purpose` (e.g. a section name) of this product"""
+        return stable_rng(purpose, *self.fingerprint)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"ProductContext is immutable (tried to set '{name}')")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"ProductContext is immutable (tried to delete '{name}')")
+
+    def __eq__(self, other):
+        return isinstance(other, ProductContext) and self.fingerprint == other.fingerprint
+
+    def __hash__(self):
+        return hash(self.fingerprint)
+
+    def __repr__(self):
+        return f"ProductContext(title={self.title!r}, brand={self.brand!r}, price={self.price!r}, category={self.category!r})"
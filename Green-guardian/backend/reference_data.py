@@ -0,0 +1,277 @@
+"""
+Indexed lookups over the reference datasets in mock_data/.
+
+The JSON files are read once and compiled into lookup structures, so
+request-time reads never scan the raw data:
+
+    secondhand.json  category -> listings, plus per-category token postings
+    durability.json  token trie over model names -> durability record
+    emissions.json   sorted weight-band bounds (bisect) and dict tables for
+                     categories, shipping speeds, distances and carriers
+
+A ReferenceData object is never modified after it is built. The watcher
+rebuilds a complete new one in a background thread when a file changes and
+hands it over in a single reference assignment, so readers see either the
+old tables or the new ones, never a mix.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+from product_context import tokenize
+
+WEIGHT_BAND_PATTERN = re.compile(r'^\s*(?:[\d.]+\s*-\s*)?([\d.]+)\s*kg\s*(\+)?\s*$', re.IGNORECASE)
+
+# Tokens found in more than this share of a category's listings ("refurbished",
+# "used", ...) say nothing about the product and are skipped when matching
+COMMON_TOKEN_SHARE = 0.5
+COMMON_TOKEN_MIN_LISTINGS = 20
+
+DATA_FILES = ('secondhand.json', 'durability.json', 'emissions.json')
+
+
+def load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+class ModelTrie:
+    """Token trie mapping model names to records.
+
+    `longest_match` finds the longest model name appearing as a run of
+    tokens anywhere in a title, in time proportional to the title length
+    times the depth of the deepest model name.
+    """
+
+    def __init__(self):
+        self._root = {}
+        self.size = 0
+
+    def add(self, name, record):
+        node = self._root
+        for token in tokenize(name):
+            node = node.setdefault(token, {})
+        if node.get(None) is None:
+            self.size += 1
+        # The None key holds the record of a name ending at this node
+        node[None] = record
+
+    def longest_match(self, tokens):
+        best, best_length = None, 0
+        for start in range(len(tokens)):
+            node = self._root
+            for position in range(start, len(tokens)):
+                node = node.get(tokens[position])
+                if node is None:
+                    break
+                length = position - start + 1
+                if None in node and length > best_length:
+                    best, best_length = node[None], length
+        return best
+
+
+class ReferenceData:
+    """Compiled, read-only view of the secondhand, durability and emissions datasets"""
+
+    def __init__(self, secondhand=None, durability=None, emissions=None):
+        self._index_listings(secondhand or [])
+        self._index_durability(durability or {})
+        self._index_emissions(emissions or {})
+
+    @classmethod
+    def load(cls, directory):
+        secondhand, durability, emissions = DATA_FILES
+        return cls(
+            secondhand=load_json(os.path.join(directory, secondhand), []),
+            durability=load_json(os.path.join(directory, durability), {}),
+            emissions=load_json(os.path.join(directory, emissions), {})
+        )
+
+    def _index_listings(self, listings):
+        self.listings_by_category = {}
+        self.listings_by_id = {}
+        self._postings = {}
+
+        for listing in listings:
+            category = listing.get('category', 'electronics')
+            bucket = self.listings_by_category.setdefault(category, [])
+            postings = self._postings.setdefault(category, {})
+            position = len(bucket)
+            bucket.append(listing)
+            if 'id' in listing:
+                self.listings_by_id[str(listing['id'])] = listing
+            for token in set(tokenize(listing.get('title', ''))):
+                postings.setdefault(token, []).append(position)
+
+        self.listing_count = sum(len(bucket) for bucket in self.listings_by_category.values())
+
+    def _index_durability(self, durability):
+        self.durability_models = ModelTrie()
+        for category, models in durability.items():
+            for model, record in models.items():
+                self.durability_models.add(model, dict(record, category=category, model=model))
+
+    def _index_emissions(self, emissions):
+        self.category_emissions = emissions.get('base_emissions_by_category', {})
+        self.shipping_multipliers = emissions.get('shipping_multipliers', {})
+        self.packaging_emissions = emissions.get('packaging_emissions', {})
+        self.seasonal_adjustments = emissions.get('seasonal_adjustments', {})
+        self.eco_shipping_options = emissions.get('eco_shipping_options', {})
+        self.distances = {name.lower(): info for name, info in emissions.get('shipping_distances', {}).items()}
+        self.carriers = {name.lower(): info for name, info in emissions.get('carrier_efficiency', {}).items()}
+
+        bands = []
+        for label, value in emissions.get('base_emissions_by_weight', {}).items():
+            match = WEIGHT_BAND_PATTERN.match(label)
+            if not match:
+                print(f"Skipping unrecognized weight band {label!r}")
+                continue
+            upper = float('inf') if match.group(2) else float(match.group(1))
+            bands.append((upper, label, value))
+        bands.sort()
+        self._band_bounds = [upper for upper, _, _ in bands]
+        self._bands = [(label, value) for _, label, value in bands]
+
+    def listings_for(self, category, title, limit=2):
+        """Reference listings in `category` sharing the most title tokens.
+
+        A listing must share at least two distinctive tokens with the title
+        (or every token, for one-word titles) to count as the same product.
+        """
+        postings = self._postings.get(category)
+        if not postings:
+            return []
+        bucket = self.listings_by_category[category]
+        common_cutoff = max(COMMON_TOKEN_MIN_LISTINGS, len(bucket) * COMMON_TOKEN_SHARE)
+
+        overlap = Counter()
+        tokens = set(tokenize(title))
+        for token in tokens:
+            positions = postings.get(token)
+            if positions and len(positions) <= common_cutoff:
+                overlap.update(positions)
+
+        required = min(2, len(tokens))
+        matches = [position for position, count in overlap.items() if count >= required]
+        matches.sort(key=lambda position: (-overlap[position], -bucket[position].get('rating', 0), position))
+        return [dict(bucket[position]) for position in matches[:limit]]
+
+    def durability_for(self, text):
+        """Durability record for the longest known model name in `text`, or None"""
+        return self.durability_models.longest_match(tokenize(text))
+
+    def weight_band(self, weight_kg):
+        """(label, base kg CO2) of the band containing `weight_kg`, or None"""
+        if not self._bands:
+            return None
+        position = bisect_left(self._band_bounds, weight_kg)
+        return self._bands[min(position, len(self._bands) - 1)]
+
+    def distance_multiplier(self, distance):
+        info = self.distances.get(str(distance).lower())
+        return info['multiplier'] if info else None
+
+    def carrier(self, name):
+        return self.carriers.get(str(name).lower())
+
+    def stats(self):
+        return {
+            'listings': self.listing_count,
+            'listingCategories': len(self.listings_by_category),
+            'durabilityModels': self.durability_models.size,
+            'weightBands': len(self._bands),
+            'carriers': len(self.carriers)
+        }
+
+
+def file_identities(directory, names=DATA_FILES):
+    """(inode, size, mtime) per data file; None for missing files"""
+    identities = []
+    for name in names:
+        try:
+            stat = os.stat(os.path.join(directory, name))
+            identities.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+        except FileNotFoundError:
+            identities.append(None)
+    return tuple(identities)
+
+
+class ReferenceDataWatcher:
+    """Polls the data files and rebuilds ReferenceData when they change.
+
+    Parsing and indexing run on the watcher thread; `on_swap` is then called
+    with the finished object. A file that fails to parse (for example one
+    caught half-written) leaves the current data in place and is retried
+    when it changes again.
+    """
+
+    def __init__(self, directory, on_swap, interval=5.0):
+        self.directory = directory
+        self.on_swap = on_swap
+        self.interval = interval
+        self.reloads = 0
+        self.failures = 0
+        self.last_reload_seconds = None
+        self.last_reload_at = None
+        self.last_error = None
+        self._identities = file_identities(directory)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name='reference-data-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self):
+        """Reload if any data file changed since the last look; True if swapped"""
+        with self._lock:
+            identities = file_identities(self.directory)
+            if identities == self._identities:
+                return False
+            self._identities = identities
+
+            started = time.perf_counter()
+            try:
+                reference_data = ReferenceData.load(self.directory)
+            except (ValueError, KeyError, TypeError, AttributeError, OSError) as e:
+                self.failures += 1
+                self.last_error = str(e)
+                print(f"Keeping current reference data, reload failed: {e}")
+                return False
+
+            self.on_swap(reference_data)
+            self.reloads += 1
+            self.last_reload_seconds = time.perf_counter() - started
+            self.last_reload_at = time.time()
+            self.last_error = None
+            print(f"Reloaded reference data in {self.last_reload_seconds * 1000:.1f}ms: {reference_data.stats()}")
+            return True
+
+    def stats(self):
+        return {
+            'enabled': self._thread is not None,
+            'interval': self.interval,
+            'reloads': self.reloads,
+            'failures': self.failures,
+            'lastReloadMs': round(self.last_reload_seconds * 1000, 2) if self.last_reload_seconds is not None else None,
+            'lastReloadAt': self.last_reload_at,
+            'lastError': self.last_error
+        }
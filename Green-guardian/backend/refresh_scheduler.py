@@ -0,0 +1,199 @@
+"""
+Background refresh of marketplace-dependent sections for popular products.
+
+Every request touches the product's popularity counter (exponentially
+decayed, so "hot" means recently and frequently requested). A scheduler
+thread periodically takes the hottest N products and re-runs their refresh
+callback on a small bounded pool, ahead of the cache TTL expiring, so user
+requests for popular items find the sections already warm.
+
+Each product's next refresh is jittered around the interval so products
+first seen together do not refresh in lockstep, and a token bucket caps how
+many refreshes start per second regardless of how many are due.
+"""
+
+import heapq
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second with bursts of up to `burst`"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class ProductPopularity:
+    """Request frequency per product with exponential decay"""
+
+    def __init__(self, half_life=600, max_tracked=10000):
+        self.decay = math.log(2) / half_life
+        self.max_tracked = max_tracked
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def touch(self, key, product, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = [1.0, now, product]
+                if len(self._entries) > self.max_tracked:
+                    self._evict(now)
+            else:
+                entry[0] = entry[0] * math.exp(-self.decay * (now - entry[1])) + 1.0
+                entry[1] = now
+                entry[2] = product
+
+    def _score(self, entry, now):
+        return entry[0] * math.exp(-self.decay * (now - entry[1]))
+
+    def _evict(self, now):
+        # Drop the coldest tenth in one go so eviction cost is amortized
+        count = max(1, len(self._entries) // 10)
+        coldest = heapq.nsmallest(count, self._entries.items(), key=lambda item: self._score(item[1], now))
+        for key, _ in coldest:
+            del self._entries[key]
+
+    def hottest(self, n, now=None):
+        """[(key, product, score)] for the `n` most popular products"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            ranked = heapq.nlargest(n, ((self._score(entry, now), key, entry[2])
+                                        for key, entry in self._entries.items()), key=lambda item: item[0])
+        return [(key, product, score) for score, key, product in ranked]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RefreshScheduler:
+    """Periodically runs `refresh_fn(product)` for the hottest products"""
+
+    def __init__(self, refresh_fn, top_n=100, interval=240, jitter=0.1, max_workers=2,
+                 rate=2.0, tick=5.0, popularity=None):
+        self.refresh_fn = refresh_fn
+        self.top_n = top_n
+        self.interval = interval
+        self.jitter = jitter
+        self.max_workers = max_workers
+        # Check often enough that jittered due times are honoured reasonably closely
+        self.tick = min(tick, interval / 4) if interval > 0 else tick
+        self.popularity = popularity or ProductPopularity()
+        self.bucket = TokenBucket(rate)
+
+        self.refreshed = 0
+        self.failures = 0
+        self.rate_limited = 0
+        self.last_cycle_at = None
+
+        self._due = {}
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = None
+
+    def start(self):
+        if self._thread is None and self.top_n > 0 and self.interval > 0:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='refresh')
+            self._thread = threading.Thread(target=self._run, name='refresh-scheduler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _next_due(self, now):
+        return now + self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def touch(self, product):
+        """Count one request for `product`"""
+        if self._thread is None:
+            return
+        key = product.fingerprint
+        self.popularity.touch(key, product)
+        with self._lock:
+            # The request itself just computed fresh sections
+            self._due.setdefault(key, self._next_due(time.monotonic()))
+
+    def _run(self):
+        while not self._stop.wait(self.tick):
+            self.run_cycle()
+
+    def run_cycle(self, now=None):
+        """Submit refreshes for hot products that are due; returns how many started"""
+        now = time.monotonic() if now is None else now
+        self.last_cycle_at = time.time()
+        hot = self.popularity.hottest(self.top_n, now)
+        started = 0
+
+        with self._lock:
+            hot_keys = {key for key, _, _ in hot}
+            # Products that fell out of the top N stop being scheduled
+            for key in [key for key in self._due if key not in hot_keys]:
+                del self._due[key]
+
+        for key, product, _ in hot:
+            with self._lock:
+                if key in self._inflight or self._due.get(key, 0) > now:
+                    continue
+                # Keep the queue no deeper than the pool so refreshes never pile up
+                if len(self._inflight) >= self.max_workers:
+                    break
+                if not self.bucket.try_acquire():
+                    self.rate_limited += 1
+                    break
+                self._inflight.add(key)
+                self._due[key] = self._next_due(now)
+            self._executor.submit(self._refresh, key, product)
+            started += 1
+        return started
+
+    def _refresh(self, key, product):
+        try:
+            self.refresh_fn(product)
+            self.refreshed += 1
+        except Exception as e:
+            self.failures += 1
+            print(f"Background refresh failed for {product!r}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+
+    def stats(self):
+        with self._lock:
+            inflight = len(self._inflight)
+            scheduled = len(self._due)
+        return {
+            'enabled': self._thread is not None,
+            'topN': self.top_n,
+            'interval': self.interval,
+            'tracked': len(self.popularity),
+            'scheduled': scheduled,
+            'inflight': inflight,
+            'refreshed': self.refreshed,
+            'failures': self.failures,
+            'rateLimited': self.rate_limited,
+            'lastCycleAt': self.last_cycle_at
+        }
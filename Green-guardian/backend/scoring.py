@@ -0,0 +1,412 @@
+"""
+Section generators that depend only on the product and the reference data.
+
+ProductScorer holds the mock_data reference datasets and the category
+classifier, and builds the durability, shipping, recommendations,
+sustainability score and carbon footprint sections. CartHeroAPI extends it
+with the live sections (secondhand listings, price history, alerts); the
+offline pre-scoring workers use it on its own, so they never open the
+price database or the marketplace connection pools.
+"""
+
+import os
+import random
+
+import carbon_factors
+import carbon_vectorized
+from category_classifier import CategoryClassifier
+from fast_json import static
+from product_context import ProductContext, parse_price
+from reference_data import ReferenceData
+
+# Constant parts of the sections; dicts and lists are encoded once and spliced into each response
+SHIPPING_DESCRIPTIONS = {
+    'express': 'Fastest delivery with highest emissions',
+    'standard': 'Balanced speed and environmental impact',
+    'noRush': 'Eco-friendly shipping with consolidated deliveries'
+}
+PICKUP_SHIPPING = static({
+    'days': 'Same day',
+    'co2': '0.0 kg CO₂',
+    'cost': 'Free',
+    'description': 'Zero emissions - pick up at store'
+})
+LCA_NOTE = 'Based on lifecycle assessment studies and industry data'
+CARBON_TIPS = ('Extend product lifespan through proper care and maintenance',
+               'Recycle responsibly at end of life to minimize disposal impact')
+CARBON_METHODOLOGY = static({
+    'source': 'Lifecycle Assessment (LCA) studies',
+    'factors': 'Manufacturing, packaging, shipping, usage, end-of-life',
+    'adjustments': 'Price, brand, materials, regional factors'
+})
+
+
+class ProductScorer:
+    def __init__(self, mock_data_dir=None):
+        self.mock_data_dir = mock_data_dir or os.path.join(os.path.dirname(__file__), 'mock_data')
+        # Derive every simulated value from the product so identical requests get identical responses
+        self.deterministic = os.environ.get('CARTHERO_DETERMINISTIC', '1') != '0'
+        self.reference_data = ReferenceData.load(self.mock_data_dir)
+        self.category_classifier = CategoryClassifier()
+
+    def extract_product_category(self, title, brand):
+        return self.category_classifier.category_for(title, brand)
+
+    def product_context(self, product_data):
+        """Build the per-request ProductContext (or pass an existing one through)"""
+        if isinstance(product_data, ProductContext):
+            return product_data
+        return ProductContext.from_product_data(product_data, self.category_classifier)
+
+    def generate_durability_info(self, product_data):
+        product = self.product_context(product_data)
+        rng = self.rng(product, 'durability')
+        category = product.category
+
+        # Known models are answered from the durability reference data
+        record = self.reference_data.durability_for(f"{product.brand} {product.title}")
+        if record:
+            durability = {key: value for key, value in record.items() if key not in ('category', 'model')}
+            durability.setdefault('sustainabilityTips', [
+                'Use protective case to extend lifespan',
+                'Regular maintenance increases durability',
+                'Consider repair before replacement'
+            ])
+            durability['referenceModel'] = record['model']
+            return durability
+
+        category_scores = {
+            'smartphone': {'repair': (6, 8), 'lifespan': '2-4 years'},
+            'laptop': {'repair': (5, 7), 'lifespan': '4-6 years'},
+            'tablet': {'repair': (4, 6), 'lifespan': '3-5 years'},
+            'headphones': {'repair': (7, 9), 'lifespan': '3-7 years'},
+            'smartwatch': {'repair': (3, 5), 'lifespan': '2-4 years'},
+            'gaming': {'repair': (6, 8), 'lifespan': '5-8 years'},
+            'camera': {'repair': (5, 7), 'lifespan': '5-10 years'},
+            'appliance': {'repair': (4, 6), 'lifespan': '10-15 years'},
+            'electronics': {'repair': (5, 7), 'lifespan': '3-5 years'}
+        }
+
+        score_range = category_scores.get(category, category_scores['electronics'])
+        repair_score = rng.randint(score_range['repair'][0], score_range['repair'][1])
+
+        return {
+            'repairabilityScore': repair_score,
+            'maxScore': 10,
+            'warrantyLength': rng.choice(['6 months', '12 months', '24 months', '36 months']),
+            'expectedLifespan': score_range['lifespan'],
+            'repairGuides': rng.randint(3, 25),
+            'partAvailability': rng.choice(['Excellent', 'Good', 'Fair', 'Limited']),
+            'repairCostEstimate': f"${rng.randint(50, 200)}",
+            'sustainabilityTips': [
+                'Use protective case to extend lifespan',
+                'Regular maintenance increases durability',
+                'Consider repair before replacement'
+            ]
+        }
+
+    def generate_shipping_options(self, product_data):
+        product = self.product_context(product_data)
+        category = product.category
+        rng = self.rng(product, 'shippingOptions')
+        base_co2 = self.reference_data.category_emissions.get(category)
+        if base_co2 is None:
+            base_co2 = rng.uniform(1.0, 2.0)
+
+        return {
+            'express': {
+                'days': '1-2',
+                'co2': f"{base_co2 * 3.5:.1f} kg CO₂",
+                'cost': f"${rng.uniform(12, 20):.2f}",
+                'description': SHIPPING_DESCRIPTIONS['express']
+            },
+            'standard': {
+                'days': '3-5',
+                'co2': f"{base_co2 * 2.0:.1f} kg CO₂",
+                'cost': f"${rng.uniform(5, 10):.2f}",
+                'description': SHIPPING_DESCRIPTIONS['standard']
+            },
+            'noRush': {
+                'days': '7-10',
+                'co2': f"{base_co2:.1f} kg CO₂",
+                'cost': 'Free',
+                'description': SHIPPING_DESCRIPTIONS['noRush'],
+                'co2Saved': f"{base_co2 * 2.5:.1f} kg CO₂ saved vs express"
+            },
+            'pickup': PICKUP_SHIPPING
+        }
+
+    def rng(self, product, section):
+        """Random source for one section; derived from the product in deterministic mode"""
+        return product.rng(section) if self.deterministic else random
+
+    def extract_price_number(self, price_string):
+        return parse_price(price_string)
+
+    def product_fingerprint(self, product_data):
+        """Normalized (title, brand, price, site) key identifying a product"""
+        return self.product_context(product_data).fingerprint
+
+    def generate_recommendations(self, product_data):
+        product = self.product_context(product_data)
+        rng = self.rng(product, 'recommendations')
+        title = product.title_lower
+
+        buy_secondhand = any(keyword in title for keyword in
+                           ['phone', 'laptop', 'tablet', 'camera', 'headphones'])
+
+        return {
+            'buySecondhand': buy_secondhand,
+            'repairInstead': 'repair' in title or 'broken' in title,
+            'waitForSale': rng.random() > 0.7,
+            'alternativeBrands': self.suggest_alternative_brands(product.brand),
+            'sustainabilityScore': rng.randint(3, 8),
+            'reasons': [
+                'High refurbished availability',
+                'Good repair options',
+                'Long expected lifespan'
+            ]
+        }
+
+    def suggest_alternative_brands(self, current_brand):
+        sustainable_brands = {
+            'apple': ['Fairphone', 'Framework'],
+            'samsung': ['Fairphone', 'OnePlus'],
+            'dell': ['Framework', 'System76'],
+            'hp': ['Framework', 'System76'],
+            'sony': ['Audio-Technica', 'Sennheiser']
+        }
+
+        return sustainable_brands.get(current_brand.lower(), ['Patagonia', 'Fairphone'])
+
+    def calculate_ai_sustainability_score(self, product_data):
+        """AI-powered sustainability scoring algorithm"""
+        product = self.product_context(product_data)
+        rng = self.rng(product, 'sustainabilityScore')
+        title = product.title_lower
+        brand = product.brand_lower
+        price = product.price
+
+        # Base score
+        score = 50
+
+        # Material sustainability factors
+        sustainable_materials = ['bamboo', 'recycled', 'organic', 'eco', 'sustainable', 'renewable']
+        unsustainable_materials = ['plastic', 'synthetic', 'disposable', 'fast fashion']
+
+        for material in sustainable_materials:
+            if material in title:
+                score += 15
+
+        for material in unsustainable_materials:
+            if material in title:
+                score -= 10
+
+        # Brand sustainability factors
+        sustainable_brands = ['patagonia', 'fairphone', 'framework', 'seventh generation', 'tesla']
+        if brand in sustainable_brands:
+            score += 20
+
+        # Product category factors
+        category = product.category
+        category_scores = {
+            'smartphone': -5,  # Generally less sustainable due to planned obsolescence
+            'laptop': 0,       # Neutral
+            'appliance': 10,   # Long-lasting
+            'gaming': -10,     # High energy consumption
+            'camera': 5        # Long-lasting
+        }
+        score += category_scores.get(category, 0)
+
+        # Price factor (higher price often means better quality/durability)
+        if price:
+            if price > 500:
+                score += 10
+            elif price < 50:
+                score -= 5
+
+        # Ensure score is between 0 and 100
+        score = max(0, min(100, score))
+
+        # Generate AI insights
+        insights = []
+        if score >= 80:
+            insights.append("Excellent sustainability profile with eco-friendly materials")
+        elif score >= 60:
+            insights.append("Good sustainability potential with some eco-friendly features")
+        else:
+            insights.append("Consider secondhand alternatives for better environmental impact")
+
+        if 'recycled' in title:
+            insights.append("Contains recycled materials - great choice!")
+
+        return {
+            'overallScore': score,
+            'breakdown': {
+                'materials': min(100, score - 20),
+                'durability': rng.randint(60, 90),
+                'packaging': rng.randint(40, 80),
+                'shipping': rng.randint(50, 85),
+                'brandEthics': rng.randint(45, 95)
+            },
+            'insights': insights,
+            'confidence': round(rng.uniform(0.75, 0.95), 2),
+            'recommendation': 'buy_secondhand' if score < 60 else 'buy_new'
+        }
+
+    def calculate_carbon_footprint(self, product_data):
+        """Calculate detailed carbon footprint analysis with real-world data"""
+        product = self.product_context(product_data)
+        category = product.category
+        price = product.price
+        title = product.title_lower
+        brand = product.brand_lower
+
+        # Adjust for product specifics
+        manufacturing = carbon_factors.BASE_EMISSIONS.get(category, carbon_factors.DEFAULT_BASE_EMISSIONS)
+
+        # Price-based adjustment (higher quality = more durable materials)
+        if price:
+            if price > 1000:
+                manufacturing *= 1.3  # Premium materials, more complex manufacturing
+            elif price > 500:
+                manufacturing *= 1.1  # Mid-range
+            elif price < 50:
+                manufacturing *= 0.7  # Lower quality, less material
+
+        # Brand-specific adjustments
+        if brand in carbon_factors.PREMIUM_BRANDS:
+            manufacturing *= 1.15  # Premium brands often use more materials
+        elif brand in carbon_factors.ECO_BRANDS:
+            manufacturing *= 0.85  # Eco brands optimize for lower footprint
+
+        # Material-specific adjustments
+        if 'aluminum' in title or 'metal' in title:
+            manufacturing *= 1.2  # Metal production is energy-intensive
+        elif 'recycled' in title:
+            manufacturing *= 0.7  # Recycled materials reduce footprint
+        elif 'organic' in title:
+            manufacturing *= 0.9  # Organic materials typically lower impact
+
+        # Calculate other components
+        packaging = manufacturing * 0.05  # 5% of manufacturing emissions
+
+        # Enhanced shipping calculation based on product weight/size and distance
+        shipping_base = carbon_factors.SHIPPING_BASE.get(category, carbon_factors.DEFAULT_SHIPPING_BASE)
+
+        # Add regional shipping factor
+        shipping = shipping_base * carbon_factors.SHIPPING_MULTIPLIERS.get(product.site, 1.0)
+
+        # Usage emissions (annual) - based on energy consumption
+        usage = carbon_factors.USAGE_FACTORS.get(category, 0)
+
+        # End-of-life emissions (recycling/disposal)
+        end_of_life = manufacturing * 0.02  # 2% for proper recycling
+
+        total = manufacturing + packaging + shipping + usage + end_of_life
+
+        # Enhanced secondhand savings calculation
+        # Manufacturing avoided: 85-95% (product already exists)
+        # Packaging: 50% (usually repackaged)
+        # Shipping: same or slightly higher (might need multiple shipments)
+        # Usage: same (user behavior doesn't change)
+        # End of life: same (still needs disposal eventually)
+
+        manufacturing_savings = manufacturing * 0.90  # 90% of manufacturing avoided
+        packaging_savings = packaging * 0.50          # 50% of packaging avoided
+        shipping_savings = 0                          # No shipping savings (might be higher)
+
+        total_secondhand_savings = manufacturing_savings + packaging_savings
+        secondhand_total = total - total_secondhand_savings
+        savings_percentage = round((total_secondhand_savings / total) * 100)
+
+        # Enhanced comparisons with more relatable metrics
+        return {
+            'newProduct': {
+                'total': round(total, 1),
+                'breakdown': {
+                    'manufacturing': round(manufacturing, 1),
+                    'packaging': round(packaging, 1),
+                    'shipping': round(shipping, 1),
+                    'annualUsage': round(usage, 1),
+                    'endOfLife': round(end_of_life, 1)
+                },
+                'methodology': LCA_NOTE
+            },
+            'secondhandAlternative': {
+                'total': round(secondhand_total, 1),
+                'savings': round(total_secondhand_savings, 1),
+                'savingsPercentage': savings_percentage
+            },
+            'comparisons': {
+                'treesEquivalent': round(total_secondhand_savings / 22, 1),  # 1 tree absorbs 22kg CO2/year
+                'carMilesEquivalent': round(total_secondhand_savings * 2.31, 0),  # EPA: 1kg CO2 = 2.31 miles
+                'homeEnergyDays': round(total_secondhand_savings / 11.9, 1),  # US avg home: 11.9kg CO2/day
+                'flights': round(total_secondhand_savings / 90, 2),  # Short flight: ~90kg CO2
+                'streamingHours': round(total_secondhand_savings / 0.0036, 0)  # 1 hour Netflix: ~3.6g CO2
+            },
+            'tips': [
+                f'Choosing secondhand avoids {round(manufacturing_savings, 1)}kg of manufacturing emissions',
+                *CARBON_TIPS,
+                f'This choice is equivalent to planting {round(total_secondhand_savings / 22, 1)} trees'
+            ],
+            'methodology': CARBON_METHODOLOGY
+        }
+
+    def carbon_footprints(self, products):
+        """calculate_carbon_footprint() for many ProductContexts at once, on the columnar engine"""
+        brand_flags = carbon_vectorized.encode_brands([product.brand_lower for product in products])
+        material_flags = carbon_vectorized.encode_materials([product.title_lower for product in products])
+        columns = carbon_vectorized.carbon_footprint_columns(
+            carbon_vectorized.encode_categories([product.category for product in products]),
+            carbon_vectorized.encode_prices([product.price for product in products]),
+            brand_flags, material_flags,
+            carbon_vectorized.encode_sites([product.site for product in products]))
+        names = ('total', 'manufacturing', 'packaging', 'shipping', 'endOfLife', 'secondhandTotal', 'savings',
+                 'savingsPercentage', 'treesEquivalent', 'carMilesEquivalent', 'homeEnergyDays', 'flights',
+                 'streamingHours', 'manufacturingSavings')
+        rows = zip(*(columns[name].tolist() for name in names))
+
+        footprints = []
+        for product, brand_flag, material_flag, row in zip(products, brand_flags.tolist(), material_flags.tolist(), rows):
+            (total, manufacturing, packaging, shipping, end_of_life, secondhand_total, savings, savings_percentage,
+             trees, car_miles, home_days, flights, streaming, manufacturing_savings) = row
+            # The scalar path returns an unadjusted table value as it is (an int
+            # for most categories); match it so both give the same JSON and ETag
+            price = product.price
+            if (brand_flag == carbon_vectorized.BRAND_NONE and material_flag == carbon_vectorized.MATERIAL_NONE
+                    and not (price and (price > 500 or price < 50))):
+                manufacturing = round(carbon_factors.BASE_EMISSIONS.get(
+                    product.category, carbon_factors.DEFAULT_BASE_EMISSIONS), 1)
+            footprints.append({
+                'newProduct': {
+                    'total': total,
+                    'breakdown': {
+                        'manufacturing': manufacturing,
+                        'packaging': packaging,
+                        'shipping': shipping,
+                        'annualUsage': round(carbon_factors.USAGE_FACTORS.get(product.category, 0), 1),
+                        'endOfLife': end_of_life
+                    },
+                    'methodology': LCA_NOTE
+                },
+                'secondhandAlternative': {
+                    'total': secondhand_total,
+                    'savings': savings,
+                    'savingsPercentage': int(savings_percentage)
+                },
+                'comparisons': {
+                    'treesEquivalent': trees,
+                    'carMilesEquivalent': car_miles,
+                    'homeEnergyDays': home_days,
+                    'flights': flights,
+                    'streamingHours': streaming
+                },
+                'tips': [
+                    f'Choosing secondhand avoids {manufacturing_savings}kg of manufacturing emissions',
+                    *CARBON_TIPS,
+                    f'This choice is equivalent to planting {trees} trees'
+                ],
+                'methodology': CARBON_METHODOLOGY
+            })
+        return footprints
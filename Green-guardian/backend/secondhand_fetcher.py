@@ -0,0 +1,116 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from cache import ResponseCache
+
+
+class SecondhandFetcher:
+    """Runs marketplace scrapes off the request thread.
+
+    Concurrent lookups for the same query share one in-flight fetch
+    (single-flight), and finished results are kept in a short-lived cache
+    so the follow-up call from the extension is answered without a second
+    scrape. A failed fetch is remembered only for `failure_ttl` seconds, so
+    a brief outage does not hide listings for the full `result_ttl`.
+    """
+
+    SECTION = 'listings'
+
+    def __init__(self, fetch_fn, max_workers=4, result_ttl=300, failure_ttl=30, max_queries=2048):
+        self.fetch_fn = fetch_fn
+        self.failure_ttl = failure_ttl
+        self.results = ResponseCache(max_products=max_queries,
+                                     section_ttls={self.SECTION: result_ttl})
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='secondhand-fetch')
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+        self.started = 0
+
+    def _normalize(self, query):
+        return ' '.join(query.lower().split())
+
+    def _run(self, key, query):
+        ttl = None
+        try:
+            items = self.fetch_fn(query)
+        except Exception as e:
+            print(f"Secondhand fetch failed for '{query}': {e}")
+            items = []
+            ttl = self.failure_ttl
+
+        self.results.set(key, self.SECTION, items, ttl=ttl)
+        with self._lock:
+            self._inflight.pop(key, None)
+        return items
+
+    def schedule(self, query):
+        """Return the future for `query`, starting a fetch only if none is in flight"""
+        key = self._normalize(query)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+
+            future = self._executor.submit(self._run, key, query)
+            self._inflight[key] = future
+            self.started += 1
+            return future
+
+    def peek(self, query):
+        """Cached listings for `query`, scheduling a background fetch on a miss.
+
+        Returns None while the fetch is still pending.
+        """
+        key = self._normalize(query)
+        items = self.results.get(key, self.SECTION)
+        if items is not None:
+            return items
+
+        self.schedule(query)
+        return None
+
+    def fetch(self, query, timeout=10):
+        """Wait up to `timeout` seconds for the listings of `query`"""
+        key = self._normalize(query)
+        items = self.results.get(key, self.SECTION)
+        if items is not None:
+            return items
+
+        try:
+            return self.schedule(query).result(timeout=timeout)
+        except FutureTimeoutError:
+            return None
+
+    async def fetch_async(self, query, timeout=10):
+        """fetch() for the event loop: awaits the shared fetch without holding a thread"""
+        key = self._normalize(query)
+        items = self.results.get(key, self.SECTION)
+        if items is not None:
+            return items
+
+        try:
+            # Shielded so a waiter timing out never cancels the fetch other requests share
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(self.schedule(query))), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def is_pending(self, query):
+        with self._lock:
+            return self._normalize(query) in self._inflight
+
+    def stats(self):
+        with self._lock:
+            inflight = len(self._inflight)
+        return {
+            'inflight': inflight,
+            'started': self.started,
+            'coalesced': self.coalesced,
+            'results': self.results.stats()
+        }
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,161 @@
+"""
+Compact wire format for sustainability responses (?format=compact).
+
+The full format repeats long keys in every listing and carries numbers
+pre-formatted for display ("$549.99", "3.2 kg CO₂ saved"). The compact
+format sends the same document with:
+
+- keys replaced by their index in KEYS, in base 36 ("0" ... "z", "10", ...);
+  keys not in KEYS are sent as-is behind a "." prefix
+- formatted strings of the fields in NUMBER_FORMATS sent as the bare
+  number, under "$" plus the key's code; a string is only converted when
+  formatting the number gives back exactly the same string, so expanding
+  is lossless
+- "_": VERSION in the top-level object
+
+carthero-extension/wire-format.js expands it again. KEYS is append-only:
+a new key goes at the end, and anything else bumps VERSION, in both files.
+"""
+
+VERSION = 1
+
+KEYS = (
+    # Sections and metadata
+    'secondhandOptions', 'durability', 'shipping', 'recommendations', 'sustainabilityScore',
+    'carbonFootprint', 'socialImpact', 'priceTracking', 'sustainabilityAlerts', 'metadata',
+    'timestamp', 'apiVersion', 'dataSource', 'processingTime', 'cache', 'precomputed',
+    'secondhandPending', 'fields', 'pending',
+    # Secondhand listings
+    'id', 'title', 'price', 'originalPrice', 'condition', 'warranty', 'seller', 'rating',
+    'reviewCount', 'url', 'savings', 'co2Reduction', 'marketplace', 'category', 'imageUrl',
+    'shippingInfo', 'returnPolicy', 'verifiedSeller', 'realData', 'localDeal',
+    # Durability
+    'repairabilityScore', 'maxScore', 'warrantyLength', 'expectedLifespan', 'repairGuides',
+    'partAvailability', 'repairCostEstimate', 'commonIssues', 'sustainabilityTips', 'referenceModel',
+    # Shipping
+    'express', 'standard', 'noRush', 'pickup', 'days', 'co2', 'cost', 'description', 'co2Saved',
+    # Recommendations and score
+    'buySecondhand', 'repairInstead', 'waitForSale', 'alternativeBrands', 'reasons',
+    'overallScore', 'breakdown', 'materials', 'packaging', 'brandEthics', 'insights',
+    'confidence', 'recommendation', 'adjustments', 'factors', 'source',
+    # Carbon footprint
+    'newProduct', 'total', 'manufacturing', 'annualUsage', 'endOfLife', 'methodology',
+    'secondhandAlternative', 'savingsPercentage', 'comparisons', 'treesEquivalent',
+    'carMilesEquivalent', 'homeEnergyDays', 'flights', 'streamingHours', 'tips',
+    # Social impact
+    'communityStats', 'usersThisMonth', 'co2SavedCommunity', 'itemsReusedCommunity',
+    'moneySavedCommunity', 'yourRanking', 'percentile', 'rank', 'totalUsers', 'shareableStats',
+    'achievement', 'impact', 'hashtags', 'challenges', 'weekly', 'monthly', 'community',
+    # Price tracking
+    'history', 'date', 'low', 'high', 'samples', 'analytics', 'lowestPrice', 'highestPrice',
+    'averagePrice', 'currentTrend', 'predictedNextWeek', 'priceDropProbability', 'observations',
+    'alerts', 'recommended_target', 'deal_threshold',
+    # Sustainability alerts
+    'active_alerts', 'type', 'priority', 'message', 'actionUrl', 'validUntil', 'money',
+    'alert_settings', 'price_drop_threshold', 'sustainability_improvement_threshold',
+    'new_alternatives_notification', 'weekly_impact_summary', 'personalized_tips'
+)
+
+# Formatted fields sent as numbers: key -> (prefix, suffix, decimals)
+NUMBER_FORMATS = {
+    'price': ('$', '', 2),
+    'originalPrice': ('$', '', 2),
+    'cost': ('$', '', 2),
+    'repairCostEstimate': ('$', '', 0),
+    'savings': ('Save ', '%', 0),
+    'co2Reduction': ('', ' kg CO₂ saved', 1),
+    'co2': ('', ' kg CO₂', 1),
+    'co2Saved': ('', ' kg CO₂ saved vs express', 1),
+    'impact': ('Saved ', 'kg CO₂', 1)
+}
+
+
+def _code(index):
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    code = ''
+    while True:
+        index, digit = divmod(index, 36)
+        code = digits[digit] + code
+        if not index:
+            return code
+
+
+CODES = {key: _code(index) for index, key in enumerate(KEYS)}
+assert len(CODES) == len(KEYS), "duplicate key in KEYS"
+
+
+def format_number(value, number_format):
+    prefix, suffix, decimals = number_format
+    # JS toFixed() writes -0 as "0.0"; format it the same way, so a "-0.0"
+    # string fails parse_number's round trip and is sent as the string
+    if value == 0:
+        value = abs(value)
+    return f"{prefix}{value:.{decimals}f}{suffix}"
+
+
+def parse_number(text, number_format):
+    """The number `text` was formatted from, or None if it is not exactly that format"""
+    prefix, suffix, decimals = number_format
+    if not (text.startswith(prefix) and text.endswith(suffix)) or len(text) <= len(prefix) + len(suffix):
+        return None
+    digits = text[len(prefix):len(text) - len(suffix)]
+    # Plain decimals only: float() would also take "nan", "1e3" or "1_000"
+    if not digits.removeprefix('-').replace('.', '', 1).isdigit():
+        return None
+    if decimals == 0 and '.' in digits:
+        return None
+    value = int(digits) if decimals == 0 else float(digits)
+    return value if format_number(value, number_format) == text else None
+
+
+def compact(value):
+    """Compact form of a JSON value (without the version marker)"""
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            code = CODES.get(key)
+            if code is None:
+                result['.' + key] = compact(item)
+                continue
+            number_format = NUMBER_FORMATS.get(key)
+            if number_format is not None and isinstance(item, str):
+                number = parse_number(item, number_format)
+                if number is not None:
+                    result['$' + code] = number
+                    continue
+            result[code] = compact(item)
+        return result
+    if isinstance(value, (list, tuple)):
+        return [compact(item) for item in value]
+    return value
+
+
+def expand(value):
+    """Inverse of compact(); the extension does the same in wire-format.js"""
+    if isinstance(value, dict):
+        result = {}
+        for code, item in value.items():
+            if code.startswith('.'):
+                result[code[1:]] = expand(item)
+            elif code.startswith('$'):
+                key = KEYS[int(code[1:], 36)]
+                result[key] = format_number(item, NUMBER_FORMATS[key])
+            else:
+                result[KEYS[int(code, 36)]] = expand(item)
+        return result
+    if isinstance(value, list):
+        return [expand(item) for item in value]
+    return value
+
+
+def compact_document(document):
+    """compact() of a top-level response object, marked with the format version"""
+    result = compact(document)
+    result['_'] = VERSION
+    return result
+
+
+def expand_document(document):
+    if document.get('_') != VERSION:
+        raise ValueError(f"Unsupported wire format version {document.get('_')!r}")
+    return expand({code: item for code, item in document.items() if code != '_'})
@@ -0,0 +1,98 @@
+"""
+Benchmark the NumPy carbon-footprint engine at catalog scale and check it
+against the scalar ProductScorer.calculate_carbon_footprint().
+
+Usage:
+    python benchmarks/bench_carbon_vectorized.py [rows]    # default 1,000,000
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+import numpy as np
+
+import carbon_vectorized as cv
+from product_context import ProductContext
+from scoring import ProductScorer
+
+BRANDS = ['apple', 'samsung', 'fairphone', 'patagonia', 'acme', '', 'sony', 'generic']
+TITLE_WORDS = ['Aluminum', 'Recycled', 'Organic', 'Metal', 'Classic', 'Pro', 'Ultra', 'Compact']
+SITES = list(cv.SITES) + ['NZ', 'SE']
+CATEGORIES = list(cv.CATEGORIES) + ['garden', 'pet']
+
+scorer = ProductScorer()
+
+
+def synthetic_catalog(rows, seed=1):
+    rng = random.Random(seed)
+    catalog = []
+    for _ in range(rows):
+        price = None if rng.random() < 0.05 else round(rng.choice([rng.uniform(1, 60), rng.uniform(40, 3000)]), 2)
+        catalog.append((
+            rng.choice(CATEGORIES),
+            price,
+            rng.choice(BRANDS),
+            f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)} item".lower(),
+            rng.choice(SITES)
+        ))
+    return catalog
+
+
+def scalar_columns(row):
+    category, price, brand, title, site = row
+    product = ProductContext(title=title, brand=brand, price_text='' if price is None else repr(price),
+                             site=site, category=category)
+    result = scorer.calculate_carbon_footprint(product)
+    breakdown = result['newProduct']['breakdown']
+    comparisons = result['comparisons']
+    return {
+        'total': result['newProduct']['total'],
+        'manufacturing': breakdown['manufacturing'],
+        'packaging': breakdown['packaging'],
+        'shipping': breakdown['shipping'],
+        'annualUsage': breakdown['annualUsage'],
+        'endOfLife': breakdown['endOfLife'],
+        'secondhandTotal': result['secondhandAlternative']['total'],
+        'savings': result['secondhandAlternative']['savings'],
+        'savingsPercentage': result['secondhandAlternative']['savingsPercentage'],
+        **comparisons
+    }
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    catalog = synthetic_catalog(rows)
+    categories, prices, brands, titles, sites = zip(*catalog)
+
+    start = time.perf_counter()
+    inputs = (cv.encode_categories(categories), cv.encode_prices(prices), cv.encode_brands(brands),
+              cv.encode_materials(titles), cv.encode_sites(sites))
+    encode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columns = cv.carbon_footprint_columns(*inputs)
+    compute_time = time.perf_counter() - start
+
+    sample = random.Random(2).sample(range(rows), min(rows, 20_000))
+    start = time.perf_counter()
+    expected = [scalar_columns(catalog[i]) for i in sample]
+    scalar_time = (time.perf_counter() - start) / len(sample)
+
+    mismatches = sum(
+        1 for i, row in zip(sample, expected)
+        for name, value in row.items() if columns[name][i] != value
+    )
+
+    print(f"rows: {rows:,}")
+    print(f"  encode inputs:     {encode_time:8.3f} s")
+    print(f"  vectorized engine: {compute_time:8.3f} s  ({compute_time / rows * 1e9:.0f} ns/row)")
+    print(f"  scalar path:       {scalar_time * rows:8.3f} s  (extrapolated, {scalar_time * 1e6:.1f} us/row)")
+    print(f"  mismatching values in {len(sample):,} sampled rows: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Microbenchmark for extract_product_category().
+
+Compares the original nested substring loop with the Aho-Corasick
+CategoryClassifier as the taxonomy grows to tens of thousands of keywords.
+
+Usage:
+    python benchmarks/bench_category_classifier.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from category_classifier import CategoryClassifier, PRODUCT_CATEGORIES, DEFAULT_CATEGORY
+
+TITLES = [
+    'Apple iPhone 15 Pro Max 256GB Natural Titanium',
+    'Sony WH-1000XM5 Wireless Noise Canceling Headphones',
+    'MacBook Air 13-inch M2 chip 8GB RAM 256GB SSD',
+    'Samsung 28 cu. ft. French Door Refrigerator with Ice Maker',
+    'Organic Cotton Crew Neck T-Shirt - Pack of 3',
+    'Nintendo Switch OLED Model with White Joy-Con',
+    'Canon EOS R6 Mark II Mirrorless Camera Body',
+    'Bamboo Cutting Board Set with Juice Groove'
+]
+BRANDS = ['Apple', 'Sony', 'Samsung', 'Nintendo', 'Canon', '', 'Patagonia']
+
+
+def legacy_category(categories, title, brand):
+    title_lower = title.lower()
+    brand_lower = brand.lower() if brand else ""
+    for category, keywords in categories:
+        for keyword in keywords:
+            if keyword in title_lower or keyword in brand_lower:
+                return category
+    return DEFAULT_CATEGORY
+
+
+def synthetic_taxonomy(total_keywords):
+    """The real categories followed by generated ones up to `total_keywords`"""
+    rng = random.Random(42)
+    categories = [(name, list(keywords)) for name, keywords in PRODUCT_CATEGORIES]
+    count = sum(len(keywords) for _, keywords in categories)
+    index = 0
+    while count < total_keywords:
+        keywords = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(5, 12)))
+                    for _ in range(50)]
+        categories.append((f'category_{index}', keywords))
+        count += len(keywords)
+        index += 1
+    return categories
+
+
+def per_call_us(fn, samples, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for title, brand in samples:
+            fn(title, brand)
+    return (time.perf_counter() - start) / (repeat * len(samples)) * 1e6
+
+
+def main():
+    rng = random.Random(7)
+    # Unique titles so the classifier's memo doesn't hide the automaton cost
+    samples = [(f"{rng.choice(TITLES)} #{i}", rng.choice(BRANDS)) for i in range(2000)]
+
+    print(f"{'keywords':>9}  {'legacy loop':>12}  {'automaton':>10}  {'memoized':>9}  identical")
+    for size in (0, 1_000, 10_000, 50_000):
+        categories = synthetic_taxonomy(size)
+        classifier = CategoryClassifier(categories, memo_size=None)
+
+        repeat = 3 if size <= 1_000 else 1
+        legacy = per_call_us(lambda t, b: legacy_category(categories, t, b), samples, repeat)
+        automaton = per_call_us(lambda t, b: classifier._classify(t.lower(), b.lower()), samples, repeat)
+        memoized = per_call_us(classifier.category_for, samples, 5)
+
+        identical = all(legacy_category(categories, t, b) == classifier.category_for(t, b) for t, b in samples)
+        print(f"{classifier.keyword_count:>9}  {legacy:>9.2f} us  {automaton:>7.2f} us  {memoized:>6.2f} us  {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark the streaming lxml eBay parser against the original BeautifulSoup one.
+
+Usage:
+    python benchmarks/bench_ebay_parser.py [saved_search_page.html ...]
+
+Without arguments a ~1 MB synthetic search page with eBay's listing markup
+is used. Save real pages with e.g. `curl -o page.html "https://www.ebay.com/sch/i.html?_nkw=iphone"`.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+import ebay_parser
+
+LISTING_TEMPLATE = """
+<li class="s-item s-item__pl-on-bottom" data-view="mi:1686|iid:{i}">
+  <div class="s-item__wrapper clearfix">
+    <div class="s-item__image-section"><div class="s-item__image"><a href="https://www.ebay.com/itm/{i}" tabindex="-1">
+      <div class="s-item__image-wrapper image-treatment"><img alt="Listing {i}" src="https://i.ebayimg.com/thumbs/{i}.webp"></div></a></div></div>
+    <div class="s-item__info clearfix">
+      <a class="s-item__link" href="https://www.ebay.com/itm/{i}?hash=item{i}">
+        <h3 class="s-item__title"><span role="heading">Apple iPhone 13 Pro 128GB Unlocked - Listing {i}</span></h3></a>
+      <div class="s-item__subtitle"><span class="SECONDARY_INFO">{condition}</span></div>
+      <div class="s-item__details clearfix">
+        <div class="s-item__detail s-item__detail--primary"><span class="s-item__price">${price}.99</span></div>
+        <div class="s-item__detail s-item__detail--primary"><span class="s-item__shipping s-item__logisticsCost">+$9.95 shipping</span></div>
+        <div class="s-item__detail s-item__detail--primary"><span class="s-item__location s-item__itemLocation">from United States</span></div>
+        <span class="s-item__subtitle">{condition}</span>
+      </div>
+    </div>
+  </div>
+</li>"""
+
+
+def synthetic_page(target_bytes=1_000_000):
+    conditions = ['Pre-Owned', 'Excellent - Refurbished', 'Very Good - Refurbished', 'Fair']
+    head = '<html><head><title>iphone | eBay</title>' + '<script>var x = 1;</script>' * 200 + '</head><body>'
+    nav = '<div class="gh-header">' + '<a class="gh-link" href="#">Link</a>' * 500 + '</div>'
+    parts = [head, nav, '<ul class="srp-results srp-list clearfix">']
+    size = sum(len(p) for p in parts)
+    i = 0
+    while size < target_bytes:
+        listing = LISTING_TEMPLATE.format(i=i, condition=conditions[i % 4], price=200 + i % 300)
+        parts.append(listing)
+        size += len(listing)
+        i += 1
+    parts.append('</ul></body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+def bench(parse, page, max_results, repeat):
+    parse(page, max_results)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(page, max_results)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    if len(sys.argv) > 1:
+        pages = [(path, open(path, 'rb').read()) for path in sys.argv[1:]]
+    else:
+        pages = [('synthetic', synthetic_page())]
+
+    for name, page in pages:
+        print(f"{name}: {len(page) / 1024:.0f} KB")
+        for max_results in (2, 3, 10):
+            bs4_time = bench(ebay_parser.parse_listings_bs4, page, max_results, repeat=3)
+            lxml_time = bench(ebay_parser.parse_listings, page, max_results, repeat=20)
+            # bs4 also returns the nested s-item__* wrapper divs as partial or
+            # duplicate listings, so only compare the distinct complete ones
+            streamed = ebay_parser.parse_listings(page, max_results)
+            original = []
+            for listing in ebay_parser.parse_listings_bs4(page, max_results):
+                if listing['title'] and listing not in original:
+                    original.append(listing)
+            same = streamed[:len(original)] == original
+            print(f"  max_results={max_results:>2}  bs4 {bs4_time * 1000:8.2f} ms  "
+                  f"lxml {lxml_time * 1000:7.2f} ms  speedup {bs4_time / lxml_time:6.1f}x  "
+                  f"fields match: {same}")
+
+
+if __name__ == '__main__':
+    main()
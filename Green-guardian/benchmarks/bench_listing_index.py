@@ -0,0 +1,158 @@
+"""
+Benchmark for ListingIndex queries on a corpus of a few million listings.
+
+Builds the index from synthetic listings (brand/model/storage/colour titles
+spread over the three marketplaces), then times first pages, filtered
+queries and cursor pagination, and checks a sample of results against a
+brute-force scan.
+
+Usage:
+    python benchmarks/bench_listing_index.py [--listings 3000000] [--queries 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from listing_index import ListingIndex
+from product_context import tokenize
+
+PRODUCTS = [
+    ('smartphone', 'Apple', ['iPhone 11', 'iPhone 12', 'iPhone 12 Mini', 'iPhone 13', 'iPhone 13 Pro',
+                             'iPhone 14', 'iPhone 14 Pro Max', 'iPhone 15', 'iPhone SE']),
+    ('smartphone', 'Samsung', ['Galaxy S21', 'Galaxy S22 Ultra', 'Galaxy S23', 'Galaxy A54', 'Galaxy Z Flip 5']),
+    ('smartphone', 'Google', ['Pixel 6', 'Pixel 7 Pro', 'Pixel 8', 'Pixel 7a']),
+    ('laptop', 'Apple', ['MacBook Air M1', 'MacBook Air M2', 'MacBook Pro 14 M1 Pro', 'MacBook Pro 16 M2 Max']),
+    ('laptop', 'Dell', ['XPS 13', 'XPS 15', 'Latitude 7420', 'Inspiron 15']),
+    ('laptop', 'Lenovo', ['ThinkPad X1 Carbon', 'ThinkPad T14', 'Yoga 7i', 'IdeaPad 5']),
+    ('tablet', 'Apple', ['iPad Air', 'iPad Pro 11', 'iPad Mini 6', 'iPad 9th Gen']),
+    ('gaming', 'Nintendo', ['Switch OLED', 'Switch Lite']),
+    ('gaming', 'Sony', ['PlayStation 5', 'PlayStation 4 Pro']),
+    ('headphones', 'Sony', ['WH-1000XM4', 'WH-1000XM5', 'WF-1000XM4']),
+    ('headphones', 'Bose', ['QuietComfort 45', 'QuietComfort Earbuds II'])
+]
+STORAGE = ['64GB', '128GB', '256GB', '512GB', '1TB']
+COLOURS = ['Black', 'White', 'Blue', 'Silver', 'Graphite', 'Gold', 'Green', 'Purple', 'Red', 'Midnight']
+PREFIXES = ['Refurbished', 'Used', 'Renewed', 'Open Box', 'Certified Refurbished', 'Pre-Owned']
+MARKETPLACES = ['eBay', 'BackMarket', 'Swappa']
+CONDITIONS = ['Excellent', 'Very Good', 'Good', 'Fair']
+
+QUERIES = ['iphone 13', 'apple iphone 14 pro max 256gb', 'galaxy s22 ultra', 'macbook air m2',
+           'thinkpad', 'pixel 7 pro 128gb black', 'switch oled', 'sony wh 1000xm5', 'ipad pro 11 1tb',
+           'refurbished', 'dell xps 15 512gb silver', 'quietcomfort 45 white']
+
+
+def listings(count, rng):
+    for i in range(count):
+        category, brand, models = rng.choice(PRODUCTS)
+        model = rng.choice(models)
+        base = rng.uniform(150, 1800)
+        marketplace = rng.choice(MARKETPLACES)
+        yield {
+            'title': f"{rng.choice(PREFIXES)} {brand} {model} {rng.choice(STORAGE)} {rng.choice(COLOURS)}",
+            'price': round(base, 2),
+            'condition': rng.choice(CONDITIONS),
+            'seller': f"{marketplace} Seller",
+            'url': f"https://example.com/{marketplace.lower()}/{i}",
+            'marketplace': marketplace,
+            'category': category
+        }
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def report(label, samples):
+    print(f"{label:<34} p50 {percentile(samples, 0.5):7.1f} us   p99 {percentile(samples, 0.99):7.1f} us")
+
+
+def brute_force(corpus, query, marketplace, min_price, max_price):
+    tokens = set(tokenize(query))
+    hits = [(listing['price'], doc_id) for doc_id, listing in enumerate(corpus)
+            if tokens <= set(tokenize(listing['title']))
+            and (marketplace is None or listing['marketplace'] == marketplace)
+            and (min_price is None or listing['price'] >= min_price)
+            and (max_price is None or listing['price'] <= max_price)]
+    return [f"${price:.2f}" for price, _ in sorted(hits)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--listings', type=int, default=3_000_000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    index = ListingIndex()
+    start = time.perf_counter()
+    index.bulk_load(listings(args.listings, rng))
+    print(f"indexed {len(index)} listings in {time.perf_counter() - start:.1f}s: {index.stats()}")
+
+    # A stream of live additions on top, as the marketplace fetcher would produce
+    start = time.perf_counter()
+    live = list(listings(5000, random.Random(11)))
+    for listing in live:
+        listing['url'] += '/live'
+    index.add_many(live)
+    print(f"added 5000 live listings in {(time.perf_counter() - start) * 1000:.0f}ms: {index.stats()}")
+
+    queries = [rng.choice(QUERIES) for _ in range(args.queries)]
+    cycle = iter(queries * 4)
+
+    report('first page (limit 10)', timed(lambda: index.search(next(cycle), limit=10), args.queries))
+    report('marketplace=Swappa', timed(lambda: index.search(next(cycle), marketplace='Swappa'), args.queries))
+    report('price 300-600', timed(lambda: index.search(next(cycle), min_price=300, max_price=600), args.queries))
+
+    cursors = []
+    for query in QUERIES:
+        page = index.search(query, limit=10)
+        for _ in range(20):
+            if not page['nextCursor']:
+                break
+            cursors.append((query, page['nextCursor']))
+            page = index.search(query, limit=10, cursor=page['nextCursor'])
+    pages = iter(cursors * (args.queries // len(cursors) + 1))
+
+    def next_page():
+        query, cursor = next(pages)
+        index.search(query, limit=10, cursor=cursor)
+    report('cursor page (limit 10)', timed(next_page, args.queries))
+
+    # Correctness: walk every page of a few filtered queries and compare with a scan
+    corpus = list(listings(200_000, random.Random(3)))
+    small = ListingIndex()
+    small.bulk_load(corpus[:150_000])
+    small.add_many(corpus[150_000:])
+    mismatches = 0
+    for query, marketplace, min_price, max_price in (('iphone 13', None, None, None),
+                                                     ('galaxy s22 ultra 256gb', 'eBay', None, 900),
+                                                     ('thinkpad black', 'Swappa', 400, 1200)):
+        prices, cursor = [], None
+        while True:
+            page = small.search(query, marketplace=marketplace, min_price=min_price, max_price=max_price,
+                                limit=50, cursor=cursor)
+            prices.extend(row['price'] for row in page['results'])
+            cursor = page['nextCursor']
+            if not cursor:
+                break
+        mismatches += prices != brute_force(corpus, query, marketplace, min_price, max_price)
+    print(f"paginated results vs brute force: {mismatches} mismatches")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark for PriceAlertEngine trigger evaluation with a million alerts.
+
+Writes the alerts straight into a temporary SQLite database, measures how
+long the engine takes to load and index them and to sync a batch of alerts
+written by another process, then times price observations against the
+indexed engine and against a full scan of every alert.
+
+Usage:
+    python benchmarks/bench_price_alerts.py [--alerts 1000000] [--products 20000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from price_alerts import PriceAlertEngine, SCHEMA, COLUMNS, FREQUENCY_SECONDS
+
+
+def write_alerts(path, alert_count, product_count, rng):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    base_prices = [rng.uniform(20, 2000) for _ in range(product_count)]
+    frequencies = list(FREQUENCY_SECONDS)
+    now = time.time()
+
+    def rows():
+        for i in range(alert_count):
+            product = rng.randrange(product_count)
+            price = base_prices[product]
+            yield (f"alert_{i:08x}", product, 'US', f"Product {product}", price,
+                   round(price * rng.uniform(0.5, 0.99), 2), rng.choice(frequencies),
+                   json.dumps(['price_drop', 'sustainability_improvement']), rng.randint(40, 95), now, None, 'active')
+
+    with conn:
+        conn.executemany(
+            f"INSERT INTO price_alerts ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", rows())
+    conn.close()
+    return base_prices
+
+
+def write_changes(path, created, cancelled, product_count, rng):
+    """What another worker leaves for a sync: new alerts and logged cancellations"""
+    conn = sqlite3.connect(path)
+    now = time.time()
+    with conn:
+        conn.executemany(
+            f"INSERT INTO price_alerts ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+            ((f"alert_new_{i:08x}", rng.randrange(product_count), 'US', 'New product', 100.0, 80.0, 'daily',
+              json.dumps(['price_drop']), 70, now, None, 'active') for i in range(created)))
+        conn.executemany("UPDATE price_alerts SET status = 'cancelled' WHERE alert_id = ?", cancelled)
+        conn.executemany('INSERT INTO price_alert_cancellations (alert_id) VALUES (?)', cancelled)
+    conn.close()
+
+
+def full_scan(alerts, product, price):
+    """What evaluation costs without the index: check every active alert"""
+    return [alert_id for alert_id, (alert_product, target) in alerts.items()
+            if alert_product == product and target >= price]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--alerts', type=int, default=1_000_000)
+    parser.add_argument('--products', type=int, default=20_000)
+    parser.add_argument('--observations', type=int, default=20_000)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'alerts.db')
+
+        start = time.perf_counter()
+        base_prices = write_alerts(path, args.alerts, args.products, rng)
+        print(f"wrote {args.alerts} alerts for {args.products} products in {time.perf_counter() - start:.1f}s")
+
+        engine = PriceAlertEngine(path)
+        print(f"loaded and indexed in {engine.load_seconds:.1f}s")
+
+        cancelled = [(f"alert_{i:08x}",) for i in rng.sample(range(args.alerts), 100)]
+        write_changes(path, 1000, cancelled, args.products, rng)
+        print(f"synced 1000 new and 100 cancelled alerts in {engine.sync() * 1000:.1f}ms "
+              f"({engine.stats()['activeAlerts']} active)")
+
+        # Observations hover around each product's price, so only some alerts cross
+        observations = []
+        for _ in range(args.observations):
+            product = rng.randrange(args.products)
+            observations.append((product, round(base_prices[product] * rng.uniform(0.6, 1.05), 2)))
+
+        # First pass: every crossed alert fires and is written to SQLite
+        now = time.time()
+        start = time.perf_counter()
+        for product, price in observations:
+            engine.evaluate(product, 'US', price=price, now=now)
+        firing = (time.perf_counter() - start) / len(observations) * 1e6
+        stats = engine.stats()
+        print(f"evaluate, firing:     {firing:.1f} us/observation "
+              f"({stats['touched'] / len(observations):.1f} alerts touched, "
+              f"{stats['triggered'] / len(observations):.1f} fired per observation)")
+
+        # Second pass at the same instant: crossed alerts are all cooling down,
+        # which leaves the index lookup itself
+        start = time.perf_counter()
+        for product, price in observations:
+            engine.evaluate(product, 'US', price=price, now=now)
+        indexed = (time.perf_counter() - start) / len(observations) * 1e6
+        print(f"evaluate, index only: {indexed:.1f} us/observation")
+
+        alerts = {alert_id: (alert.series[0], alert.target_price) for alert_id, alert in engine._alerts.items()}
+        sample = observations[:50]
+        start = time.perf_counter()
+        for product, price in sample:
+            full_scan(alerts, product, price)
+        scan = (time.perf_counter() - start) / len(sample) * 1e6
+        print(f"full scan:            {scan:.1f} us/observation ({scan / indexed:.0f}x slower)")
+
+        mismatches = sum(
+            sorted(engine._index[(product, 'US')].price_crossings(price)) != sorted(full_scan(alerts, product, price))
+            for product, price in sample if (product, 'US') in engine._index)
+        print(f"mismatches vs full scan: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark for encoding /api/sustainability responses.
+
+Builds full responses for a set of products (fallback secondhand listings,
+no network), then times Flask's default provider (stdlib json, what
+jsonify used), plain orjson, and fast_json.encode (orjson plus the
+pre-encoded static fragments), and reports bytes per response. Every
+encoding is checked to decode to the same document.
+
+The responses are served from the response cache, whose sections are
+stored pre-encoded. The last row is the first request for a product:
+every section is encoded for the cache, then spliced.
+
+A second table reports bytes on the wire for the full and compact
+(?format=compact) formats with each Content-Encoding the server offers,
+and the time to produce that body from the cached response.
+
+Usage:
+    python benchmarks/bench_serialization.py [--products 200] [--rounds 20]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+# No marketplaces: responses use the fallback listings and nothing touches the network
+os.environ['CARTHERO_MARKETPLACES'] = ''
+os.environ.setdefault('CARTHERO_PRICE_DB', os.path.join(tempfile.mkdtemp(), 'prices.db'))
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+import app
+import compression
+import fast_json
+
+PRODUCTS = [('Apple', 'iPhone 13 Pro 128GB', 799), ('Samsung', 'Galaxy S23 Ultra', 1199),
+            ('Dell', 'XPS 13 Laptop', 999), ('Sony', 'WH-1000XM5 Headphones', 348),
+            ('Patagonia', 'Better Sweater Fleece Jacket', 139), ('Nike', 'Pegasus 40 Running Shoes', 130),
+            ('IKEA', 'POANG Armchair', 129), ('Nintendo', 'Switch OLED', 349)]
+
+
+def responses(count):
+    """[(product, response)] with every section cached"""
+    built = []
+    for i in range(count):
+        brand, model, price = PRODUCTS[i % len(PRODUCTS)]
+        product = app.api.product_context({'title': f"{brand} {model} #{i}", 'brand': brand,
+                                           'price': f"${price + i:.2f}", 'site': 'amazon'})
+        app.build_sustainability_response(product)
+        built.append((product, app.build_sustainability_response(product)))
+    return built
+
+
+def timed(encode, documents, rounds):
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for document in documents:
+            encode(document)
+        best = min(best, time.perf_counter() - started)
+    return best / len(documents) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--products', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    built = responses(args.products)
+    documents = [document for _, document in built]
+    # Same content as plain dicts and lists, as the section generators return it
+    generated = [json.loads(json.dumps(document)) for document in documents]
+    stdlib = DefaultJSONProvider(app.app)
+    encoders = [
+        ('flask default (stdlib json)', lambda document: stdlib.dumps(document).encode('utf-8'), documents),
+        ('orjson', lambda document: orjson.dumps(document, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS),
+         documents),
+        ('fast_json (orjson + static)', fast_json.encode, documents),
+        ('fast_json, first request', lambda document: fast_json.encode(
+            {section: fast_json.static(value) for section, value in document.items()}), generated)
+    ]
+
+    baseline = None
+    for label, encode, documents in encoders:
+        mismatches = sum(json.loads(encode(document)) != json.loads(json.dumps(document)) for document in documents)
+        size = sum(len(encode(document)) for document in documents) / len(documents)
+        micros = timed(encode, documents, args.rounds)
+        baseline = baseline or micros
+        print(f"{label:<30} {micros:7.1f} us/response ({baseline / micros:4.1f}x)  "
+              f"{size:6.0f} bytes  mismatches {mismatches}")
+
+    print()
+    bodies = {
+        'full': lambda product, document: fast_json.encode(document),
+        'compact': lambda product, document: fast_json.encode(app.compact_response(product, document))
+    }
+    for wire, body in bodies.items():
+        for encoding in [None] + compression.available('br,gzip'):
+            def produce(item):
+                encoded = body(*item)
+                return compression.compress(encoded, encoding) if encoding else encoded
+            size = sum(len(produce(item)) for item in built) / len(built)
+            micros = timed(produce, built, args.rounds)
+            print(f"{wire:<8} {encoding or 'identity':<9} {size:6.0f} bytes  {micros:7.1f} us/response")
+
+
+if __name__ == '__main__':
+    main()
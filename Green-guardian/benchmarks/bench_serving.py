@@ -0,0 +1,253 @@
+"""
+Load test comparing the development server, the gunicorn deployment and
+the ASGI (uvicorn) app.
+
+Starts each server on a local port with the marketplaces pointed at fixture
+servers (marketplace_fixtures.py), warms it up, then drives it with
+keep-alive connections from several client processes for a fixed time.
+The request mix is sustainability lookups for a rotating set of products
+plus secondhand searches. Reports requests/sec, requests/sec per server
+core, latency percentiles and errors.
+
+--burst N instead opens N connections at once, each asking
+/api/secondhand-options for one of a few products nobody has looked up
+yet, with every marketplace answering after --fixture-delay seconds. This
+is the overlay traffic a popular deal page causes: a thread-per-request
+server holds only as many of them as it has threads, the ASGI app awaits
+them all on the shared scrapes.
+
+Usage:
+    python benchmarks/bench_serving.py [--servers dev,gunicorn,asgi] [--workers N]
+                                       [--connections 32] [--duration 15]
+    python benchmarks/bench_serving.py --servers gunicorn,asgi --workers 1 --burst 1000 --fixture-delay 1
+
+The client runs on the same machine and takes CPU from the server; on a
+small box give it fewer processes (--clients) or compare only relative
+numbers.
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+sys.path.insert(0, BACKEND)
+
+from marketplace_fixtures import start_fixtures
+
+BRANDS = [('Apple', ['iPhone 13', 'iPhone 14 Pro', 'MacBook Air M2', 'iPad Air']),
+          ('Samsung', ['Galaxy S23', 'Galaxy Tab S8']),
+          ('Sony', ['WH-1000XM5 Headphones', 'PlayStation 5']),
+          ('Dell', ['XPS 13 Laptop']),
+          ('Patagonia', ['Better Sweater Jacket']),
+          ('Nike', ['Air Zoom Pegasus Running Shoes'])]
+SEARCHES = ['iphone 13', 'galaxy s23', 'macbook air', 'headphones', 'playstation 5']
+
+
+def request_mix(products=48):
+    """[(method, path, body)] cycled through by every connection"""
+    mix = []
+    models = [(brand, model) for brand, names in BRANDS for model in names]
+    for i in range(products):
+        brand, model = models[i % len(models)]
+        product = {'title': f"{brand} {model} {['', '128GB', 'Renewed', '2023'][i // len(models) % 4]}".strip(),
+                   'brand': brand, 'price': f"${99 + 37 * i:.2f}", 'site': 'amazon'}
+        mix.append(('POST', '/api/sustainability', json.dumps(product)))
+        if i % 4 == 0:
+            mix.append(('GET', f"/api/search-secondhand?q={SEARCHES[i // 4 % len(SEARCHES)].replace(' ', '+')}&limit=10",
+                        None))
+    return mix
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))] if ordered else 0.0
+
+
+def drive(args):
+    """One client process: `connections` keep-alive connections until `until`"""
+    port, connections, until, offset = args
+    mix = request_mix()
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def connection_loop(position):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        own = []
+        failed = 0
+        while time.time() < until:
+            method, path, body = mix[position % len(mix)]
+            position += 1
+            headers = {'Content-Type': 'application/json'} if body else {}
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            own.append(time.perf_counter() - started)
+        conn.close()
+        with lock:
+            latencies.extend(own)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=connection_loop, args=(offset + i * 7,)) for i in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def burst(args):
+    """`count` simultaneous secondhand-options requests spread over `products` fresh products"""
+    port, count, products, tag = args
+    barrier = threading.Barrier(count)
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def one(position):
+        brand, names = BRANDS[position % products % len(BRANDS)]
+        body = json.dumps({'title': f"{brand} {names[0]} {tag} {position % products}", 'brand': brand,
+                           'price': '$499.00', 'site': 'amazon'})
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+        barrier.wait()
+        started = time.perf_counter()
+        try:
+            conn.request('POST', '/api/secondhand-options?timeout=15', body=body,
+                         headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            ok = False
+        elapsed = time.perf_counter() - started
+        conn.close()
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors[0] += 1
+
+    threads = [threading.Thread(target=one, args=(i,), daemon=True) for i in range(count)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0], time.perf_counter() - started
+
+
+def wait_ready(port, process, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/api/health')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"server on port {port} not ready after {timeout}s")
+
+
+def start_server(kind, port, workers, threads, env):
+    if kind == 'dev':
+        command = [sys.executable, 'app.py']
+        env = dict(env, CARTHERO_PORT=str(port))
+    elif kind == 'asgi':
+        command = [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', str(port),
+                   '--workers', str(workers), '--log-level', 'warning', '--backlog', '4096']
+    else:
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py']
+        env = dict(env, CARTHERO_BIND=f"127.0.0.1:{port}", CARTHERO_WORKERS=str(workers),
+                   CARTHERO_THREADS=str(threads))
+    # Own process group: the dev server's reloader and gunicorn's workers are stopped together
+    return subprocess.Popen(command, cwd=BACKEND, env=env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def run(kind, port, args, env):
+    process = start_server(kind, port, args.workers, args.threads, env)
+    try:
+        wait_ready(port, process)
+        if args.burst:
+            with multiprocessing.Pool(1) as pool:
+                latencies, errors, wall = pool.apply(burst, ((port, args.burst, args.products, f"{kind}{port}"),))
+            print(f"{kind:<9} {len(latencies)}/{args.burst} answered in {wall:6.2f}s  "
+                  f"p50 {percentile(latencies, 0.5):6.2f} s  p99 {percentile(latencies, 0.99):6.2f} s  errors {errors}")
+            return
+
+        # Warm-up: first sight of every product, with its marketplace fetches
+        drive((port, 4, time.time() + 3, 0))
+
+        until = time.time() + args.duration
+        per_client = max(1, args.connections // args.clients)
+        with multiprocessing.Pool(args.clients) as pool:
+            results = pool.map(drive, [(port, per_client, until, i * 101) for i in range(args.clients)])
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=60)
+
+    latencies = [value for client, _ in results for value in client]
+    errors = sum(failed for _, failed in results)
+    cores = 1 if kind == 'dev' else min(args.workers, multiprocessing.cpu_count())
+    rps = len(latencies) / args.duration
+    print(f"{kind:<9} {rps:8.0f} req/s  {rps / cores:8.0f} req/s/core ({cores} core{'s' if cores > 1 else ''})  "
+          f"p50 {percentile(latencies, 0.5) * 1000:6.1f} ms  p99 {percentile(latencies, 0.99) * 1000:6.1f} ms  "
+          f"errors {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--servers', default='dev,gunicorn')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--connections', type=int, default=32)
+    parser.add_argument('--clients', type=int, default=max(1, multiprocessing.cpu_count() // 2))
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--port', type=int, default=5091)
+    parser.add_argument('--burst', type=int, default=0, help='Concurrent secondhand-options requests instead')
+    parser.add_argument('--products', type=int, default=8, help='Distinct products in a burst')
+    parser.add_argument('--fixture-delay', type=float, default=0.0, help='Seconds each marketplace takes to answer')
+    args = parser.parse_args()
+
+    fixtures = start_fixtures({key: args.fixture_delay for key in ('ebay', 'backmarket', 'swappa')})
+    with tempfile.TemporaryDirectory() as scratch:
+        env = dict(os.environ, CARTHERO_PRICE_DB=os.path.join(scratch, 'prices.db'),
+                   CARTHERO_RELOAD_INTERVAL='0', CARTHERO_REFRESH_TOP_N='0')
+        env.update({fixture.env_var: fixture.url for fixture in fixtures.values()})
+        if args.burst:
+            print(f"{args.burst} concurrent requests for {args.products} new products, "
+                  f"marketplaces answering after {args.fixture_delay}s")
+        else:
+            print(f"{args.connections} connections from {args.clients} client processes, "
+                  f"{args.duration:.0f}s per server")
+        for offset, kind in enumerate(name.strip() for name in args.servers.split(',')):
+            run(kind, args.port + offset, args, env)
+    for fixture in fixtures.values():
+        fixture.stop()
+
+
+if __name__ == '__main__':
+    main()
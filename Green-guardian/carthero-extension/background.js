@@ -1,3 +1,5 @@
+importScripts('wire-format.js');
+
 class CartHeroBackground {
   constructor() {
     this.apiBaseUrl = 'http://localhost:5001';
@@ -75,6 +77,11 @@ class CartHeroBackground {
           sendResponse({ success: true, data });
           break;
 
+        case 'fetchSustainabilityBatch':
+          const results = await this.fetchSustainabilityBatch(message.products, sender.tab?.id, message.requestId);
+          sendResponse({ success: true, results });
+          break;
+
         case 'updateStats':
           await this.updateStats(message.statType, message.value);
           sendResponse({ success: true });
@@ -106,7 +113,8 @@ class CartHeroBackground {
 
   async fetchSustainabilityData(productData) {
     try {
-      const response = await fetch(`${this.apiBaseUrl}/api/sustainability`, {
+      // Compact wire format (short keys, bare numbers), expanded here
+      const response = await fetch(`${this.apiBaseUrl}/api/sustainability?format=compact`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -118,14 +126,64 @@ class CartHeroBackground {
         throw new Error(`API request failed: ${response.status}`);
       }
 
-      const data = await response.json();
-      return data;
+      return CartHeroWireFormat.expandDocument(await response.json());
     } catch (error) {
       console.warn('CartHero: API request failed, returning fallback data:', error);
       return this.getFallbackData(productData);
     }
   }
 
+  async fetchSustainabilityBatch(products, tabId, requestId) {
+    // One request for a whole cart or results page; lines arrive as each
+    // product completes and are forwarded to the tab immediately
+    const results = new Array(products.length).fill(null);
+
+    try {
+      const response = await fetch(`${this.apiBaseUrl}/api/sustainability/batch?format=compact`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ products }),
+      });
+
+      if (!response.ok) {
+        throw new Error(`Batch API request failed: ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffered = '';
+
+      const handleLine = (line) => {
+        if (!line.trim()) return;
+        const result = JSON.parse(line);
+        const data = result.data ? CartHeroWireFormat.expandDocument(result.data)
+          : this.getFallbackData(products[result.index]);
+        result.indexes.forEach(index => {
+          results[index] = data;
+          if (tabId !== undefined) {
+            chrome.tabs.sendMessage(tabId, { type: 'sustainabilityBatchResult', requestId, index, data });
+          }
+        });
+      };
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+        const lines = buffered.split('\n');
+        buffered = lines.pop();
+        lines.forEach(handleLine);
+      }
+      handleLine(buffered);
+    } catch (error) {
+      console.warn('CartHero: Batch API request failed, using fallback data:', error);
+    }
+
+    return results.map((data, index) => data || this.getFallbackData(products[index]));
+  }
+
   getFallbackData(productData) {
     const basePrice = this.extractPriceNumber(productData.price);
     const discountedPrice = basePrice ? (basePrice * 0.6).toFixed(2) : '99.99';
@@ -4,6 +4,8 @@ class CartHeroContentScript {
     this.overlayInjected = false;
     this.productData = null;
     this.sustainabilityData = null;
+    this.listingItems = [];
+    this.listingRequestId = 0;
     this.gamification = new CartHeroGamification();
     this.userSystem = new CartHeroUserSystem();
 
@@ -13,6 +15,13 @@ class CartHeroContentScript {
   init() {
     console.log('CartHero: Initializing on page:', window.location.href);
 
+    // Per-product results of a search or cart page batch, forwarded by the background worker
+    chrome.runtime.onMessage.addListener((message) => {
+      if (message.type === 'sustainabilityBatchResult' && message.requestId === this.listingRequestId) {
+        this.renderListingBadge(message.index, message.data);
+      }
+    });
+
     // Initial check
     this.checkAndInject();
 
@@ -21,7 +30,11 @@ class CartHeroContentScript {
   }
 
   checkAndInject() {
-    if (this.isProductPage()) {
+    if (this.isListingPage()) {
+      console.log('CartHero: Search results or cart page detected!');
+      this.cleanupOverlay();
+      this.annotateListingPage();
+    } else if (this.isProductPage()) {
       console.log('CartHero: Product page detected!');
       this.extractProductData();
       this.injectOverlay();
@@ -44,13 +57,15 @@ class CartHeroContentScript {
         this.overlayInjected = false;
         this.productData = null;
         this.sustainabilityData = null;
+        this.listingItems = [];
+        this.listingRequestId++;
         setTimeout(() => this.checkAndInject(), 1000); // Delay to let page load
       }
     }).observe(document, { subtree: true, childList: true });
 
     // Monitor for dynamic content changes
     new MutationObserver((mutations) => {
-      if (!this.overlayInjected && this.isProductPage()) {
+      if (!this.overlayInjected && !this.isListingPage() && this.isProductPage()) {
         // Product content appeared after initial load
         console.log('CartHero: Product content detected after page mutation');
         setTimeout(() => this.checkAndInject(), 500);
@@ -143,6 +158,92 @@ class CartHeroContentScript {
     return false;
   }
 
+  // Search results and carts list many products (and would pass the DOM
+  // checks in isProductPage()); they get one batch request instead
+  isListingPage() {
+    const url = window.location.href;
+    if (!/amazon\.(com|co\.uk|ca|de|fr|it|es|com\.au|in|co\.jp|com\.br|com\.mx)\//.test(url)) {
+      return false;
+    }
+    return /\/s[?\/]/.test(url) || /\/(gp\/cart|cart)(\/|\?|$)/.test(url);
+  }
+
+  collectListingItems() {
+    const rows = document.querySelectorAll(
+      'div[data-component-type="s-search-result"][data-asin], div.sc-list-item[data-asin]'
+    );
+    const items = [];
+
+    rows.forEach(element => {
+      const title = element.querySelector('h2, .sc-product-title, .a-truncate-full')?.textContent.trim();
+      if (!title) return;
+      const price = element.querySelector('.a-price .a-offscreen, .sc-product-price, .sc-price')?.textContent.trim();
+      items.push({
+        element,
+        product: {
+          title,
+          price: price || '',
+          brand: '',
+          asin: element.dataset.asin || null,
+          site: this.getAmazonSite()
+        }
+      });
+    });
+
+    // The batch endpoint takes at most 100 products
+    return items.slice(0, 100);
+  }
+
+  async annotateListingPage(retryCount = 0) {
+    if (this.listingItems.length) return;
+
+    const items = this.collectListingItems();
+    if (!items.length) {
+      if (retryCount < 3) {
+        setTimeout(() => this.annotateListingPage(retryCount + 1), 1000);
+      }
+      return;
+    }
+
+    this.listingItems = items;
+    const requestId = ++this.listingRequestId;
+
+    try {
+      // One request for the whole page; each product's badge is drawn as its
+      // sustainabilityBatchResult message arrives, the rest from the final reply
+      const response = await chrome.runtime.sendMessage({
+        type: 'fetchSustainabilityBatch',
+        requestId,
+        products: items.map(item => item.product)
+      });
+
+      if (response?.success && requestId === this.listingRequestId) {
+        response.results.forEach((data, index) => this.renderListingBadge(index, data));
+      }
+    } catch (error) {
+      console.warn('CartHero: Batch request failed:', error);
+    }
+  }
+
+  renderListingBadge(index, data) {
+    const item = this.listingItems[index];
+    if (!item || !data || item.element.querySelector('.carthero-badge')) return;
+
+    const score = data.sustainabilityScore?.overallScore;
+    const saved = data.carbonFootprint?.secondhandAlternative?.savings;
+    const options = (data.secondhandOptions || []).length;
+
+    const badge = document.createElement('div');
+    badge.className = 'carthero-badge';
+    badge.innerHTML = `
+      <span class="carthero-badge-icon">🌱</span>
+      ${score !== undefined ? `<span class="carthero-badge-score">${score}/100</span>` : ''}
+      ${saved !== undefined ? `<span>${saved} kg CO₂ saved secondhand</span>` : ''}
+      ${options ? `<span>${options} secondhand option${options === 1 ? '' : 's'}</span>` : ''}
+    `;
+    item.element.appendChild(badge);
+  }
+
   extractProductData() {
     try {
       const title = this.getProductTitle();
@@ -396,7 +497,15 @@ class CartHeroContentScript {
     if (!this.productData) return null;
 
     try {
-      const response = await fetch(`${this.apiBaseUrl}/api/sustainability`, {
+      const data = await this.streamSustainabilityData();
+      this.sustainabilityData = data;
+      return data;
+    } catch (error) {
+      console.warn('CartHero: Streaming request failed, falling back to a single response:', error);
+    }
+
+    try {
+      const response = await fetch(`${this.apiBaseUrl}/api/sustainability?format=compact`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -408,7 +517,7 @@ class CartHeroContentScript {
         throw new Error('API request failed');
       }
 
-      const data = await response.json();
+      const data = CartHeroWireFormat.expandDocument(await response.json());
       this.sustainabilityData = data;
       return data;
     } catch (error) {
@@ -417,6 +526,131 @@ class CartHeroContentScript {
     }
   }
 
+  // Reads the NDJSON section stream. Resolves as soon as every section except the
+  // secondhand listings has arrived; the listings (sent last, after the live
+  // marketplace search) are rendered into the overlay when they come in.
+  async streamSustainabilityData() {
+    // Compact wire format (short keys, bare numbers), expanded line by line
+    const response = await fetch(`${this.apiBaseUrl}/api/sustainability/stream?format=compact`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify(this.productData)
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error('Streaming API request failed');
+    }
+
+    const firstPaintSections = ['durability', 'shipping', 'recommendations', 'sustainabilityScore',
+      'carbonFootprint', 'socialImpact', 'priceTracking', 'sustainabilityAlerts'];
+    const data = {};
+    const received = new Set();
+    let painted = false;
+    let resolveFirstPaint;
+    const firstPaint = new Promise(resolve => { resolveFirstPaint = resolve; });
+
+    const handleLine = (line) => {
+      const message = CartHeroWireFormat.expandLine(JSON.parse(line));
+      received.add(message.section);
+
+      if (message.error) {
+        console.warn(`CartHero: Section ${message.section} failed:`, message.error);
+      } else if (message.section === 'secondhandOptions' && painted) {
+        data.secondhandOptions = message.data;
+        this.updateSecondhandSection(message.data);
+      } else if (message.section === 'metadata' && painted && message.data.secondhandPending) {
+        data.metadata = message.data;
+        this.refreshSecondhandOptions();
+      } else {
+        data[message.section] = message.data;
+      }
+
+      if (!painted && firstPaintSections.every(section => received.has(section))) {
+        painted = true;
+        resolveFirstPaint(data);
+      }
+    };
+
+    const readStream = async () => {
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let newline;
+        while ((newline = buffer.indexOf('\n')) >= 0) {
+          const line = buffer.slice(0, newline).trim();
+          buffer = buffer.slice(newline + 1);
+          if (line) handleLine(line);
+        }
+      }
+      if (buffer.trim()) handleLine(buffer.trim());
+    };
+
+    readStream()
+      .catch(error => {
+        console.warn('CartHero: Sustainability stream interrupted:', error);
+      })
+      .then(() => {
+        if (!painted) {
+          painted = true;
+          resolveFirstPaint(Object.keys(data).length > 0 ? data : this.getFallbackData());
+        }
+        // Stream ended without listings; ask for them separately
+        if (!received.has('secondhandOptions') && Object.keys(data).length > 0) {
+          this.refreshSecondhandOptions();
+        }
+      });
+
+    return firstPaint;
+  }
+
+  updateSecondhandSection(options) {
+    const section = document.getElementById('secondhand-options');
+    if (section) {
+      section.innerHTML = `
+        <h4>🔄 Better Alternatives Found</h4>
+        ${this.renderSecondhandOptions(options)}
+      `;
+      this.bindSecondhandOptionButtons(section);
+    }
+  }
+
+  async refreshSecondhandOptions() {
+    if (!this.productData) return;
+
+    try {
+      const response = await fetch(`${this.apiBaseUrl}/api/secondhand-options?format=compact`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(this.productData)
+      });
+
+      if (!response.ok) {
+        throw new Error('Secondhand options request failed');
+      }
+
+      const result = CartHeroWireFormat.expandDocument(await response.json());
+      if (!result.secondhandOptions) return;
+
+      if (this.sustainabilityData) {
+        this.sustainabilityData.secondhandOptions = result.secondhandOptions;
+      }
+
+      this.updateSecondhandSection(result.secondhandOptions);
+    } catch (error) {
+      console.warn('CartHero: Could not refresh live secondhand options:', error);
+    }
+  }
+
   getFallbackData() {
     const productTitle = this.productData?.title || "Sample Product";
     const basePrice = 299;
@@ -649,6 +883,11 @@ class CartHeroContentScript {
         // Add scroll-to-view functionality
         this.addScrollToOverlay();
 
+        // Live marketplace listings are fetched in a follow-up call
+        if (data.metadata?.secondhandPending) {
+          this.refreshSecondhandOptions();
+        }
+
         console.log('CartHero: Overlay injection complete!');
       } else {
         console.error('CartHero: Could not find insertion point');
@@ -838,7 +1077,9 @@ class CartHeroContentScript {
 
         <div class="carthero-section" id="secondhand-options">
           <h4>🔄 Better Alternatives Found</h4>
-          ${this.renderSecondhandOptions(data.secondhandOptions)}
+          ${data.secondhandOptions
+            ? this.renderSecondhandOptions(data.secondhandOptions)
+            : '<p class="no-options">Searching secondhand marketplaces...</p>'}
         </div>
 
         ${data.carbonFootprint ? `
@@ -1169,23 +1410,7 @@ class CartHeroContentScript {
       });
     }
 
-    const viewOptionBtns = document.querySelectorAll('.view-option-btn');
-    viewOptionBtns.forEach(btn => {
-      btn.addEventListener('click', (e) => {
-        const url = e.target.getAttribute('data-url');
-        if (url) {
-          window.open(url, '_blank');
-          this.incrementStat('items-reused');
-          // Award gamification XP
-          this.gamification.trackAction('choose_secondhand');
-
-          // Track with user system
-          const co2Saved = this.extractCO2FromText(e.target.closest('.secondhand-option').querySelector('.co2-badge')?.textContent);
-          const moneySaved = this.extractMoneyFromText(e.target.closest('.secondhand-option').querySelector('.savings')?.textContent);
-          this.userSystem.trackAction('choose_secondhand', { co2Saved, moneySaved });
-        }
-      });
-    });
+    this.bindSecondhandOptionButtons(document);
 
     const shippingOptions = document.querySelectorAll('input[name="shipping"]');
     shippingOptions.forEach(option => {
@@ -1279,6 +1504,26 @@ class CartHeroContentScript {
     this.animateCounters();
   }
 
+  bindSecondhandOptionButtons(root) {
+    const viewOptionBtns = root.querySelectorAll('.view-option-btn');
+    viewOptionBtns.forEach(btn => {
+      btn.addEventListener('click', (e) => {
+        const url = e.target.getAttribute('data-url');
+        if (url) {
+          window.open(url, '_blank');
+          this.incrementStat('items-reused');
+          // Award gamification XP
+          this.gamification.trackAction('choose_secondhand');
+
+          // Track with user system
+          const co2Saved = this.extractCO2FromText(e.target.closest('.secondhand-option').querySelector('.co2-badge')?.textContent);
+          const moneySaved = this.extractMoneyFromText(e.target.closest('.secondhand-option').querySelector('.savings')?.textContent);
+          this.userSystem.trackAction('choose_secondhand', { co2Saved, moneySaved });
+        }
+      });
+    });
+  }
+
   handleRecommendationAction(recType) {
     console.log('Handling recommendation action:', recType);
 
@@ -0,0 +1,102 @@
+// Expands the compact wire format of the CartHero API (?format=compact) into
+// the full response shape. Keys arrive as base-36 indexes into KEYS, display
+// strings such as "$549.99" or "3.2 kg CO₂ saved" as bare numbers under a
+// "$"-prefixed key, and keys outside the table behind a "." prefix.
+// KEYS and NUMBER_FORMATS must match backend/wire_format.py.
+class CartHeroWireFormat {
+  static VERSION = 1;
+
+  static KEYS = [
+    // Sections and metadata
+    'secondhandOptions', 'durability', 'shipping', 'recommendations', 'sustainabilityScore',
+    'carbonFootprint', 'socialImpact', 'priceTracking', 'sustainabilityAlerts', 'metadata',
+    'timestamp', 'apiVersion', 'dataSource', 'processingTime', 'cache', 'precomputed',
+    'secondhandPending', 'fields', 'pending',
+    // Secondhand listings
+    'id', 'title', 'price', 'originalPrice', 'condition', 'warranty', 'seller', 'rating',
+    'reviewCount', 'url', 'savings', 'co2Reduction', 'marketplace', 'category', 'imageUrl',
+    'shippingInfo', 'returnPolicy', 'verifiedSeller', 'realData', 'localDeal',
+    // Durability
+    'repairabilityScore', 'maxScore', 'warrantyLength', 'expectedLifespan', 'repairGuides',
+    'partAvailability', 'repairCostEstimate', 'commonIssues', 'sustainabilityTips', 'referenceModel',
+    // Shipping
+    'express', 'standard', 'noRush', 'pickup', 'days', 'co2', 'cost', 'description', 'co2Saved',
+    // Recommendations and score
+    'buySecondhand', 'repairInstead', 'waitForSale', 'alternativeBrands', 'reasons',
+    'overallScore', 'breakdown', 'materials', 'packaging', 'brandEthics', 'insights',
+    'confidence', 'recommendation', 'adjustments', 'factors', 'source',
+    // Carbon footprint
+    'newProduct', 'total', 'manufacturing', 'annualUsage', 'endOfLife', 'methodology',
+    'secondhandAlternative', 'savingsPercentage', 'comparisons', 'treesEquivalent',
+    'carMilesEquivalent', 'homeEnergyDays', 'flights', 'streamingHours', 'tips',
+    // Social impact
+    'communityStats', 'usersThisMonth', 'co2SavedCommunity', 'itemsReusedCommunity',
+    'moneySavedCommunity', 'yourRanking', 'percentile', 'rank', 'totalUsers', 'shareableStats',
+    'achievement', 'impact', 'hashtags', 'challenges', 'weekly', 'monthly', 'community',
+    // Price tracking
+    'history', 'date', 'low', 'high', 'samples', 'analytics', 'lowestPrice', 'highestPrice',
+    'averagePrice', 'currentTrend', 'predictedNextWeek', 'priceDropProbability', 'observations',
+    'alerts', 'recommended_target', 'deal_threshold',
+    // Sustainability alerts
+    'active_alerts', 'type', 'priority', 'message', 'actionUrl', 'validUntil', 'money',
+    'alert_settings', 'price_drop_threshold', 'sustainability_improvement_threshold',
+    'new_alternatives_notification', 'weekly_impact_summary', 'personalized_tips'
+  ];
+
+  // Formatted fields sent as numbers: key -> [prefix, suffix, decimals]
+  static NUMBER_FORMATS = {
+    price: ['$', '', 2],
+    originalPrice: ['$', '', 2],
+    cost: ['$', '', 2],
+    repairCostEstimate: ['$', '', 0],
+    savings: ['Save ', '%', 0],
+    co2Reduction: ['', ' kg CO₂ saved', 1],
+    co2: ['', ' kg CO₂', 1],
+    co2Saved: ['', ' kg CO₂ saved vs express', 1],
+    impact: ['Saved ', 'kg CO₂', 1]
+  };
+
+  static expand(value) {
+    if (Array.isArray(value)) {
+      return value.map(item => CartHeroWireFormat.expand(item));
+    }
+    if (value === null || typeof value !== 'object') {
+      return value;
+    }
+
+    const result = {};
+    for (const [code, item] of Object.entries(value)) {
+      if (code.startsWith('.')) {
+        result[code.slice(1)] = CartHeroWireFormat.expand(item);
+      } else if (code.startsWith('$')) {
+        const key = CartHeroWireFormat.KEYS[parseInt(code.slice(1), 36)];
+        const [prefix, suffix, decimals] = CartHeroWireFormat.NUMBER_FORMATS[key];
+        result[key] = `${prefix}${item.toFixed(decimals)}${suffix}`;
+      } else {
+        result[CartHeroWireFormat.KEYS[parseInt(code, 36)]] = CartHeroWireFormat.expand(item);
+      }
+    }
+    return result;
+  }
+
+  // A compact top-level object (sustainability response or secondhand
+  // options); throws on a format version this extension cannot read
+  static expandDocument(compactData) {
+    const { _: version, ...rest } = compactData;
+    CartHeroWireFormat.checkVersion(version);
+    return CartHeroWireFormat.expand(rest);
+  }
+
+  // One line of the section stream: { section, data, _ } or { section, error }
+  static expandLine(line) {
+    if (line.error) return line;
+    CartHeroWireFormat.checkVersion(line._);
+    return { section: line.section, data: CartHeroWireFormat.expand(line.data) };
+  }
+
+  static checkVersion(version) {
+    if (version !== CartHeroWireFormat.VERSION) {
+      throw new Error(`Unsupported wire format version ${version}`);
+    }
+  }
+}
@@ -118,6 +118,31 @@ def main():
         print(f"   🚚 Express: {emissions.get('express', 'N/A')} kg CO₂")
         print(f"   🌱 No Rush: {emissions.get('noRush', 'N/A')} kg CO₂")
 
+    # Test 7: Site codes are case-insensitive (and share one cache entry)
+    site_product = dict(product_data, title=f"Site Check Laptop {time.time()}")
+    lower = test_endpoint(
+        "POST", "/api/sustainability",
+        data=dict(site_product, site="uk"),
+        description="Sustainability Analysis (site=uk)"
+    )
+    upper = test_endpoint(
+        "POST", "/api/sustainability",
+        data=dict(site_product, site="UK", title=site_product["title"] + " "),
+        description="Sustainability Analysis (site=UK, cached)"
+    )
+    fresh = test_endpoint(
+        "POST", "/api/sustainability",
+        data=dict(site_product, site="UK", title=site_product["title"] + " fresh"),
+        description="Sustainability Analysis (site=UK, fresh)"
+    )
+
+    if lower and upper and fresh:
+        shipping = [result['carbonFootprint']['newProduct']['breakdown']['shipping']
+                    for result in (lower, upper, fresh)]
+        same = lower['carbonFootprint'] == upper['carbonFootprint'] and len(set(shipping)) == 1
+        print(f"   🚚 Shipping uk / UK / fresh UK: {shipping} kg CO₂")
+        print(f"   {'✅' if same else '❌'} uk and UK return the same carbon section")
+
     print("\n" + "=" * 50)
     print("🏁 Test Suite Complete!")
     print("\nNext Steps:")
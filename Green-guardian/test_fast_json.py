@@ -0,0 +1,59 @@
+"""
+CartHero Fast JSON Test
+Checks that fast_json.encode() splices pre-encoded static values into
+responses without touching user strings, including ones equal to the
+placeholder the splicing looks for (no server needed)
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+import fast_json
+from fast_json import encode, static
+
+METHODOLOGY = static({'version': 2, 'sources': ['EPA', 'DEFRA'], 'note': 'Estimates only'})
+HASHTAGS = static(['#CartHero', '#BuyUsed'])
+
+
+def report(ok, message):
+    print(f"   {'✅' if ok else '❌'} {message}")
+    return 0 if ok else 1
+
+
+def round_trips(obj):
+    return json.loads(encode(obj)) == json.loads(json.dumps(obj))
+
+
+def main():
+    print("🌱 CartHero Fast JSON Test")
+    print("=" * 50)
+    failures = 0
+    if fast_json.orjson is None:
+        print("   ⚠️  orjson is not installed: encode() uses the standard library and does not splice")
+
+    print("\n🧪 Testing: static values")
+    response = {'title': 'iPhone 13', 'methodology': METHODOLOGY, 'share': {'hashtags': HASHTAGS}}
+    failures += report(round_trips(response), "spliced into a response")
+    failures += report(round_trips([METHODOLOGY, {'nested': [HASHTAGS, METHODOLOGY]}]),
+                       "spliced in order when repeated")
+
+    print("\n🧪 Testing: user strings equal to the placeholder")
+    forged = '\x00static\x00'
+    for label, obj in (('title', {'title': forged, 'methodology': METHODOLOGY}),
+                       ('brand after a static', {'methodology': METHODOLOGY, 'zbrand': forged}),
+                       ('dict key', {forged: 'x', 'hashtags': HASHTAGS}),
+                       ('list item', [HASHTAGS, forged, METHODOLOGY])):
+        failures += report(round_trips(obj), f"{label} kept as sent")
+
+    print("\n" + "=" * 50)
+    if failures:
+        print(f"❌ {failures} fast JSON check(s) failed")
+        sys.exit(1)
+    print("🏁 Fast JSON checks passed")
+
+
+if __name__ == "__main__":
+    main()
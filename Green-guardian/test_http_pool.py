@@ -0,0 +1,138 @@
+"""
+CartHero Pooled HTTP Client Test
+Runs the pooled client against a local server with blocked, slow and fast
+paths, and checks the per-host circuit breaker, the busy-host limit and
+the request counters (no API server needed)
+"""
+
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from http_pool import CircuitOpenError, HostBusyError, PooledHTTPClient
+
+RESET_TIMEOUT = 0.2
+
+
+class LocalServer:
+    """/blocked answers 403, /throttled 429, /slow takes a second, anything else 200"""
+
+    def __init__(self):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                status = {'/blocked': 403, '/throttled': 429}.get(self.path, 200)
+                if self.path == '/slow':
+                    time.sleep(1.0)
+                self.send_response(status)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'ok')
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def client(**options):
+    options = dict(dict(max_per_host=1, failure_threshold=1, reset_timeout=RESET_TIMEOUT, max_retries=0), **options)
+    return PooledHTTPClient(**options)
+
+
+def attempt(http, url, **kwargs):
+    """(exception class name or status code, seconds taken)"""
+    started = time.monotonic()
+    try:
+        outcome = http.get(url, **kwargs).status_code
+    except Exception as e:
+        outcome = type(e).__name__
+    return outcome, time.monotonic() - started
+
+
+def report(ok, message):
+    print(f"   {'✅' if ok else '❌'} {message}")
+    return 0 if ok else 1
+
+
+def main():
+    print("🌱 CartHero Pooled HTTP Client Test")
+    print("=" * 50)
+    failures = 0
+    server = LocalServer()
+
+    try:
+        print("\n🧪 Testing: bot-block statuses open the circuit")
+        for path in ('/blocked', '/throttled'):
+            http = client()
+            first = attempt(http, server.url + path)[0]
+            second = attempt(http, server.url + '/')[0]
+            failures += report(second == 'CircuitOpenError', f"{path}: {first}, then {second}")
+
+        print("\n🧪 Testing: an open circuit fails fast on a busy host")
+        http = client(acquire_timeout=2)
+        attempt(http, server.url + '/blocked')
+        time.sleep(RESET_TIMEOUT + 0.05)
+        # The half-open probe takes the host's only slot for a second
+        probe = threading.Thread(target=attempt, args=(http, server.url + '/slow'))
+        probe.start()
+        time.sleep(0.1)
+        outcome, took = attempt(http, server.url + '/')
+        failures += report(outcome == 'CircuitOpenError' and took < 0.5,
+                           f"{outcome} after {took:.2f}s while the probe holds the slot")
+        probe.join()
+
+        print("\n🧪 Testing: a busy host with a closed circuit")
+        http = client(acquire_timeout=0.2)
+        busy = threading.Thread(target=attempt, args=(http, server.url + '/slow'))
+        busy.start()
+        time.sleep(0.1)
+        outcome, took = attempt(http, server.url + '/')
+        failures += report(outcome == 'HostBusyError', f"{outcome} after {took:.2f}s")
+        busy.join()
+        failures += report(attempt(http, server.url + '/')[0] == 200, "the host is usable again once the slot frees")
+
+        print("\n🧪 Testing: a probe failing with a non-HTTP error frees the probe slot")
+        http = client()
+        attempt(http, server.url + '/blocked')
+        time.sleep(RESET_TIMEOUT + 0.05)
+        # An invalid timeout raises ValueError inside the probe, before any connection is taken
+        outcome = attempt(http, server.url + '/', timeout='soon')[0]
+        after = attempt(http, server.url + '/')[0]
+        failures += report(outcome == 'ValueError' and after == 200, f"probe: {outcome}, next request: {after}")
+
+        print("\n🧪 Testing: counters under concurrent requests")
+        http = client(max_per_host=8, acquire_timeout=10)
+        threads = [threading.Thread(target=lambda: [attempt(http, server.url + '/') for _ in range(25)])
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = http.stats()
+        failures += report(stats['requestsSent'] == 200 and stats['rejected'] == 0,
+                           f"{stats['requestsSent']} requests sent, {stats['rejected']} rejected (expected 200, 0)")
+    finally:
+        server.stop()
+
+    print("\n" + "=" * 50)
+    if failures:
+        print(f"❌ {failures} HTTP client check(s) failed")
+        sys.exit(1)
+    print("🏁 HTTP client checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+CartHero Listing Index Test
+Checks /api/search-secondhand's index: unknown query terms, filters,
+cheapest-first cursor pages, and that the endpoint only starts a live
+marketplace fetch when the index has nothing (no server needed)
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from listing_index import ListingIndex
+
+MARKETPLACES = ('eBay', 'Swappa', 'BackMarket')
+MODELS = ('iPhone 13 128GB', 'Galaxy S21 Ultra', 'Pixel 7 Pro')
+
+
+def listings(count, offset=0):
+    for n in range(offset, offset + count):
+        yield {
+            'title': f"{MODELS[n % len(MODELS)]} #{n}",
+            'price': f"${100 + (n * 37) % 500}.{n % 100:02d}",
+            'marketplace': MARKETPLACES[n % len(MARKETPLACES)],
+            'condition': 'Excellent' if n % 2 else 'Good',
+            'url': f"https://example.com/item/{n}"
+        }
+
+
+def report(ok, message):
+    print(f"   {'✅' if ok else '❌'} {message}")
+    return 0 if ok else 1
+
+
+def check_index():
+    failures = 0
+    index = ListingIndex(buffer_size=64)
+    # Sealed segments plus listings still in the buffer
+    index.bulk_load(listings(600))
+    index.add_many(listings(40, offset=600))
+
+    print("\n🧪 Testing: queries with no known term")
+    page = index.search("zzzz qqqq", marketplace='Swappa')
+    failures += report(page['results'] == [] and page['totalFound'] == 0,
+                       f"'zzzz qqqq' on Swappa: {len(page['results'])} results, ignored {page['ignoredTerms']}")
+    page = index.search("!!!", marketplace='eBay')
+    failures += report(page['results'] == [], f"'!!!' on eBay: {len(page['results'])} results")
+
+    print("\n🧪 Testing: unknown terms next to known ones")
+    page = index.search("iphone zzzz", limit=5)
+    failures += report(len(page['results']) == 5 and page['ignoredTerms'] == ['zzzz']
+                       and all('iPhone' in result['title'] for result in page['results']),
+                       f"'iphone zzzz': {len(page['results'])} iPhone results, ignored {page['ignoredTerms']}")
+
+    print("\n🧪 Testing: cheapest-first pages with filters")
+    seen, prices, cursor = [], [], None
+    while True:
+        page = index.search("galaxy", marketplace='swappa', condition='excellent', limit=7, cursor=cursor)
+        seen.extend(result['url'] for result in page['results'])
+        prices.extend(float(result['price'][1:]) for result in page['results'])
+        if not all(result['marketplace'] == 'Swappa' and result['condition'] == 'Excellent'
+                   for result in page['results']):
+            failures += report(False, "a result does not match the filters")
+        cursor = page['nextCursor']
+        if not cursor:
+            break
+    expected = {listing['url'] for listing in listings(640) if listing['title'].startswith('Galaxy')
+                and listing['marketplace'] == 'Swappa' and listing['condition'] == 'Excellent'}
+    failures += report(set(seen) == expected and len(seen) == len(expected),
+                       f"{len(seen)} Swappa/Excellent Galaxy listings across pages (expected {len(expected)})")
+    failures += report(prices == sorted(prices), "pages come cheapest first")
+    return failures
+
+
+def check_endpoint():
+    print("\n🧪 Testing: /api/search-secondhand live fetches")
+    # The API opens its price database on import; keep it out of the repo
+    os.environ.setdefault('CARTHERO_PRICE_DB', os.path.join(tempfile.mkdtemp(), 'price_history.db'))
+    import app
+
+    client = app.app.test_client()
+    fetcher = app.api.secondhand_fetcher
+    app.api.listing_index.add_many(listings(30))
+
+    started = fetcher.started
+    indexed = client.get('/api/search-secondhand?q=pixel&limit=3').get_json()
+    failures = report(indexed['results'] and fetcher.started == started,
+                      f"indexed query: {len(indexed['results'])} results, {fetcher.started - started} fetches started")
+
+    started = fetcher.started
+    unknown = client.get('/api/search-secondhand?q=Zorblax%20Quux').get_json()
+    failures += report(not unknown['results'] and fetcher.started == started + 1,
+                       f"unindexed query: {len(unknown['results'])} results, {fetcher.started - started} fetch started")
+    return failures
+
+
+def main():
+    print("🌱 CartHero Listing Index Test")
+    print("=" * 50)
+
+    failures = check_index() + check_endpoint()
+
+    print("\n" + "=" * 50)
+    if failures:
+        print(f"❌ {failures} listing index check(s) failed")
+        sys.exit(1)
+    print("🏁 Listing index checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+CartHero Marketplace Fan-out Test
+Runs the fan-out against local fixture servers with a slow and a failing
+site, and checks that the search and every adapter thread behind it,
+retries and backoff included, finish by the shared deadline
+(no API server needed)
+"""
+
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from http_pool import PooledHTTPClient
+from marketplace_fixtures import start_fixtures
+from marketplaces import MarketplaceFanout, build_adapters
+
+DEADLINE = 1.0
+# Time allowed past the deadline for thread wake-ups and bookkeeping
+SLACK = 0.3
+
+
+class UnavailableServer:
+    """Answers every request with 503, counting them"""
+
+    def __init__(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.requests = 0
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def fanout_for(urls, **client_options):
+    client = PooledHTTPClient(**client_options)
+    adapters = build_adapters(client, 'ebay,backmarket,swappa')
+    for adapter in adapters:
+        adapter.base_url = urls[adapter.key]
+    return MarketplaceFanout(adapters, deadline=DEADLINE)
+
+
+def finished(fanout):
+    """Adapters whose fetch has returned (answered, failed or timed out)"""
+    stats = fanout.stats()['adapters']
+    return {name for name, counts in stats.items() if counts['ok'] + counts['empty'] + counts['errors']}
+
+
+def wait_until(predicate, timeout):
+    ends_at = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() >= ends_at:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def report(ok, message):
+    print(f"   {'✅' if ok else '❌'} {message}")
+    return 0 if ok else 1
+
+
+def run(label, fanout, started_checks):
+    print(f"\n🧪 Testing: {label}")
+    started = time.monotonic()
+    items = fanout.search("iPhone 13")
+    returned = time.monotonic() - started
+    failures = report(returned <= DEADLINE + SLACK, f"search returned {len(items)} listings after {returned:.2f}s")
+
+    done = wait_until(lambda: len(finished(fanout)) == len(fanout.adapters), DEADLINE + SLACK - returned)
+    elapsed = time.monotonic() - started
+    failures += report(done, f"every adapter thread finished after {elapsed:.2f}s "
+                             f"(deadline {DEADLINE}s): {sorted(finished(fanout))}")
+    for ok, message in started_checks(items):
+        failures += report(ok, message)
+    fanout.shutdown()
+    return failures
+
+
+def main():
+    print("🌱 CartHero Marketplace Fan-out Test")
+    print("=" * 50)
+    failures = 0
+
+    # Swappa takes 5s to answer: each attempt times out and would be retried
+    fixtures = start_fixtures({'swappa': 5.0})
+    unavailable = UnavailableServer()
+    try:
+        urls = {key: fixture.url for key, fixture in fixtures.items()}
+        failures += run("slow site with read-timeout retries", fanout_for(urls), lambda items: [
+            (items and not any(item['marketplace'] == 'Swappa' for item in items),
+             "listings from eBay and BackMarket, Swappa left out"),
+            (fixtures['swappa'].requests <= 1, f"{fixtures['swappa'].requests} request(s) sent to Swappa"),
+        ])
+
+        # BackMarket answers 503: a 2s backoff does not fit before the deadline
+        urls = dict(urls, swappa=fixtures['ebay'].url, backmarket=unavailable.url)
+        failures += run("failing site with a backoff longer than the deadline",
+                        fanout_for(urls, backoff_factor=2.0), lambda items: [
+            (unavailable.requests == 1, f"{unavailable.requests} request(s) sent to BackMarket, no retry after"),
+        ])
+    finally:
+        for fixture in fixtures.values():
+            fixture.stop()
+        unavailable.stop()
+
+    print("\n" + "=" * 50)
+    if failures:
+        print(f"❌ {failures} fan-out check(s) failed")
+        sys.exit(1)
+    print("🏁 Fan-out checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+CartHero Pre-scoring Round-trip Test
+Pre-scores a small feed to .npz and .idx and checks that every product
+comes back exactly as the live generators build it, and that the same
+product at another price or site is not served the feed row's scores
+(no server needed)
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from precomputed import PrecomputedScores, lookup_product
+from precomputed_index import MappedIndex
+from prescore import PRESCORED_SECTIONS, prescore
+from scoring import ProductScorer
+
+FEED = [
+    # Known reference models: durability comes from mock_data with referenceModel/commonIssues
+    {"title": "iPhone 13", "brand": "Apple", "price": "$699", "site": "US"},
+    {"title": "Galaxy S21", "brand": "Samsung", "price": "$499", "site": "UK"},
+    # No reference model: generated durability without those keys
+    {"title": "Generic Widget", "brand": "Acme", "price": "$19.99", "site": "US"},
+    {"title": "XPS 13 Laptop", "brand": "Dell", "price": "$1299", "site": "de"},
+    {"title": "Fairphone 5", "brand": "Fairphone", "price": "$699", "site": "US"},
+]
+
+# Feed products requested at a price or site they were not scored for
+VARIANTS = [
+    {"title": "iPhone 13", "brand": "Apple", "price": "$1299", "site": "AU"},
+    {"title": "iPhone 13", "brand": "Apple", "price": "$20", "site": "UK"},
+    {"title": "Galaxy S21", "brand": "Samsung", "price": "$499", "site": "US"},
+]
+
+
+def live_sections(scorer, product_data):
+    product = scorer.product_context(product_data)
+    sections = {name: getattr(scorer, method)(product) for name, method in PRESCORED_SECTIONS}
+    # Compare as plain JSON values (tuples become lists, static fragments plain dicts)
+    return product, json.loads(json.dumps(sections))
+
+
+def check(label, scores, expected):
+    print(f"\n🧪 Testing: {label} round-trip")
+    failures = 0
+    for title, (product, sections) in expected.items():
+        stored = lookup_product(scores, product)
+        if stored == sections:
+            reference = sections['durability'].get('referenceModel', 'none')
+            print(f"   ✅ {title} (reference model: {reference})")
+        else:
+            failures += 1
+            print(f"   ❌ {title}")
+            for name in sections:
+                if stored is None or stored.get(name) != sections[name]:
+                    print(f"      {name}: expected {sections[name]}")
+                    print(f"      {' ' * len(name)}  got      {stored and stored.get(name)}")
+    return failures
+
+
+def check_variants(label, scores, scorer, expected):
+    print(f"\n🧪 Testing: {label} at other prices and sites")
+    failures = 0
+    for product_data in VARIANTS:
+        product, live = live_sections(scorer, product_data)
+        _, scored = expected[product_data["title"]]
+        name = f"{product_data['title']} {product_data['price']} {product_data['site']}"
+        if lookup_product(scores, product) is not None:
+            failures += 1
+            print(f"   ❌ {name}: served the feed row's sections")
+        elif live['carbonFootprint'] == scored['carbonFootprint']:
+            failures += 1
+            print(f"   ❌ {name}: live carbon footprint matches the feed row, the case checks nothing")
+        else:
+            print(f"   ✅ {name} falls back to the generators "
+                  f"(shipping {live['carbonFootprint']['newProduct']['breakdown']['shipping']} kg CO₂)")
+    return failures
+
+
+def main():
+    print("🌱 CartHero Pre-scoring Test")
+    print("=" * 50)
+
+    scorer = ProductScorer()
+    expected = {product["title"]: live_sections(scorer, product) for product in FEED}
+    has_reference = [title for title, (_, sections) in expected.items() if 'referenceModel' in sections['durability']]
+    print(f"   Products with a reference model: {', '.join(has_reference) or 'none'}")
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        feed_path = os.path.join(directory, 'feed.jsonl')
+        with open(feed_path, 'w', encoding='utf-8') as f:
+            for product in FEED:
+                f.write(json.dumps(product) + '\n')
+
+        npz_path = os.path.join(directory, 'catalog_scores.npz')
+        idx_path = os.path.join(directory, 'catalog.idx')
+        prescore(feed_path, npz_path, workers=1)
+        prescore(feed_path, idx_path, workers=1)
+
+        for label, scores in (('.npz', PrecomputedScores(npz_path)), ('.idx', MappedIndex(idx_path))):
+            failures += check(label, scores, expected)
+            failures += check_variants(label, scores, scorer, expected)
+
+    print("\n" + "=" * 50)
+    if failures or not has_reference or len(has_reference) == len(FEED):
+        print("❌ Pre-scoring round-trip failed")
+        sys.exit(1)
+    print("🏁 Pre-scored sections match the live generators")
+
+
+if __name__ == "__main__":
+    main()
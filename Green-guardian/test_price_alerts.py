@@ -0,0 +1,99 @@
+"""
+CartHero Price Alert Sync Test
+Opens two alert engines on one database, as two gunicorn workers would,
+and checks that alerts created, cancelled and fired through one show up in
+the other after an incremental sync (no API server needed)
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from price_alerts import COLUMNS, SCHEMA, PriceAlertEngine
+
+PRELOADED_ALERTS = 200_000
+SITE = 'US'
+
+
+def preload(path, count):
+    """Write `count` active alerts straight into the table"""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    now = time.time()
+    with conn:
+        conn.executemany(
+            f"INSERT INTO price_alerts ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+            ((f"alert_bulk_{i:08x}", 1000 + i % 5000, SITE, f"Product {i % 5000}", 500.0, 100.0 + i % 300,
+              'daily', json.dumps(['price_drop']), 70, now, None, 'active') for i in range(count)))
+    conn.close()
+
+
+def report(ok, message):
+    print(f"   {'✅' if ok else '❌'} {message}")
+    return 0 if ok else 1
+
+
+def fired(events, alert):
+    return any(event['alertId'] == alert.alert_id for event in events)
+
+
+def main():
+    print("🌱 CartHero Price Alert Sync Test")
+    print("=" * 50)
+    failures = 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'price_history.db')
+        preload(path, PRELOADED_ALERTS)
+        first, second = PriceAlertEngine(path), PriceAlertEngine(path)
+        print(f"   Loaded {PRELOADED_ALERTS} alerts in {second.load_seconds:.2f}s")
+
+        print("\n🧪 Testing: an alert created through another worker")
+        alert = first.create(42, SITE, "iPhone 13", 699.0, {'targetPrice': 600, 'alertTypes': ['price_drop']})
+        failures += report(not fired(second.evaluate(42, SITE, price=550), alert), "not known before a sync")
+        sync = second.sync()
+        failures += report(sync < second.load_seconds / 20,
+                           f"sync took {sync * 1000:.1f}ms, full load {second.load_seconds * 1000:.0f}ms")
+        failures += report(fired(second.evaluate(42, SITE, price=550), alert), "fires after the sync")
+        failures += report(not fired(first.evaluate(42, SITE, price=540), alert),
+                           "does not fire again in the creating worker during its cooldown")
+
+        print("\n🧪 Testing: an alert cancelled through another worker")
+        other = first.create(43, SITE, "Galaxy S21", 499.0, {'targetPrice': 450, 'alertTypes': ['price_drop']})
+        second.sync()
+        active = second.stats()['activeAlerts']
+        first.cancel(other.alert_id)
+        second.sync()
+        failures += report(second.stats()['activeAlerts'] == active - 1 and second.get(other.alert_id) is None,
+                           f"dropped by the sync ({active} -> {second.stats()['activeAlerts']} active alerts)")
+        failures += report(not fired(second.evaluate(43, SITE, price=400), other), "no longer fires")
+
+        print("\n🧪 Testing: created and cancelled between two syncs")
+        brief = first.create(44, SITE, "Pixel 7", 599.0, {'targetPrice': 500, 'alertTypes': ['price_drop']})
+        first.cancel(brief.alert_id)
+        second.sync()
+        failures += report(second.get(brief.alert_id) is None and not fired(second.evaluate(44, SITE, price=100), brief),
+                           "never indexed")
+
+        print("\n🧪 Testing: a worker started after the changes")
+        third = PriceAlertEngine(path)
+        third.sync()
+        expected = PRELOADED_ALERTS + 1
+        failures += report(third.stats()['activeAlerts'] == expected == second.stats()['activeAlerts'],
+                           f"{third.stats()['activeAlerts']} active alerts in a fresh worker "
+                           f"(expected {expected}, synced worker has {second.stats()['activeAlerts']})")
+
+    print("\n" + "=" * 50)
+    if failures:
+        print(f"❌ {failures} price alert check(s) failed")
+        sys.exit(1)
+    print("🏁 Price alert sync checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+CartHero Reference Data Reload Test
+Edits a copy of mock_data/secondhand.json under a running API (imported,
+no server needed) and checks that a hot reload drops withdrawn listings
+from /api/search-secondhand, adds new ones, and keeps live listings
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+sys.path.insert(0, BACKEND)
+
+
+def report(ok, message):
+    print(f"   {'✅' if ok else '❌'} {message}")
+    return 0 if ok else 1
+
+
+def main():
+    print("🌱 CartHero Reference Data Reload Test")
+    print("=" * 50)
+    failures = 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The API opens its price database on import; keep it out of the repo
+        os.environ.setdefault('CARTHERO_PRICE_DB', os.path.join(directory, 'price_history.db'))
+        import app
+        from reference_data import ReferenceDataWatcher
+
+        data_dir = os.path.join(directory, 'mock_data')
+        shutil.copytree(os.path.join(BACKEND, 'mock_data'), data_dir)
+        watcher = ReferenceDataWatcher(data_dir, app.swap_reference_data, interval=0)
+        client = app.app.test_client()
+
+        def titles(query):
+            page = client.get(f'/api/search-secondhand?q={query}&limit=50').get_json()
+            return [result['title'] for result in page['results']]
+
+        path = os.path.join(data_dir, 'secondhand.json')
+        with open(path, encoding='utf-8') as f:
+            listings = json.load(f)
+        withdrawn, kept = listings[0], listings[1]
+        added = dict(kept, id='new-1', title='Refurbished Fairphone 4 128GB',
+                     url='https://backmarket.com/refurbished-fairphone-4', marketplace='BackMarket')
+        live = {'title': 'Used Fairphone 4 256GB', 'price': '$289.00', 'marketplace': 'Swappa',
+                'url': 'https://swappa.com/listing/fairphone-4-live', 'condition': 'Good'}
+        app.api.listing_index.add(live, category='smartphone')
+
+        print("\n🧪 Testing: before the reload")
+        failures += report(withdrawn['title'] in titles('refurbished'), f"'{withdrawn['title']}' is searchable")
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump([added] + listings[1:], f)
+        swapped = watcher.check()
+
+        print("\n🧪 Testing: after the reload")
+        failures += report(swapped, "reference data swapped")
+        failures += report(withdrawn['title'] not in titles('refurbished'), f"'{withdrawn['title']}' is gone")
+        failures += report(kept['title'] in titles(kept['title'].split()[1]), f"'{kept['title']}' is still there")
+        fairphones = titles('fairphone')
+        failures += report(added['title'] in fairphones, f"'{added['title']}' was added")
+        failures += report(live['title'] in fairphones, f"live listing '{live['title']}' survived the reload")
+
+    print("\n" + "=" * 50)
+    if failures:
+        print(f"❌ {failures} reload check(s) failed")
+        sys.exit(1)
+    print("🏁 Reference data reload checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+CartHero Response Cache Test
+Checks the TTL + LRU cache behind /api/sustainability: expiry per section,
+least-recently-used eviction, invalidation during a rebuild, and that a
+repeated request is answered from the cache (no server needed)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from cache import ResponseCache
+
+FIELDS = 'carbonFootprint,durability,sustainabilityScore,shipping'
+
+
+def report(ok, message):
+    print(f"   {'✅' if ok else '❌'} {message}")
+    return 0 if ok else 1
+
+
+def check_cache():
+    failures = 0
+
+    print("\n🧪 Testing: per-section TTLs")
+    cache = ResponseCache(section_ttls={'secondhandOptions': 0.2})
+    cache.set('iphone', 'secondhandOptions', ['listing'])
+    cache.set('iphone', 'carbonFootprint', {'total': 80})
+    cache.set('iphone', 'carbonFootprint:compact', {'0': 80})
+    time.sleep(0.3)
+    failures += report(cache.get('iphone', 'secondhandOptions') is None, "secondhandOptions expired after its TTL")
+    failures += report(cache.get('iphone', 'carbonFootprint') == {'total': 80}, "carbonFootprint still fresh")
+    failures += report(cache.ttl_for('carbonFootprint:compact') == cache.ttl_for('carbonFootprint'),
+                       "derived entries live as long as their section")
+    cache.set('iphone', 'shipping', {'standard': {}}, ttl=0)
+    failures += report(cache.get('iphone', 'shipping') is None, "a zero TTL is not stored")
+
+    print("\n🧪 Testing: least recently used eviction")
+    cache = ResponseCache(max_products=2)
+    cache.set('a', 'durability', 1)
+    cache.set('b', 'durability', 2)
+    cache.get('a', 'durability')
+    cache.set('c', 'durability', 3)
+    failures += report(cache.get('b', 'durability') is None and cache.get('a', 'durability') == 1
+                       and cache.get('c', 'durability') == 3,
+                       f"'b' evicted, recently read 'a' kept ({cache.stats()['evictions']} eviction)")
+
+    print("\n🧪 Testing: invalidation while a section is being built")
+    generation = cache.generation
+    cache.invalidate()
+    cache.set('a', 'durability', 'stale', generation=generation)
+    failures += report(cache.get('a', 'durability') is None, "a value built before invalidate() is not stored")
+    cache.set('a', 'durability', 'fresh', generation=cache.generation)
+    failures += report(cache.get('a', 'durability') == 'fresh', "a value built after it is")
+
+    stats = cache.stats()
+    failures += report((stats['hits'], stats['misses']) == (4, 2) and 'durability' in stats['sections'],
+                       f"stats count {stats['hits']} hits and {stats['misses']} misses")
+    return failures
+
+
+def check_endpoint():
+    print("\n🧪 Testing: repeated /api/sustainability requests")
+    # The API opens its price database on import; keep it out of the repo
+    os.environ.setdefault('CARTHERO_PRICE_DB', os.path.join(tempfile.mkdtemp(), 'price_history.db'))
+    import app
+
+    client = app.app.test_client()
+    product = {'title': 'Fairphone 5 256GB', 'brand': 'Fairphone', 'price': '$699', 'site': 'UK'}
+
+    def fetch(data):
+        body = client.post(f'/api/sustainability?fields={FIELDS}', json=data).get_json()
+        metadata = body.pop('metadata')
+        return body, metadata['cache']
+
+    first, first_status = fetch(product)
+    hits = app.response_cache.hits
+    second, second_status = fetch(product)
+    failures = report(first_status == 'miss' and second_status == 'hit',
+                      f"first request '{first_status}', second '{second_status}'")
+    failures += report(second == first and app.response_cache.hits - hits == len(FIELDS.split(',')),
+                       f"same sections, {app.response_cache.hits - hits} cache hits")
+
+    _, status = fetch(dict(product, site='uk'))
+    failures += report(status == 'hit', f"site=uk shares the entries of site=UK ('{status}')")
+
+    app.response_cache.invalidate()
+    _, status = fetch(product)
+    failures += report(status == 'miss', f"rebuilt after invalidate() ('{status}')")
+    return failures
+
+
+def main():
+    print("🌱 CartHero Response Cache Test")
+    print("=" * 50)
+
+    failures = check_cache() + check_endpoint()
+
+    print("\n" + "=" * 50)
+    if failures:
+        print(f"❌ {failures} response cache check(s) failed")
+        sys.exit(1)
+    print("🏁 Response cache checks passed")
+
+
+if __name__ == "__main__":
+    main()
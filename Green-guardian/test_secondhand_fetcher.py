@@ -0,0 +1,108 @@
+"""
+CartHero Secondhand Fetcher Test
+Runs the real marketplace fan-out against local fixture servers and a dead
+port, and checks single-flight fetches and how long results are cached
+(no API server needed)
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from http_pool import PooledHTTPClient
+from marketplace_fixtures import start_fixtures
+from marketplaces import MarketplaceFanout, build_adapters
+from secondhand_fetcher import SecondhandFetcher
+
+RESULT_TTL = 300
+FAILURE_TTL = 30
+MARKETPLACES = 'ebay,backmarket,swappa'
+
+
+def dead_url():
+    """URL of a local port nothing listens on"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def fetcher_for(urls, deadline=2.0):
+    client = PooledHTTPClient(max_retries=0)
+    adapters = build_adapters(client, MARKETPLACES)
+    for adapter in adapters:
+        adapter.base_url = urls[adapter.key]
+    fanout = MarketplaceFanout(adapters, deadline=deadline)
+    return SecondhandFetcher(fanout.search, result_ttl=RESULT_TTL, failure_ttl=FAILURE_TTL), fanout
+
+
+def ttl_left(fetcher, query):
+    """Seconds until the cached listings for `query` expire, or None if not cached"""
+    cached = fetcher.results._entries.get(fetcher._normalize(query), {}).get(fetcher.SECTION)
+    return None if cached is None else cached[0] - time.monotonic()
+
+
+def report(ok, message):
+    print(f"   {'✅' if ok else '❌'} {message}")
+    return 0 if ok else 1
+
+
+def main():
+    print("🌱 CartHero Secondhand Fetcher Test")
+    print("=" * 50)
+    failures = 0
+
+    fixtures = start_fixtures()
+    try:
+        print("\n🧪 Testing: live listings from every marketplace")
+        fetcher, fanout = fetcher_for({key: fixture.url for key, fixture in fixtures.items()})
+        query = "iPhone 13"
+        items = fetcher.fetch(query, timeout=5)
+        left = ttl_left(fetcher, query)
+        failures += report(bool(items), f"{len(items or [])} listings found")
+        failures += report(left is not None and left > FAILURE_TTL,
+                           f"results cached for the full TTL ({left and round(left)}s left)")
+        fanout.shutdown()
+
+        print("\n🧪 Testing: concurrent lookups share one fetch")
+        fetcher, fanout = fetcher_for({key: fixture.url for key, fixture in fixtures.items()})
+        before = {key: fixture.requests for key, fixture in fixtures.items()}
+        futures = []
+        threads = [threading.Thread(target=lambda: futures.append(fetcher.schedule("Galaxy S21")))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        futures[0].result(timeout=5)
+        sent = {key: fixture.requests - before[key] for key, fixture in fixtures.items()}
+        failures += report(len(set(map(id, futures))) == 1 and all(count == 1 for count in sent.values()),
+                           f"8 lookups, {fetcher.started} fetch started, requests per site: {sent}")
+        fanout.shutdown()
+    finally:
+        for fixture in fixtures.values():
+            fixture.stop()
+
+    print("\n🧪 Testing: every marketplace down")
+    fetcher, fanout = fetcher_for({key: dead_url() for key in MARKETPLACES.split(',')})
+    query = "Pixel 7"
+    items = fetcher.fetch(query, timeout=5)
+    left = ttl_left(fetcher, query)
+    failures += report(items == [], f"fetch returned {items!r}")
+    failures += report(left is not None and left <= FAILURE_TTL,
+                       f"failure cached for the short TTL ({left and round(left)}s left, limit {FAILURE_TTL}s)")
+    fanout.shutdown()
+
+    print("\n" + "=" * 50)
+    if failures:
+        print(f"❌ {failures} secondhand fetcher check(s) failed")
+        sys.exit(1)
+    print("🏁 Secondhand fetcher checks passed")
+
+
+if __name__ == "__main__":
+    main()
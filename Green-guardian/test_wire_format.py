@@ -0,0 +1,80 @@
+"""
+CartHero Wire Format Test
+Checks that compact responses expand back to exactly the full document,
+formatting numbers the way carthero-extension/wire-format.js does with
+toFixed() (no server needed)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from wire_format import CODES, KEYS, NUMBER_FORMATS, compact_document, expand_document
+
+
+def to_fixed(value, decimals):
+    """JS Number.prototype.toFixed for the values compact() sends; -0 has no sign"""
+    return f"{abs(value) if value == 0 else value:.{decimals}f}"
+
+
+def expand_like_extension(value):
+    if isinstance(value, dict):
+        result = {}
+        for code, item in value.items():
+            if code == '_':
+                continue
+            if code.startswith('.'):
+                result[code[1:]] = expand_like_extension(item)
+            elif code.startswith('$'):
+                key = KEYS[int(code[1:], 36)]
+                prefix, suffix, decimals = NUMBER_FORMATS[key]
+                result[key] = f"{prefix}{to_fixed(item, decimals)}{suffix}"
+            else:
+                result[KEYS[int(code, 36)]] = expand_like_extension(item)
+        return result
+    if isinstance(value, list):
+        return [expand_like_extension(item) for item in value]
+    return value
+
+
+def report(ok, message):
+    print(f"   {'✅' if ok else '❌'} {message}")
+    return 0 if ok else 1
+
+
+def main():
+    print("🌱 CartHero Wire Format Test")
+    print("=" * 50)
+    failures = 0
+
+    document = {
+        'secondhandOptions': [
+            {'title': 'iPhone 13', 'price': '$549.99', 'savings': 'Save 31%', 'co2Reduction': '42.5 kg CO₂ saved'},
+            {'title': 'Pixel 7', 'price': '$0.00', 'co2Reduction': '-0.0 kg CO₂ saved'},
+            {'title': 'Galaxy S21', 'price': 'Contact seller', 'co2Reduction': '-1.5 kg CO₂ saved'}
+        ],
+        'shipping': {'standard': {'co2': '-0.0 kg CO₂', 'cost': '$-0.00', 'days': 5}},
+        'unlistedKey': {'price': '$12.30'}
+    }
+    compact = compact_document(document)
+
+    print("\n🧪 Testing: expanding compact documents")
+    failures += report(expand_document(compact) == document, "backend expand() gives back the full document")
+    failures += report(expand_like_extension(compact) == document,
+                       "toFixed()-style expansion gives back the full document")
+
+    print("\n🧪 Testing: negative zero")
+    listing = compact[CODES['secondhandOptions']][1]
+    failures += report(listing.get(CODES['co2Reduction']) == '-0.0 kg CO₂ saved',
+                       f"'-0.0 kg CO₂ saved' is sent as the string: {listing}")
+
+    print("\n" + "=" * 50)
+    if failures:
+        print(f"❌ {failures} wire format check(s) failed")
+        sys.exit(1)
+    print("🏁 Wire format checks passed")
+
+
+if __name__ == "__main__":
+    main()